@@ -0,0 +1,80 @@
+"""initial schema
+
+Revision ID: 0001
+Revises: 
+Create Date: 2026-10-18 12:00:00
+
+Tables as they existed before migrations were introduced. Databases created
+earlier by `Base.metadata.create_all` already have them, so each table is only
+created if missing.
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '0001'
+down_revision: Union[str, Sequence[str], None] = None
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    existing = set(sa.inspect(op.get_bind()).get_table_names())
+
+    if "items" not in existing:
+        op.create_table(
+            "items",
+            sa.Column("id", sa.Integer(), primary_key=True),
+            sa.Column("name", sa.String()),
+            sa.Column("item_type", sa.String()),
+            sa.Column("store_name", sa.String()),
+            sa.Column("price", sa.Float()),
+            sa.Column("unit", sa.String()),
+            sa.Column("quantity", sa.Float()),
+            sa.Column("nutrition_data", sa.JSON()),
+            sa.Column("created_at", sa.DateTime(timezone=True), server_default=sa.func.now()),
+            sa.Column("updated_at", sa.DateTime(timezone=True)),
+        )
+        op.create_index("ix_items_id", "items", ["id"])
+        op.create_index("ix_items_name", "items", ["name"])
+        op.create_index("ix_items_item_type", "items", ["item_type"])
+        op.create_index("ix_items_store_name", "items", ["store_name"])
+
+    if "comparisons" not in existing:
+        op.create_table(
+            "comparisons",
+            sa.Column("id", sa.Integer(), primary_key=True),
+            sa.Column("user_id", sa.String(), nullable=True),
+            sa.Column("name", sa.String()),
+            sa.Column("savings", sa.Float()),
+            sa.Column("nutrition_diff", sa.JSON()),
+            sa.Column("created_at", sa.DateTime(timezone=True), server_default=sa.func.now()),
+        )
+        op.create_index("ix_comparisons_id", "comparisons", ["id"])
+
+    if "benchmark_items" not in existing:
+        op.create_table(
+            "benchmark_items",
+            sa.Column("id", sa.Integer(), primary_key=True),
+            sa.Column("name", sa.String()),
+            sa.Column("lowest_price", sa.Float()),
+            sa.Column("unit", sa.String()),
+            sa.Column("store", sa.String()),
+            sa.Column("price_per_100g", sa.Float()),
+            sa.Column("calories_per_dollar", sa.Float()),
+            sa.Column("protein_per_dollar", sa.Float()),
+            sa.Column("last_updated", sa.DateTime(timezone=True), server_default=sa.func.now()),
+        )
+        op.create_index("ix_benchmark_items_id", "benchmark_items", ["id"])
+        op.create_index("ix_benchmark_items_name", "benchmark_items", ["name"])
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_table("benchmark_items")
+    op.drop_table("comparisons")
+    op.drop_table("items")
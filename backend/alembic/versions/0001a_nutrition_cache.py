@@ -0,0 +1,42 @@
+"""nutrition lookup cache
+
+Revision ID: 0001a
+Revises: 0001
+Create Date: 2026-10-18 12:15:00
+
+Persisted OpenFoodFacts lookups (models.NutritionCacheEntry). Databases that ran
+an earlier 0001, which also created this table, already have it.
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '0001a'
+down_revision: Union[str, Sequence[str], None] = '0001'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    if "nutrition_cache" in sa.inspect(op.get_bind()).get_table_names():
+        return
+    op.create_table(
+        "nutrition_cache",
+        sa.Column("id", sa.Integer(), primary_key=True),
+        sa.Column("query_key", sa.String()),
+        sa.Column("nutrition_data", sa.JSON()),
+        sa.Column("found", sa.Boolean()),
+        sa.Column("hit_count", sa.Integer()),
+        sa.Column("fetched_at", sa.DateTime(timezone=True), server_default=sa.func.now()),
+    )
+    op.create_index("ix_nutrition_cache_id", "nutrition_cache", ["id"])
+    op.create_index("ix_nutrition_cache_query_key", "nutrition_cache", ["query_key"], unique=True)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_table("nutrition_cache")
@@ -0,0 +1,42 @@
+"""unique offer key and full-text search on items
+
+Revision ID: 0002
+Revises: 0001a
+Create Date: 2026-10-18 12:30:00
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+from models import ITEMS_FTS_SQLITE, ITEMS_FTS_POSTGRES
+
+
+# revision identifiers, used by Alembic.
+revision: str = '0002'
+down_revision: Union[str, Sequence[str], None] = '0001a'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_index("uq_items_store_name_name", "items", ["store_name", "name"], unique=True)
+
+    dialect = op.get_bind().dialect.name
+    statements = {"sqlite": ITEMS_FTS_SQLITE, "postgresql": ITEMS_FTS_POSTGRES}.get(dialect, [])
+    for statement in statements:
+        op.execute(statement)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    dialect = op.get_bind().dialect.name
+    if dialect == "sqlite":
+        for trigger in ("items_fts_ai", "items_fts_ad", "items_fts_au"):
+            op.execute(f"DROP TRIGGER IF EXISTS {trigger}")
+        op.execute("DROP TABLE IF EXISTS items_fts")
+    elif dialect == "postgresql":
+        op.execute("DROP INDEX IF EXISTS ix_items_name_tsv")
+    op.drop_index("uq_items_store_name_name", table_name="items")
@@ -0,0 +1,69 @@
+"""benchmark category and indexed leaderboard metrics
+
+Revision ID: 0003
+Revises: 0002
+Create Date: 2026-10-18 14:00:00
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '0003'
+down_revision: Union[str, Sequence[str], None] = '0002'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+METRIC_INDEXES = {
+    "ix_benchmark_items_category": "category",
+    "ix_benchmark_items_lowest_price": "lowest_price",
+    "ix_benchmark_items_calories_per_dollar": "calories_per_dollar",
+    "ix_benchmark_items_protein_per_dollar": "protein_per_dollar",
+}
+
+# smart_pantry.STAPLE_ITEMS as of this revision
+STAPLE_CATEGORIES = {
+    "Frozen Green Beans": "frozen_sides",
+    "Frozen Mixed Vegetables": "frozen_sides",
+    "Frozen Spinach": "frozen_sides",
+    "Dried Lentils": "pantry_stable",
+    "Dried Black Beans": "pantry_stable",
+    "Brown Rice": "pantry_stable",
+    "Rolled Oats": "pantry_stable",
+    "Bananas": "produce",
+    "Carrots": "produce",
+    "Eggs": "dairy",
+    "Whole Milk": "dairy",
+    "Chicken Breast": "meat",
+    "Canned Tuna": "pantry_stable",
+    "Peanut Butter": "pantry_stable",
+    "Whole Wheat Bread": "bakery",
+}
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    with op.batch_alter_table("benchmark_items") as batch_op:
+        batch_op.add_column(sa.Column("category", sa.String(), nullable=True))
+    for index_name, column in METRIC_INDEXES.items():
+        op.create_index(index_name, "benchmark_items", [column])
+
+    # Backfill categories for staples refreshed before the column existed
+    benchmark_items = sa.table("benchmark_items", sa.column("name", sa.String), sa.column("category", sa.String))
+    for name, category in STAPLE_CATEGORIES.items():
+        op.execute(
+            benchmark_items.update()
+            .where(benchmark_items.c.name == name)
+            .values(category=category)
+        )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    for index_name in METRIC_INDEXES:
+        op.drop_index(index_name, table_name="benchmark_items")
+    with op.batch_alter_table("benchmark_items") as batch_op:
+        batch_op.drop_column("category")
@@ -0,0 +1,38 @@
+"""normalized package size and unit prices on items
+
+Revision ID: 0004
+Revises: 0003
+Create Date: 2026-10-18 15:00:00
+
+Existing rows get their sizes on their next scrape; nothing is backfilled.
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '0004'
+down_revision: Union[str, Sequence[str], None] = '0003'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+COLUMNS = ["net_grams", "net_ml", "pack_count", "price_per_100g", "price_per_100ml"]
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    for column in COLUMNS:
+        op.add_column("items", sa.Column(column, sa.Float(), nullable=True))
+    op.create_index("ix_items_price_per_100g", "items", ["price_per_100g"])
+    op.create_index("ix_items_price_per_100ml", "items", ["price_per_100ml"])
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index("ix_items_price_per_100ml", table_name="items")
+    op.drop_index("ix_items_price_per_100g", table_name="items")
+    # Plain ALTER TABLE rather than batch mode: recreating `items` would drop the FTS triggers
+    for column in reversed(COLUMNS):
+        op.drop_column("items", column)
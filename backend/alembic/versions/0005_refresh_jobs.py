@@ -0,0 +1,48 @@
+"""benchmark refresh jobs
+
+Revision ID: 0005
+Revises: 0004
+Create Date: 2026-10-18 18:00:00
+
+Refresh job state and the per-staple-set running lock (models.RefreshJobRecord),
+shared by every uvicorn worker.
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '0005'
+down_revision: Union[str, Sequence[str], None] = '0004'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table(
+        "refresh_jobs",
+        sa.Column("id", sa.String(), primary_key=True),
+        sa.Column("staple_key", sa.String()),
+        sa.Column("running_key", sa.String(), nullable=True),
+        sa.Column("status", sa.String()),
+        sa.Column("incremental", sa.Boolean()),
+        sa.Column("max_age_s", sa.Float()),
+        sa.Column("items", sa.JSON()),
+        sa.Column("summary", sa.JSON()),
+        sa.Column("error", sa.String()),
+        sa.Column("created_at", sa.DateTime(timezone=True)),
+        sa.Column("started_at", sa.DateTime(timezone=True)),
+        sa.Column("finished_at", sa.DateTime(timezone=True)),
+        sa.Column("heartbeat_at", sa.DateTime(timezone=True)),
+    )
+    op.create_index("ix_refresh_jobs_staple_key", "refresh_jobs", ["staple_key"])
+    op.create_index("ix_refresh_jobs_created_at", "refresh_jobs", ["created_at"])
+    op.create_index("ix_refresh_jobs_running_key", "refresh_jobs", ["running_key"], unique=True)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_table("refresh_jobs")
@@ -1,6 +1,33 @@
-from typing import Dict, Any, List
+from typing import Dict, Any, List, Optional, Sequence
+import re
+import numpy as np
 from models import BenchmarkItem
 
+_NON_NUMERIC_RE = re.compile(r"[^0-9.]")
+
+def parse_val(val) -> float:
+    """
+    Nutrient value as a float: 5 -> 5.0, "5g" -> 5.0, anything unparseable -> 0.0.
+    """
+    if isinstance(val, (int, float)):
+        return float(val)
+    if isinstance(val, str):
+        # Remove non-numeric chars except .
+        clean = _NON_NUMERIC_RE.sub("", val)
+        try:
+            return float(clean) if clean else 0.0
+        except ValueError:  # e.g. "1.5.2"
+            return 0.0
+    return 0.0
+
+def nutrient_column(nutritions: Sequence[Optional[Dict[str, Any]]], key: str) -> np.ndarray:
+    """One nutrient across many nutrition dicts, parsed into a float array (missing -> 0.0)."""
+    return np.fromiter(
+        (parse_val((n or {}).get(key, 0)) for n in nutritions),
+        dtype=np.float64,
+        count=len(nutritions),
+    )
+
 class AnalysisEngine:
     @staticmethod
     def calculate_metrics(price: float, nutrition: Dict[str, Any], unit_weight_g: float = 100.0) -> Dict[str, float]:
@@ -13,15 +40,6 @@ class AnalysisEngine:
 
         # Safe extraction with defaults
         # We need to parse "5g" -> 5.0
-        def parse_val(val):
-            if isinstance(val, (int, float)):
-                return float(val)
-            if isinstance(val, str):
-                # Remove non-numeric chars except .
-                clean = "".join(c for c in val if c.isdigit() or c == '.')
-                return float(clean) if clean else 0.0
-            return 0.0
-
         calories = parse_val(nutrition.get("calories", 0))
         protein = parse_val(nutrition.get("protein", 0))
         fiber = parse_val(nutrition.get("fiber", 0)) # Assuming we get fiber
@@ -38,13 +56,87 @@ class AnalysisEngine:
         
         total_calories = (unit_weight_g / 100.0) * calories
         total_protein = (unit_weight_g / 100.0) * protein
+        total_fiber = (unit_weight_g / 100.0) * fiber
         
         return {
             "calories_per_dollar": total_calories / price,
             "protein_per_dollar": total_protein / price,
+            "fiber_per_dollar": total_fiber / price,
             "price_per_100g": price / (unit_weight_g / 100.0)
         }
 
+    @staticmethod
+    def calculate_metrics_batch(
+        prices: Sequence[float],
+        unit_weights_g: Sequence[float],
+        calories: Sequence[float],
+        protein: Sequence[float],
+        fiber: Sequence[float] = None,
+    ) -> Dict[str, np.ndarray]:
+        """
+        Column-wise calculate_metrics for many items at once. Each argument is one
+        value per item (nutrients per 100g, already numeric; see nutrient_column).
+
+        Returns float arrays keyed like calculate_metrics, plus a boolean `valid`
+        mask. Rows calculate_metrics would return {} for (price missing, NaN or
+        <= 0) are NaN in every metric, as is price_per_100g for a zero weight.
+        """
+        price = np.asarray(prices, dtype=np.float64)
+        servings = np.asarray(unit_weights_g, dtype=np.float64) / 100.0
+        calories = np.nan_to_num(np.asarray(calories, dtype=np.float64))
+        protein = np.nan_to_num(np.asarray(protein, dtype=np.float64))
+        fiber = np.zeros_like(price) if fiber is None else np.nan_to_num(np.asarray(fiber, dtype=np.float64))
+
+        valid = price > 0  # False for NaN too
+        safe_price = np.where(valid, price, 1.0)
+        has_weight = valid & (servings > 0)
+        safe_servings = np.where(has_weight, servings, 1.0)
+
+        return {
+            "calories_per_dollar": np.where(valid, servings * calories / safe_price, np.nan),
+            "protein_per_dollar": np.where(valid, servings * protein / safe_price, np.nan),
+            "fiber_per_dollar": np.where(valid, servings * fiber / safe_price, np.nan),
+            "price_per_100g": np.where(has_weight, price / safe_servings, np.nan),
+            "valid": valid,
+        }
+
+    @staticmethod
+    def opportunity_cost_matrix(
+        ff_prices: Sequence[float],
+        ff_calories: Sequence[float],
+        ff_protein: Sequence[float],
+        calories_per_dollar: Sequence[float],
+        protein_per_dollar: Sequence[float],
+        price_per_100g: Sequence[float],
+    ) -> Dict[str, np.ndarray]:
+        """
+        calculate_opportunity_cost for every (fast food item, benchmark) pair at once.
+        The first three arguments are one value per item, the last three one per
+        benchmark; every returned array is shaped (items, benchmarks).
+        Pairs calculate_opportunity_cost would return {} for (price <= 0) are NaN.
+        """
+        price = np.asarray(ff_prices, dtype=np.float64)[:, None]
+        ff_cal = np.nan_to_num(np.asarray(ff_calories, dtype=np.float64))[:, None]
+        ff_prot = np.nan_to_num(np.asarray(ff_protein, dtype=np.float64))[:, None]
+        cpd = np.nan_to_num(np.asarray(calories_per_dollar, dtype=np.float64))[None, :]
+        ppd = np.nan_to_num(np.asarray(protein_per_dollar, dtype=np.float64))[None, :]
+        pp100 = np.asarray(price_per_100g, dtype=np.float64)[None, :]
+
+        valid = np.broadcast_to(price > 0, (price.shape[0], cpd.shape[1]))
+        alt_cal = np.where(valid, cpd * price, np.nan)
+        alt_prot = np.where(valid, ppd * price, np.nan)
+        has_unit_price = valid & (pp100 > 0)
+        quantity_lbs = np.where(has_unit_price, price / np.where(has_unit_price, pp100, 1.0) * 100 / 453.592, np.nan)
+
+        return {
+            "alt_calories": alt_cal,
+            "alt_protein": alt_prot,
+            "quantity_lbs": quantity_lbs,
+            "calories_multiplier": np.where(ff_cal > 0, alt_cal / np.where(ff_cal > 0, ff_cal, 1.0), np.where(valid, 0.0, np.nan)),
+            "protein_multiplier": np.where(ff_prot > 0, alt_prot / np.where(ff_prot > 0, ff_prot, 1.0), np.where(valid, 0.0, np.nan)),
+            "valid": valid,
+        }
+
     @staticmethod
     def calculate_opportunity_cost(fast_food_item: Dict[str, Any], benchmark: BenchmarkItem) -> Dict[str, Any]:
         """
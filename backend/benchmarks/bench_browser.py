@@ -0,0 +1,50 @@
+"""
+Page load time and page weight per store with the full and the lean browser
+profile, through each scraper's browser tier against the live sites.
+
+The HTTP tier is switched off so every store goes through Chrome. Each store
+is loaded `--rounds` times per profile, full first; the report is
+browser_pool.page_load_stats(). Needs Chrome and network access.
+
+    cd backend && python -m benchmarks.bench_browser --query beans --rounds 2
+"""
+import argparse
+import json
+
+import config
+from scrapers.browser_pool import page_load_stats, shutdown_browser_pools
+from scrapers.menu_snapshot import MenuScraper
+from search_service import STORES
+
+def run(query: str = "beans", rounds: int = 2, stores=None) -> dict:
+    config.HTTP_TIER_ENABLED = False
+    selected = [(store, cls) for store, _, cls in STORES if not stores or store in stores]
+    results = {}
+    for lean in (False, True):
+        config.BROWSER_LEAN = lean
+        for store, cls in selected:
+            scraper = cls()
+            found = 0
+            for _ in range(rounds):
+                if isinstance(scraper, MenuScraper):
+                    snapshot = scraper.refresh_menu()
+                    found = len(snapshot.items) if snapshot else 0
+                else:
+                    found = len(scraper.search(query))
+            results.setdefault(store, {})["lean" if lean else "full"] = found
+        shutdown_browser_pools()
+
+    return {
+        "query": query,
+        "rounds": rounds,
+        "products_found": results,
+        "page_loads": page_load_stats(),
+    }
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--query", default="beans")
+    parser.add_argument("--rounds", type=int, default=2)
+    parser.add_argument("--store", action="append", help="Limit to these stores (repeatable)")
+    args = parser.parse_args()
+    print(json.dumps(run(args.query, args.rounds, args.store), indent=2))
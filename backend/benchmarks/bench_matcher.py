@@ -0,0 +1,68 @@
+"""
+Throughput and top-1 accuracy of product_matcher on synthetic scraped titles.
+
+Candidates are generated product names; each title is a candidate dressed up
+the way store listings are (house brand prefix, size suffix, reordered words).
+
+    cd backend && python -m benchmarks.bench_matcher --candidates 5000 --titles 3000
+"""
+import argparse
+import json
+import random
+import time
+
+from product_matcher import CandidateIndex, clean_title
+from benchmarks.bench_off_index import WORDS
+
+BRAND_PREFIXES = ["Great Value", "Kirkland Signature", "Signature Select", "365 by Whole Foods Market", "Good & Gather", ""]
+SIZE_SUFFIXES = ["12 oz", "16 oz", "1 lb", "2 lbs", "32 fl oz", "500 g", "6 x 12 oz", "12 ct", ""]
+
+def make_corpus(candidates: int, titles: int, seed: int = 11):
+    rng = random.Random(seed)
+    names = set()
+    while len(names) < candidates:
+        names.add(" ".join(rng.sample(WORDS, rng.randint(2, 4))).title())
+    names = sorted(names)
+
+    cases = []
+    for _ in range(titles):
+        idx = rng.randrange(len(names))
+        words = names[idx].split()
+        if len(words) > 2 and rng.random() < 0.3:
+            words[0], words[1] = words[1], words[0]
+        title = f"{rng.choice(BRAND_PREFIXES)} {' '.join(words)}, {rng.choice(SIZE_SUFFIXES)}".strip(", ")
+        cases.append((title, idx))
+    return names, cases
+
+def run(candidates: int = 5000, titles: int = 3000, seed: int = 11) -> dict:
+    names, cases = make_corpus(candidates, titles, seed)
+
+    start = time.perf_counter()
+    index = CandidateIndex(names)
+    build_s = time.perf_counter() - start
+
+    start = time.perf_counter()
+    matches = index.match_batch([title for title, _ in cases])
+    match_s = time.perf_counter() - start
+
+    # A different candidate with identical cleaned words is just as right
+    correct = sum(
+        1 for (_, expected), match in zip(cases, matches)
+        if match is not None and set(clean_title(names[match[0]]).split()) == set(clean_title(names[expected]).split())
+    )
+    return {
+        "candidates": len(names),
+        "titles": len(cases),
+        "index_build_s": round(build_s, 4),
+        "match_s": round(match_s, 4),
+        "titles_per_s": round(len(cases) / match_s, 1) if match_s else 0.0,
+        "top1_accuracy": round(correct / len(cases), 4),
+        "unmatched": sum(1 for m in matches if m is None),
+    }
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--candidates", type=int, default=5000)
+    parser.add_argument("--titles", type=int, default=3000)
+    args = parser.parse_args()
+    print(json.dumps(run(args.candidates, args.titles), indent=2))
@@ -0,0 +1,77 @@
+"""
+Items per second for AnalysisEngine.calculate_metrics (one call per item) versus
+calculate_metrics_batch, and the largest difference between the two.
+
+The batch path is timed twice: on numeric columns alone, and including parsing
+the nutrition dicts into columns with nutrient_column.
+
+    cd backend && python -m benchmarks.bench_metrics --items 100000
+"""
+import argparse
+import json
+import random
+import time
+
+import numpy as np
+
+from analysis_engine import AnalysisEngine, nutrient_column
+
+METRIC_KEYS = ["calories_per_dollar", "protein_per_dollar", "fiber_per_dollar", "price_per_100g"]
+
+def make_items(items: int, seed: int = 13):
+    rng = random.Random(seed)
+    prices, weights, nutritions = [], [], []
+    for _ in range(items):
+        # A few free/unpriced items to exercise the mask
+        prices.append(0.0 if rng.random() < 0.02 else round(rng.uniform(0.5, 15.0), 2))
+        weights.append(rng.choice([340.0, 454.0, 907.0, 2268.0]))
+        nutritions.append({
+            "calories": rng.randint(20, 600),
+            "protein": f"{rng.uniform(0, 30):.1f}g",
+            "fiber": f"{rng.uniform(0, 12):.1f}g" if rng.random() < 0.8 else None,
+        })
+    return prices, weights, nutritions
+
+def run(items: int = 100000, seed: int = 13) -> dict:
+    prices, weights, nutritions = make_items(items, seed)
+
+    start = time.perf_counter()
+    scalar = [AnalysisEngine.calculate_metrics(p, n, w) for p, n, w in zip(prices, nutritions, weights)]
+    scalar_s = time.perf_counter() - start
+
+    start = time.perf_counter()
+    columns = {key: nutrient_column(nutritions, key) for key in ("calories", "protein", "fiber")}
+    parse_s = time.perf_counter() - start
+
+    start = time.perf_counter()
+    batch = AnalysisEngine.calculate_metrics_batch(
+        prices, weights, columns["calories"], columns["protein"], columns["fiber"],
+    )
+    batch_s = time.perf_counter() - start
+
+    max_diff = 0.0
+    for key in METRIC_KEYS:
+        expected = np.array([row.get(key, np.nan) for row in scalar])
+        if not np.array_equal(np.isnan(expected), np.isnan(batch[key])):
+            raise AssertionError(f"{key}: batch and scalar disagree on which items are valid")
+        both = ~np.isnan(expected)
+        if both.any():
+            max_diff = max(max_diff, float(np.max(np.abs(expected[both] - batch[key][both]))))
+
+    return {
+        "items": items,
+        "scalar_s": round(scalar_s, 4),
+        "scalar_items_per_s": round(items / scalar_s, 1) if scalar_s else 0.0,
+        "batch_s": round(batch_s, 4),
+        "batch_items_per_s": round(items / batch_s, 1) if batch_s else 0.0,
+        "batch_with_parse_s": round(parse_s + batch_s, 4),
+        "batch_with_parse_items_per_s": round(items / (parse_s + batch_s), 1) if parse_s + batch_s else 0.0,
+        "invalid_items": int((~batch["valid"]).sum()),
+        "max_abs_diff": max_diff,
+    }
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--items", type=int, default=100000)
+    args = parser.parse_args()
+    print(json.dumps(run(args.items), indent=2))
@@ -0,0 +1,82 @@
+"""
+Import throughput and lookup latency of the local OpenFoodFacts index,
+measured on a synthetic dump so it runs anywhere without the real export.
+
+    cd backend && python -m benchmarks.bench_off_index --products 50000
+"""
+import argparse
+import gzip
+import json
+import os
+import random
+import statistics
+import tempfile
+import time
+
+from off_index import import_dump, OffIndex
+
+WORDS = [
+    "green", "beans", "frozen", "cut", "organic", "black", "lentils", "brown", "rice",
+    "rolled", "oats", "peanut", "butter", "creamy", "chicken", "breast", "tuna", "chunk",
+    "light", "whole", "milk", "wheat", "bread", "spinach", "chopped", "mixed", "vegetables",
+    "carrots", "baby", "eggs", "large", "bananas", "pasta", "tomato", "sauce", "yogurt",
+]
+BRANDS = ["Great Value", "Kirkland", "Signature Select", "365", "Good & Gather", "Trader Joe's", ""]
+
+def write_synthetic_dump(path: str, products: int, seed: int = 7):
+    rng = random.Random(seed)
+    with gzip.open(path, "wt", encoding="utf-8") as f:
+        for i in range(products):
+            name = " ".join(rng.sample(WORDS, rng.randint(2, 5))).title()
+            f.write(json.dumps({
+                "code": f"{i:013d}",
+                "product_name": name,
+                "brands": rng.choice(BRANDS),
+                "serving_size": f"{rng.randint(20, 250)}g",
+                "nutriments": {
+                    "energy-kcal_100g": round(rng.uniform(10, 600), 1),
+                    "proteins_100g": round(rng.uniform(0, 40), 1),
+                    "carbohydrates_100g": round(rng.uniform(0, 80), 1),
+                    "fat_100g": round(rng.uniform(0, 50), 1),
+                    "fiber_100g": round(rng.uniform(0, 15), 1),
+                },
+                # Real export rows carry many more fields we must skip over
+                "ingredients_text": " ".join(rng.choices(WORDS, k=40)),
+            }) + "\n")
+
+def run(products: int = 20000, lookups: int = 2000, seed: int = 7) -> dict:
+    rng = random.Random(seed)
+    with tempfile.TemporaryDirectory() as tmp:
+        dump = os.path.join(tmp, "products.jsonl.gz")
+        db = os.path.join(tmp, "off_index.db")
+        write_synthetic_dump(dump, products, seed)
+
+        stats = import_dump(dump, db)
+        index = OffIndex(db)
+
+        latencies = []
+        for _ in range(lookups):
+            query = " ".join(rng.sample(WORDS, rng.randint(1, 3)))
+            start = time.perf_counter()
+            index.lookup(query)
+            latencies.append((time.perf_counter() - start) * 1000)
+        latencies.sort()
+
+        return {
+            "products": products,
+            "import_rows": stats["rows"],
+            "import_s": stats["elapsed_s"],
+            "import_rows_per_s": stats["rows_per_s"],
+            "fts_rebuild_s": stats["fts_rebuild_s"],
+            "index_mb": round(os.path.getsize(db) / (1024 * 1024), 2),
+            "lookups": lookups,
+            "lookup_p50_ms": round(statistics.median(latencies), 3),
+            "lookup_p95_ms": round(latencies[int(len(latencies) * 0.95) - 1], 3),
+        }
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--products", type=int, default=20000)
+    parser.add_argument("--lookups", type=int, default=2000)
+    args = parser.parse_args()
+    print(json.dumps(run(args.products, args.lookups), indent=2))
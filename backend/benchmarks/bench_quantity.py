@@ -0,0 +1,148 @@
+"""
+Throughput and accuracy of quantity_parser on a corpus of store-style titles.
+
+The corpus is a hand-labelled set of real-looking listings plus synthetic
+titles built from every supported size format, each with its expected net
+grams / ml / count. The old substring heuristic that smart_pantry used
+(default 1lb unless the title says "12 oz", "2 lb", ...) is scored on the
+weight-bearing titles for comparison.
+
+    cd backend && python -m benchmarks.bench_quantity --titles 50000
+"""
+import argparse
+import json
+import random
+import time
+
+from quantity_parser import parse_quantity
+from benchmarks.bench_off_index import WORDS
+
+# (title, grams, ml, count)
+LABELLED = [
+    ("Great Value Frozen Cut Green Beans, 12 oz", 340.19, None, None),
+    ("Great Value Long Grain Brown Rice, 2 lb", 907.18, None, None),
+    ("Quaker Old Fashioned Rolled Oats, 42 oz Canister", 1190.68, None, None),
+    ("Great Value Large White Eggs, 12 Count", None, None, 12),
+    ("Lucerne Whole Milk 1 Gallon", None, 3785.41, None),
+    ("Horizon Organic Whole Milk, Half Gallon, 64 fl oz", None, 1892.70, None),
+    ("Coca-Cola Soda, 12 pk, 12 fl oz Cans", None, 4258.58, None),
+    ("Pepsi Cola 6 x 16.9 fl oz Bottles", None, 2998.75, None),
+    ("StarKist Chunk Light Tuna in Water, 5 oz Can", 141.75, None, None),
+    ("Jif Creamy Peanut Butter, 40 oz", 1133.98, None, None),
+    ("Dave's Killer Bread 21 Whole Grains, 27 oz Loaf", 765.44, None, None),
+    ("Fresh Banana, Each", None, None, 1),
+    ("Marketside Fresh Carrots, 2 lb Bag", 907.18, None, None),
+    ("Kirkland Signature Chicken Breast, 6.5 lbs", 2948.35, None, None),
+    ("Goya Dry Lentils 16 oz", 453.59, None, None),
+    ("365 by Whole Foods Market Black Beans, 15.5 OZ", 439.42, None, None),
+    ("Barilla Spaghetti Pasta 1 lb", 453.59, None, None),
+    ("Fiji Natural Artesian Water 1.5L", None, 1500.0, None),
+    ("Bertolli Extra Virgin Olive Oil, 500 ml", None, 500.0, None),
+    ("Kirkland Signature Organic Quinoa, 4.5 lbs", 2041.16, None, None),
+    ("Chobani Greek Yogurt Variety Pack of 12", None, None, 12),
+    ("Lay's Classic Potato Chips 1 oz, Pack of 40", 1134.0, None, None),
+    ("Good & Gather Frozen Spinach 12oz", 340.19, None, None),
+    ("Trader Joe's Rolled Oats 1 kg", 1000.0, None, None),
+    ("Signature Select Mixed Vegetables 16-oz", 453.59, None, None),
+    ("Simply Orange Pulp Free 52 fl. oz.", None, 1537.82, None),
+    ("Market Pantry Whole Wheat Bread - 20oz", 566.99, None, None),
+    ("Eggland's Best Large Eggs 18 ct", None, None, 18),
+    ("Bob's Red Mill Steel Cut Oats 24 ounce", 680.39, None, None),
+    ("Great Value 2% Reduced Fat Milk, 1/2 gal", None, 1892.71, None),
+    ("Dozen Large Grade A Eggs 1 dozen", None, None, 12),
+    ("Vital Farms Pasture-Raised Eggs", None, None, None),
+    ("Organic Bananas", None, None, None),
+    ("Jasmine Rice 25 lb", 11339.8, None, None),
+    ("Heinz Tomato Ketchup 32 oz", 907.18, None, None),
+    ("LaCroix Sparkling Water 8 x 12 fl oz", None, 2839.06, None),
+    ("Spindrift Lemon 2,000 ml", None, 2000.0, None),
+    ("Planters Dry Roasted Peanuts 1.5 kg", 1500.0, None, None),
+    ("Signature Farms Chicken Thighs 3.5 pounds", 1587.57, None, None),
+    ("Whole Foods Carrots 2 quarts", None, 1892.71, None),
+]
+
+# Synthetic formats: (template, grams per amount, ml per amount)
+FORMATS = [
+    ("{a} oz", 28.3495, None), ("{a}oz", 28.3495, None), ("{a} OZ", 28.3495, None),
+    ("{a} lb", 453.592, None), ("{a} lbs", 453.592, None), ("{a}-lb", 453.592, None),
+    ("{a} g", 1.0, None), ("{a}g", 1.0, None), ("{a} kg", 1000.0, None),
+    ("{a} fl oz", None, 29.5735), ("{a} fl. oz.", None, 29.5735),
+    ("{a} ml", None, 1.0), ("{a} L", None, 1000.0), ("{a} gal", None, 3785.41),
+]
+
+def make_corpus(titles: int, seed: int = 17):
+    rng = random.Random(seed)
+    corpus = list(LABELLED)
+    while len(corpus) < titles:
+        words = " ".join(rng.sample(WORDS, rng.randint(2, 4))).title()
+        template, grams, ml = rng.choice(FORMATS)
+        amount = rng.choice([1, 2, 5, 8, 12, 16, 24, 32, 1.5, 2.25, 15.5])
+        size = template.format(a=amount)
+        packs = rng.choice([None, None, None, 6, 12])
+        if packs:
+            size = f"{packs} x {size}"
+        factor = (packs or 1) * amount
+        corpus.append((
+            f"{words}, {size}",
+            factor * grams if grams else None,
+            factor * ml if ml else None,
+            None,
+        ))
+    return corpus
+
+def legacy_estimate_weight_g(name: str) -> float:
+    # smart_pantry's estimator before quantity_parser
+    estimated_weight_g = 454.0
+    name_lower = name.lower()
+    if '12 oz' in name_lower: estimated_weight_g = 340.0
+    if '16 oz' in name_lower or '1 lb' in name_lower: estimated_weight_g = 454.0
+    if '32 oz' in name_lower or '2 lb' in name_lower: estimated_weight_g = 907.0
+    if '5 lb' in name_lower: estimated_weight_g = 2268.0
+    return estimated_weight_g
+
+def _close(actual, expected, tolerance=0.01):
+    if expected is None:
+        return actual is None
+    return actual is not None and abs(actual - expected) <= tolerance * expected
+
+def run(titles: int = 50000, seed: int = 17) -> dict:
+    corpus = make_corpus(titles, seed)
+
+    start = time.perf_counter()
+    parsed = [parse_quantity(title) for title, _, _, _ in corpus]
+    parse_s = time.perf_counter() - start
+
+    correct = 0
+    for (_, grams, ml, count), size in zip(corpus, parsed):
+        size_grams, size_ml, size_count = size if size else (None, None, None)
+        if _close(size_grams, grams) and _close(size_ml, ml) and _close(size_count, count):
+            correct += 1
+
+    labelled_correct = 0
+    for (_, grams, ml, count), size in zip(LABELLED, parsed):
+        size_grams, size_ml, size_count = size if size else (None, None, None)
+        if _close(size_grams, grams) and _close(size_ml, ml) and _close(size_count, count):
+            labelled_correct += 1
+
+    weighted = [(title, grams) for title, grams, _, _ in corpus if grams]
+    legacy_correct = sum(1 for title, grams in weighted if _close(legacy_estimate_weight_g(title), grams, 0.02))
+    parser_weight_correct = sum(
+        1 for title, grams in weighted if _close((parse_quantity(title) or (None,))[0], grams, 0.02)
+    )
+
+    return {
+        "titles": len(corpus),
+        "parse_s": round(parse_s, 4),
+        "titles_per_s": round(len(corpus) / parse_s, 1) if parse_s else 0.0,
+        "accuracy": round(correct / len(corpus), 4),
+        "labelled_accuracy": round(labelled_correct / len(LABELLED), 4),
+        "weight_titles": len(weighted),
+        "weight_accuracy": round(parser_weight_correct / len(weighted), 4) if weighted else 0.0,
+        "legacy_weight_accuracy": round(legacy_correct / len(weighted), 4) if weighted else 0.0,
+    }
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--titles", type=int, default=50000)
+    args = parser.parse_args()
+    print(json.dumps(run(args.titles), indent=2))
@@ -0,0 +1,356 @@
+"""
+Offline benchmark suite: store parsers, /api/search end to end, and AnalysisEngine.
+Nothing leaves the machine, so runs are comparable between commits.
+
+- parsers: each store's fixture page in benchmarks/fixtures/ through the
+  scraper's own parse_html (its ExtractionSpec / __NEXT_DATA__ code).
+- search: /api/search through the FastAPI test client against a migrated temp
+  database. Store pages come from a local server replaying the fixtures, and
+  nutrition from a local OpenFoodFacts stub. First request per query (cold
+  result cache) and repeats (warm) are reported separately.
+- analysis: calculate_metrics and calculate_opportunity_cost, one call per item,
+  next to their batch counterparts, on synthetic data.
+
+The fixtures are synthetic: hand-written pages shaped to each scraper's
+selectors, not captures of the stores' sites. They time our parsing and catch
+our regressions, not store markup changes. `python debug_scraper.py "<store>"`
+replaces one with a live capture.
+
+    cd backend && python -m benchmarks.bench_suite --output bench.json
+    cd backend && python -m benchmarks.bench_suite --compare bench.json   # exit 1 on regressions
+"""
+import os
+import tempfile
+
+# App modules read their settings at import time, so the offline environment
+# has to be in place before the first of them is imported.
+_WORKDIR = tempfile.mkdtemp(prefix="cheapnut-bench-")
+os.environ.update({
+    "CHEAPNUT_DATABASE_URL": f"sqlite:///{os.path.join(_WORKDIR, 'cheapnut.db')}",
+    "CHEAPNUT_OFF_INDEX_PATH": os.path.join(_WORKDIR, "no_off_index.db"),
+    "CHEAPNUT_RESULT_CACHE_DB_PATH": "",
+    "CHEAPNUT_OPENFOODFACTS_RATE_PER_S": "10000",
+    "CHEAPNUT_OPENFOODFACTS_BURST": "10000",
+    "CHEAPNUT_BROWSER_POOL_PREWARM": "0",
+    "CHEAPNUT_MENU_SCHEDULER": "0",
+    "CHEAPNUT_HTTP_TIER_ENABLED": "1",
+})
+
+import argparse
+import hashlib
+import json
+import logging
+import platform
+import random
+import statistics
+import subprocess
+import sys
+import threading
+import time
+from datetime import datetime, timezone
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, quote_plus, urlparse
+
+import numpy as np
+
+import config
+from analysis_engine import AnalysisEngine, nutrient_column
+from models import BenchmarkItem
+from benchmarks import bench_metrics
+from debug_scraper import FIXTURES_DIR, fixture_name
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+QUERIES = ["green beans", "chicken", "brown rice", "oats", "eggs", "milk", "peanut butter", "burger"]
+
+def load_fixtures() -> dict:
+    from search_service import STORES
+    fixtures = {}
+    for store, _, _ in STORES:
+        with open(os.path.join(FIXTURES_DIR, fixture_name(store) + ".html"), encoding="utf-8") as f:
+            fixtures[store] = f.read()
+    return fixtures
+
+def _summary_ms(samples) -> dict:
+    if not samples:
+        return {"n": 0}
+    ordered = sorted(samples)
+    return {
+        "n": len(ordered),
+        "mean_ms": round(statistics.mean(ordered) * 1000, 3),
+        "p50_ms": round(ordered[len(ordered) // 2] * 1000, 3),
+        "p95_ms": round(ordered[max(0, -(-len(ordered) * 95 // 100) - 1)] * 1000, 3),
+        "max_ms": round(ordered[-1] * 1000, 3),
+    }
+
+# --- parsers ---
+
+def bench_parsers(rounds: int = 50) -> dict:
+    from search_service import STORES
+    fixtures = load_fixtures()
+    report = {}
+    for store, _, cls in STORES:
+        scraper = cls()
+        html = fixtures[store]
+        products = scraper.parse_html(html)
+        samples = []
+        for _ in range(rounds):
+            start = time.perf_counter()
+            scraper.parse_html(html)
+            samples.append(time.perf_counter() - start)
+        report[store] = {
+            "products": len(products),
+            "priced": sum(1 for p in products if p["price"]),
+            "page_kb": round(len(html.encode()) / 1024, 1),
+            **_summary_ms(samples),
+        }
+    return report
+
+# --- search end to end ---
+
+def _off_products(terms: str) -> list:
+    """Three deterministic OpenFoodFacts-shaped candidates for a search."""
+    seed = int(hashlib.sha1(terms.encode()).hexdigest()[:8], 16)
+    rng = random.Random(seed)
+    return [{
+        "product_name": name,
+        "serving_size": "100g",
+        "nutriments": {
+            "energy-kcal_100g": round(rng.uniform(20, 600), 1),
+            "proteins_100g": round(rng.uniform(0, 30), 1),
+            "carbohydrates_100g": round(rng.uniform(0, 80), 1),
+            "fat_100g": round(rng.uniform(0, 40), 1),
+            "fiber_100g": round(rng.uniform(0, 12), 1),
+        },
+    } for name in (terms.title(), f"{terms.title()} Organic", f"Store Brand {terms.title()}")]
+
+def start_stub_server(fixtures: dict) -> ThreadingHTTPServer:
+    """Serves /stores/<store>.html from the fixtures and OpenFoodFacts' /cgi/search.pl."""
+    pages = {fixture_name(store): html.encode() for store, html in fixtures.items()}
+
+    class Handler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            url = urlparse(self.path)
+            if url.path == "/cgi/search.pl":
+                terms = parse_qs(url.query).get("search_terms", [""])[0]
+                body, content_type = json.dumps({"products": _off_products(terms)}).encode(), "application/json"
+            elif url.path.startswith("/stores/") and url.path[len("/stores/"):-len(".html")] in pages:
+                body, content_type = pages[url.path[len("/stores/"):-len(".html")]], "text/html; charset=utf-8"
+            else:
+                self.send_error(404)
+                return
+            self.send_response(200)
+            self.send_header("Content-Type", content_type)
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, *args):
+            pass
+
+    server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+    threading.Thread(target=server.serve_forever, name="bench-stub", daemon=True).start()
+    return server
+
+def _migrate():
+    from alembic import command
+    from alembic.config import Config
+    alembic_cfg = Config(os.path.join(BACKEND_DIR, "alembic.ini"))
+    alembic_cfg.set_main_option("script_location", os.path.join(BACKEND_DIR, "alembic"))
+    command.upgrade(alembic_cfg, "head")
+    logging.getLogger().setLevel(logging.ERROR)  # alembic.ini's logging config is chatty
+
+def _point_scrapers_at(base_url: str):
+    """The shared scrapers, fetching their fixture page instead of the store's site."""
+    import search_service
+    from scrapers.menu_snapshot import MenuScraper
+    from scrapers.result_cache import CachedScraper
+
+    scrapers = search_service.build_scrapers()
+    for store, _, scraper in scrapers:
+        inner = scraper.scraper if isinstance(scraper, CachedScraper) else scraper
+        page = f"{base_url}/stores/{fixture_name(store)}.html"
+        if isinstance(inner, MenuScraper):
+            inner.menu_url = page
+        else:
+            inner.search_url = lambda query, page=page: f"{page}?q={quote_plus(query)}"
+    with search_service._scrapers_lock:
+        search_service._scrapers = scrapers
+
+def bench_search(rounds: int = 5) -> dict:
+    server = start_stub_server(load_fixtures())
+    base_url = f"http://127.0.0.1:{server.server_address[1]}"
+    config.OPENFOODFACTS_URL = base_url
+    try:
+        _migrate()
+        _point_scrapers_at(base_url)
+
+        from fastapi.testclient import TestClient
+        import main
+
+        cold, warm = [], []
+        store_elapsed, tiers, errors, items, pending = {}, {}, 0, [], 0
+        with TestClient(main.app) as client:
+            for phase in range(rounds + 1):
+                for query in QUERIES:
+                    start = time.perf_counter()
+                    response = client.get("/api/search", params={"q": query})
+                    elapsed = time.perf_counter() - start
+                    response.raise_for_status()
+                    body = response.json()
+                    (cold if phase == 0 else warm).append(elapsed)
+                    items.append(len(body["grocery"]) + len(body["fastfood"]))
+                    errors += len(body["errors"])
+                    pending += body["enrichment"]["pending_items"]
+                    for store, seconds in body["timings"].items():
+                        store_elapsed.setdefault(store, []).append(seconds)
+                    for store, tier in body["tiers"].items():
+                        counts = tiers.setdefault(store, {})
+                        counts[str(tier)] = counts.get(str(tier), 0) + 1
+    finally:
+        server.shutdown()
+
+    return {
+        "queries": len(QUERIES),
+        "rounds": rounds,
+        "cold": _summary_ms(cold),
+        "warm": _summary_ms(warm),
+        "warm_requests_per_s": round(len(warm) / sum(warm), 1) if warm else 0.0,
+        "items_per_response": round(statistics.mean(items), 1) if items else 0.0,
+        "store_errors": errors,
+        "nutrition_pending_items": pending,
+        "stores": {
+            store: {"mean_ms": round(statistics.mean(samples) * 1000, 3), "tiers": tiers.get(store, {})}
+            for store, samples in store_elapsed.items()
+        },
+    }
+
+# --- analysis ---
+
+def bench_analysis(items: int = 100000, fast_food: int = 2000, benchmarks: int = 15, seed: int = 29) -> dict:
+    metrics = bench_metrics.run(items)
+
+    rng = random.Random(seed)
+    offers = [{
+        "price": round(rng.uniform(1.0, 12.0), 2),
+        "nutrition": {"calories": rng.randint(150, 1200), "protein": f"{rng.uniform(2, 45):.1f}g"},
+    } for _ in range(fast_food)]
+    staples = [BenchmarkItem(
+        name=f"Staple {i}",
+        calories_per_dollar=rng.uniform(200, 3000),
+        protein_per_dollar=rng.uniform(5, 120),
+        price_per_100g=rng.uniform(0.1, 2.0),
+    ) for i in range(benchmarks)]
+
+    start = time.perf_counter()
+    for offer in offers:
+        for staple in staples:
+            AnalysisEngine.calculate_opportunity_cost(offer, staple)
+    scalar_s = time.perf_counter() - start
+
+    start = time.perf_counter()
+    nutritions = [offer["nutrition"] for offer in offers]
+    AnalysisEngine.opportunity_cost_matrix(
+        [offer["price"] for offer in offers],
+        nutrient_column(nutritions, "calories"),
+        nutrient_column(nutritions, "protein"),
+        [s.calories_per_dollar for s in staples],
+        [s.protein_per_dollar for s in staples],
+        [s.price_per_100g for s in staples],
+    )
+    matrix_s = time.perf_counter() - start
+
+    pairs = fast_food * benchmarks
+    return {
+        "metrics": metrics,
+        "opportunity_cost": {
+            "pairs": pairs,
+            "scalar_s": round(scalar_s, 4),
+            "scalar_pairs_per_s": round(pairs / scalar_s, 1) if scalar_s else 0.0,
+            "matrix_s": round(matrix_s, 4),
+            "matrix_pairs_per_s": round(pairs / matrix_s, 1) if matrix_s else 0.0,
+        },
+    }
+
+# --- report ---
+
+def _git_commit() -> str:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], cwd=BACKEND_DIR, capture_output=True, text=True, timeout=10,
+        ).stdout.strip()
+    except Exception:
+        return ""
+
+def run(sections=("parsers", "search", "analysis"), parser_rounds: int = 50, search_rounds: int = 5,
+        analysis_items: int = 100000) -> dict:
+    report = {
+        "meta": {
+            "commit": _git_commit(),
+            "timestamp": datetime.now(timezone.utc).isoformat(),
+            "python": platform.python_version(),
+            "numpy": np.__version__,
+            "platform": platform.platform(),
+        },
+    }
+    if "parsers" in sections:
+        report["parsers"] = bench_parsers(parser_rounds)
+    if "search" in sections:
+        report["search"] = bench_search(search_rounds)
+    if "analysis" in sections:
+        report["analysis"] = bench_analysis(analysis_items)
+    return report
+
+def _flatten(node, prefix=""):
+    if isinstance(node, dict):
+        for key, value in node.items():
+            yield from _flatten(value, f"{prefix}.{key}" if prefix else key)
+    elif isinstance(node, (int, float)) and not isinstance(node, bool):
+        yield prefix, float(node)
+
+def compare(baseline: dict, current: dict, threshold: float = 0.2) -> list:
+    """
+    Timings (`*_ms`, `*_s`) that got slower, and throughputs (`*_per_s`) that
+    dropped, by more than `threshold` relative to the baseline report.
+    """
+    before = dict(_flatten({k: v for k, v in baseline.items() if k != "meta"}))
+    regressions = []
+    for key, value in _flatten({k: v for k, v in current.items() if k != "meta"}):
+        old = before.get(key)
+        if not old:
+            continue
+        if key.endswith("_per_s"):
+            change = (old - value) / old
+        elif key.endswith("_ms") or key.endswith("_s"):
+            change = (value - old) / old
+        else:
+            continue
+        if change > threshold:
+            regressions.append({"metric": key, "baseline": old, "current": value, "worse_by": round(change, 3)})
+    return regressions
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--only", action="append", choices=["parsers", "search", "analysis"],
+                        help="Run just these sections (repeatable)")
+    parser.add_argument("--parser-rounds", type=int, default=50)
+    parser.add_argument("--search-rounds", type=int, default=5)
+    parser.add_argument("--analysis-items", type=int, default=100000)
+    parser.add_argument("--output", help="Also write the JSON report to this file")
+    parser.add_argument("--compare", help="Baseline report to check for regressions")
+    parser.add_argument("--threshold", type=float, default=0.2, help="Relative slowdown that counts as a regression")
+    args = parser.parse_args()
+
+    report = run(tuple(args.only or ("parsers", "search", "analysis")),
+                 args.parser_rounds, args.search_rounds, args.analysis_items)
+    if args.compare:
+        with open(args.compare, encoding="utf-8") as f:
+            report["regressions"] = compare(json.load(f), report, args.threshold)
+
+    text = json.dumps(report, indent=2)
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            f.write(text + "\n")
+    print(text)
+    if report.get("regressions"):
+        sys.exit(1)
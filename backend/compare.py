@@ -0,0 +1,103 @@
+from typing import Dict, Any, List, Optional, Tuple, Union
+import numpy as np
+
+from sqlalchemy.orm import Session
+import crud
+from analysis_engine import AnalysisEngine, nutrient_column
+from leaderboard import leaderboard_cache
+
+# Which matrix ranks the alternatives for each metric
+RANK_BY = {
+    "protein": "alt_protein",
+    "calories": "alt_calories",
+}
+
+def resolve_offer(db: Session, entry: Union[str, Dict[str, Any]]) -> Tuple[Optional[Dict[str, Any]], str]:
+    """
+    Returns (offer, source). Offers passed in are used as-is ("request"); names
+    are matched against restaurant offers already scraped into `items` ("cache").
+    Never scrapes: (None, "missing") if nothing has been cached under that name.
+    """
+    if isinstance(entry, dict):
+        return dict(entry), "request"
+    rows = crud.search_items(db, entry, limit=1, item_type="restaurant")
+    if not rows:
+        return None, "missing"
+    row = rows[0]
+    return {
+        "name": row.name,
+        "price": row.price,
+        "store": row.store_name,
+        "nutrition": row.nutrition_data or {},
+    }, "cache"
+
+def compare_batch(
+    db: Session,
+    entries: List[Union[str, Dict[str, Any]]],
+    metric: str = "protein",
+    top_k: int = 5,
+) -> Dict[str, Any]:
+    """
+    Compares every fast food item against every BenchmarkItem in one vectorized
+    pass and returns, per item, the `top_k` benchmarks that would have bought the
+    most `metric` for the same money. Each alternative has the fields of
+    AnalysisEngine.calculate_opportunity_cost plus the benchmark's `store`.
+    An item that wasn't found, or has no price, gets an empty `alternatives` list.
+    """
+    rank_key = RANK_BY.get(metric, RANK_BY["protein"])
+    benchmarks = [b for b in leaderboard_cache.benchmarks(db) if b["price_per_100g"]]
+
+    resolved = [resolve_offer(db, entry) for entry in entries]
+    found = [(i, offer) for i, (offer, _) in enumerate(resolved) if offer is not None]
+    offers = [offer for _, offer in found]
+    nutritions = [offer.get("nutrition") or {} for offer in offers]
+
+    matrix = None
+    if offers and benchmarks:
+        matrix = AnalysisEngine.opportunity_cost_matrix(
+            [offer.get("price") or 0 for offer in offers],
+            nutrient_column(nutritions, "calories"),
+            nutrient_column(nutritions, "protein"),
+            [b["calories_per_dollar"] or 0 for b in benchmarks],
+            [b["protein_per_dollar"] or 0 for b in benchmarks],
+            [b["price_per_100g"] for b in benchmarks],
+        )
+
+    results = []
+    for entry, (offer, source) in zip(entries, resolved):
+        results.append({
+            "query": entry if isinstance(entry, str) else entry.get("name"),
+            "source": source,
+            "item": offer,
+            "alternatives": [],
+        })
+
+    if matrix is not None:
+        ranking = np.argsort(-np.nan_to_num(matrix[rank_key], nan=-np.inf), axis=1, kind="stable")[:, :top_k]
+        for row, (i, offer) in enumerate(found):
+            ff_cal = float(nutrient_column([nutritions[row]], "calories")[0])
+            ff_prot = float(nutrient_column([nutritions[row]], "protein")[0])
+            for col in ranking[row]:
+                if not matrix["valid"][row, col]:
+                    continue
+                results[i]["alternatives"].append({
+                    "cost": offer.get("price"),
+                    "comparison_item": benchmarks[col]["name"],
+                    "store": benchmarks[col]["store"],
+                    "fast_food_metrics": {"calories": ff_cal, "protein": ff_prot},
+                    "benchmark_potential": {
+                        "calories": float(matrix["alt_calories"][row, col]),
+                        "protein": float(matrix["alt_protein"][row, col]),
+                        "quantity_lbs": float(matrix["quantity_lbs"][row, col]),
+                    },
+                    "multipliers": {
+                        "calories": float(matrix["calories_multiplier"][row, col]),
+                        "protein": float(matrix["protein_multiplier"][row, col]),
+                    },
+                })
+
+    return {
+        "metric": metric if metric in RANK_BY else "protein",
+        "benchmarks": len(benchmarks),
+        "results": results,
+    }
@@ -1,6 +1,15 @@
 from sqlalchemy.orm import Session
+from sqlalchemy import func, select, text, tuple_
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.exc import OperationalError, ProgrammingError
+from typing import List, Dict, Any
+import logging
+import re
 import models, schemas
 
+# Rows per INSERT statement when upserting, to stay under SQLite's bound-parameter limit
+UPSERT_CHUNK_SIZE = 500
+
 def get_item(db: Session, item_id: int):
     return db.query(models.Item).filter(models.Item.id == item_id).first()
 
@@ -14,5 +23,166 @@ def create_item(db: Session, item: schemas.ItemCreate):
     db.refresh(db_item)
     return db_item
 
-def search_items(db: Session, query: str):
-    return db.query(models.Item).filter(models.Item.name.ilike(f"%{query}%")).all()
+def _offer_row(offer: Dict[str, Any]) -> Dict[str, Any]:
+    """Maps a scraper ProductInfo dict onto `items` columns."""
+    return {
+        "name": offer["name"],
+        "item_type": offer.get("type"),
+        "store_name": offer.get("store"),
+        "price": offer.get("price"),
+        "unit": offer.get("unit"),
+        "quantity": offer.get("quantity"),
+        "nutrition_data": offer.get("nutrition") or None,
+        "net_grams": offer.get("net_grams"),
+        "net_ml": offer.get("net_ml"),
+        "pack_count": offer.get("pack_count"),
+        "price_per_100g": offer.get("price_per_100g"),
+        "price_per_100ml": offer.get("price_per_100ml"),
+    }
+
+def upsert_items(db: Session, offers: List[Dict[str, Any]]) -> int:
+    """
+    Writes scraped offers to `items` in a single transaction, inserting new
+    (store, name) pairs and updating price/unit/nutrition on existing ones.
+    Nutrition already on file is kept when the new offer has none.
+    Returns the number of offers written.
+
+    SQLite and Postgres use a native INSERT ... ON CONFLICT; other databases
+    fall back to loading the existing rows per chunk and merging in Python.
+    """
+    rows = {}
+    for offer in offers:
+        if offer.get("name") and offer.get("store"):
+            rows[(offer["store"], offer["name"])] = _offer_row(offer)  # last one wins
+    if not rows:
+        return 0
+    rows = list(rows.values())
+
+    dialect = db.bind.dialect.name
+    if dialect == "sqlite":
+        from sqlalchemy.dialects.sqlite import insert
+    elif dialect == "postgresql":
+        from sqlalchemy.dialects.postgresql import insert
+    else:
+        return _merge_items(db, rows)
+
+    table = models.Item.__table__
+    for start in range(0, len(rows), UPSERT_CHUNK_SIZE):
+        stmt = insert(table).values(rows[start:start + UPSERT_CHUNK_SIZE])
+        stmt = stmt.on_conflict_do_update(
+            index_elements=["store_name", "name"],
+            set_={
+                "item_type": stmt.excluded.item_type,
+                "price": stmt.excluded.price,
+                "unit": stmt.excluded.unit,
+                "quantity": func.coalesce(stmt.excluded.quantity, table.c.quantity),
+                "nutrition_data": func.coalesce(stmt.excluded.nutrition_data, table.c.nutrition_data),
+                "net_grams": stmt.excluded.net_grams,
+                "net_ml": stmt.excluded.net_ml,
+                "pack_count": stmt.excluded.pack_count,
+                "price_per_100g": stmt.excluded.price_per_100g,
+                "price_per_100ml": stmt.excluded.price_per_100ml,
+                "updated_at": func.now(),
+            },
+        )
+        db.execute(stmt)
+    db.commit()
+    return len(rows)
+
+def _merge_items(db: Session, rows: List[Dict[str, Any]]) -> int:
+    """Portable upsert: one SELECT per chunk for the existing offers, then update or add each row."""
+    for start in range(0, len(rows), UPSERT_CHUNK_SIZE):
+        chunk = rows[start:start + UPSERT_CHUNK_SIZE]
+        keys = [(row["store_name"], row["name"]) for row in chunk]
+        existing = {
+            (item.store_name, item.name): item
+            for item in db.query(models.Item).filter(tuple_(models.Item.store_name, models.Item.name).in_(keys))
+        }
+        for row in chunk:
+            item = existing.get((row["store_name"], row["name"]))
+            if item is None:
+                db.add(models.Item(**row))
+                continue
+            for column, value in row.items():
+                # Like the native path: keep quantity and nutrition already on file when the offer has none
+                if value is None and column in ("quantity", "nutrition_data"):
+                    continue
+                setattr(item, column, value)
+    db.commit()
+    return len(rows)
+
+def _best_value_select(per: str, item_type: str, limit: int, offset: int):
+    column = models.Item.price_per_100ml if per == "ml" else models.Item.price_per_100g
+    stmt = select(models.Item).where(column.isnot(None))
+    if item_type:
+        stmt = stmt.where(models.Item.item_type == item_type)
+    return stmt.order_by(column.asc(), models.Item.id).offset(offset).limit(limit)
+
+def best_value_items(db: Session, per: str = "g", item_type: str = None, limit: int = 20, offset: int = 0):
+    """Cheapest offers per 100g (or per 100ml with per="ml"), straight off the indexed unit-price column."""
+    return db.execute(_best_value_select(per, item_type, limit, offset)).scalars().all()
+
+async def best_value_items_async(db: AsyncSession, per: str = "g", item_type: str = None, limit: int = 20, offset: int = 0):
+    """best_value_items on an async session, for endpoints that shouldn't hold a threadpool worker."""
+    result = await db.execute(_best_value_select(per, item_type, limit, offset))
+    return result.scalars().all()
+
+def _fts5_match(query: str) -> str:
+    # Every token quoted (so punctuation can't break the syntax) and prefix-matched
+    tokens = re.findall(r"\w+", query.lower())
+    return " AND ".join(f'"{t}"*' for t in tokens)
+
+def search_items(db: Session, query: str, limit: int = 20, offset: int = 0, item_type: str = None):
+    """
+    Full-text search over item names, best match first, optionally only one item_type.
+    Uses FTS5 on SQLite and the tsvector GIN index on Postgres; falls back to a
+    substring scan if the index hasn't been created (see alembic migrations).
+    """
+    dialect = db.bind.dialect.name
+    try:
+        if dialect == "sqlite":
+            match = _fts5_match(query)
+            if not match:
+                return []
+            stmt = text(
+                "SELECT items.* FROM items_fts JOIN items ON items.id = items_fts.rowid "
+                "WHERE items_fts MATCH :match "
+                "AND (:item_type IS NULL OR items.item_type = :item_type) "
+                "ORDER BY bm25(items_fts), items.id "
+                "LIMIT :limit OFFSET :offset"
+            )
+            return (
+                db.query(models.Item)
+                .from_statement(stmt)
+                .params(match=match, item_type=item_type, limit=limit, offset=offset)
+                .all()
+            )
+        if dialect == "postgresql":
+            tsv = func.to_tsvector("english", func.coalesce(models.Item.name, ""))
+            tsq = func.plainto_tsquery("english", query)
+            q = db.query(models.Item)
+            if item_type:
+                q = q.filter(models.Item.item_type == item_type)
+            return (
+                q
+                .filter(tsv.op("@@")(tsq))
+                .order_by(func.ts_rank(tsv, tsq).desc(), models.Item.id)
+                .offset(offset)
+                .limit(limit)
+                .all()
+            )
+    except (OperationalError, ProgrammingError) as e:
+        logging.warning(f"Full-text item search unavailable, falling back to a scan: {e}")
+        db.rollback()
+
+    q = db.query(models.Item)
+    if item_type:
+        q = q.filter(models.Item.item_type == item_type)
+    return (
+        q
+        .filter(models.Item.name.ilike(f"%{query}%"))
+        .order_by(models.Item.id)
+        .offset(offset)
+        .limit(limit)
+        .all()
+    )
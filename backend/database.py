@@ -1,14 +1,57 @@
-from sqlalchemy import create_engine
+from sqlalchemy import create_engine, event
+from sqlalchemy.engine import make_url
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import sessionmaker
-import os
+from typing import Any, Dict
+import threading
 
-# Use SQLite for local development
-SQLALCHEMY_DATABASE_URL = "sqlite:///./cheapnut.db"
+import config
+
+# SQLite file for local development unless CHEAPNUT_DATABASE_URL points elsewhere
+# (e.g. the Postgres from docker-compose.yml). The schema comes from `alembic upgrade head`.
+SQLALCHEMY_DATABASE_URL = config.DATABASE_URL
+
+# Async drivers for each sync URL scheme
+_ASYNC_DRIVERS = {
+    "sqlite": "sqlite+aiosqlite",
+    "postgresql": "postgresql+asyncpg",
+}
+
+def _is_sqlite(url: str) -> bool:
+    return make_url(url).get_backend_name() == "sqlite"
+
+def _engine_kwargs(url: str) -> Dict[str, Any]:
+    parsed = make_url(url)
+    kwargs: Dict[str, Any] = {"pool_pre_ping": config.DB_POOL_PRE_PING}
+    if parsed.get_backend_name() == "sqlite":
+        kwargs["connect_args"] = {"check_same_thread": False}
+        if parsed.database in (None, "", ":memory:"):
+            # In-memory databases live in one connection; there's no pool to size
+            return kwargs
+    kwargs.update(
+        pool_size=config.DB_POOL_SIZE,
+        max_overflow=config.DB_MAX_OVERFLOW,
+        pool_recycle=config.DB_POOL_RECYCLE_S,
+        pool_timeout=config.DB_POOL_TIMEOUT_S,
+    )
+    return kwargs
+
+def _set_sqlite_pragmas(dbapi_connection, connection_record):
+    """
+    WAL lets readers (other requests, other uvicorn workers) carry on while one
+    connection writes; NORMAL sync is safe under WAL and skips an fsync per commit.
+    """
+    cursor = dbapi_connection.cursor()
+    cursor.execute("PRAGMA journal_mode=WAL")
+    cursor.execute("PRAGMA synchronous=NORMAL")
+    cursor.execute(f"PRAGMA busy_timeout={int(config.SQLITE_BUSY_TIMEOUT_MS)}")
+    cursor.execute(f"PRAGMA mmap_size={int(config.SQLITE_MMAP_MB * 1024 * 1024)}")
+    cursor.close()
+
+engine = create_engine(SQLALCHEMY_DATABASE_URL, **_engine_kwargs(SQLALCHEMY_DATABASE_URL))
+if _is_sqlite(SQLALCHEMY_DATABASE_URL) and config.SQLITE_PRAGMAS:
+    event.listen(engine, "connect", _set_sqlite_pragmas)
 
-engine = create_engine(
-    SQLALCHEMY_DATABASE_URL, connect_args={"check_same_thread": False}
-)
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 
 Base = declarative_base()
@@ -19,3 +62,45 @@ def get_db():
         yield db
     finally:
         db.close()
+
+def async_database_url(url: str = SQLALCHEMY_DATABASE_URL) -> str:
+    """The same database behind an async driver (aiosqlite / asyncpg)."""
+    parsed = make_url(url)
+    driver = _ASYNC_DRIVERS.get(parsed.get_backend_name())
+    if driver is None:
+        raise ValueError(f"No async driver configured for {parsed.get_backend_name()} databases")
+    return parsed.set(drivername=driver).render_as_string(hide_password=False)
+
+_async_engine = None
+_async_session_factory = None
+_async_lock = threading.Lock()
+
+def get_async_session_factory():
+    """
+    async_sessionmaker for async endpoints, created on first use so the sync
+    app never needs the async drivers installed.
+    """
+    global _async_engine, _async_session_factory
+    with _async_lock:
+        if _async_session_factory is None:
+            from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+
+            url = config.DATABASE_ASYNC_URL or async_database_url()
+            kwargs = _engine_kwargs(url)
+            kwargs.pop("connect_args", None)  # check_same_thread doesn't apply to aiosqlite
+            _async_engine = create_async_engine(url, **kwargs)
+            if _is_sqlite(url) and config.SQLITE_PRAGMAS:
+                event.listen(_async_engine.sync_engine, "connect", _set_sqlite_pragmas)
+            _async_session_factory = async_sessionmaker(_async_engine, autoflush=False, expire_on_commit=False)
+        return _async_session_factory
+
+async def get_async_db():
+    async with get_async_session_factory()() as db:
+        yield db
+
+async def dispose_async_engine():
+    global _async_engine, _async_session_factory
+    with _async_lock:
+        async_engine, _async_engine, _async_session_factory = _async_engine, None, None
+    if async_engine is not None:
+        await async_engine.dispose()
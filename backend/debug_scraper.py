@@ -1,28 +1,48 @@
-from scrapers.base_selenium import SeleniumScraper
-import time
-import traceback
+from scrapers.browser_pool import wait_until_ready
+from search_service import STORES
+import os
 import sys
+import traceback
+
+FIXTURES_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "benchmarks", "fixtures")
+
+def fixture_name(store: str) -> str:
+    """"Trader Joe's" -> "trader_joes"."""
+    return store.lower().replace("'", "").replace(" ", "_")
+
+def record(store: str, query: str = "chicken", headless: bool = True) -> str:
+    """
+    Loads a store's page in the browser and saves the rendered HTML as its
+    benchmark fixture (benchmarks/fixtures/<store>.html).
+    """
+    stores = {name.lower(): (name, cls) for name, _, cls in STORES}
+    if store.lower() not in stores:
+        raise ValueError(f"Unknown store {store!r}; one of: {', '.join(name for name, _, _ in STORES)}")
+    store, cls = stores[store.lower()]
+
+    scraper = cls(headless=headless)
+    url = getattr(scraper, "menu_url", None) or scraper.search_url(query)
+    path = os.path.join(FIXTURES_DIR, fixture_name(store) + ".html")
+    try:
+        print(f"Loading {url}...")
+        scraper._setup_driver()
+        scraper.driver.get(url)
+        wait_until_ready(scraper.driver, scraper.spec.ready_selector if scraper.spec else None)
+        html = scraper.driver.page_source
+    finally:
+        scraper._teardown_driver()
 
-class DebugScraper(SeleniumScraper):
-    def search(self, query: str):
-        try:
-            print("Setting up driver...")
-            self._setup_driver()
-            print("Driver setup complete. GET URL...")
-            self.driver.get("https://www.jackinthebox.com/menu/categories")
-            print("Waiting...")
-            time.sleep(5)
-            print("Writing file...")
-            with open("jack_dump.html", "w") as f:
-                f.write(self.driver.page_source)
-            print("Done.")
-            return []
-        except Exception:
-            traceback.print_exc()
-            return []
-        finally:
-            self._teardown_driver()
+    with open(path, "w", encoding="utf-8") as f:
+        f.write(html)
+    print(f"Wrote {path}: {len(scraper.parse_html(html))} products parsed")
+    return path
 
 if __name__ == "__main__":
-    s = DebugScraper()
-    s.search("test")
+    if len(sys.argv) < 2:
+        print('Usage: python debug_scraper.py "<store>" [query]')
+        sys.exit(2)
+    try:
+        record(sys.argv[1], *sys.argv[2:3])
+    except Exception:
+        traceback.print_exc()
+        sys.exit(1)
@@ -0,0 +1,107 @@
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
+from typing import List, Dict, Any, Iterator, Optional, Tuple
+import logging
+import threading
+import time
+
+import config
+from nutrition_service import NutritionService, get_nutrition_service, normalize_name
+
+_executor: Optional[ThreadPoolExecutor] = None
+_executor_lock = threading.Lock()
+
+def get_enrich_executor() -> ThreadPoolExecutor:
+    """Process-wide lookup pool: ENRICH_MAX_IN_FLIGHT lookups at most, however many requests are enriching."""
+    global _executor
+    with _executor_lock:
+        if _executor is None:
+            _executor = ThreadPoolExecutor(max_workers=max(1, config.ENRICH_MAX_IN_FLIGHT), thread_name_prefix="enrich")
+        return _executor
+
+def lookup_name(item: Dict[str, Any]) -> str:
+    # "Great Value Cut Green Beans, 12 oz" -> "Great Value Cut Green Beans"
+    return item["name"].split(',')[0]
+
+def iter_nutrition(
+    items: List[Dict[str, Any]],
+    service: NutritionService = None,
+    max_in_flight: int = None,
+    budget_s: float = None,
+) -> Iterator[Tuple[str, List[Dict[str, Any]], Dict[str, Any]]]:
+    """
+    Looks up nutrition for every item concurrently on the shared lookup pool,
+    one lookup per distinct name and at most `max_in_flight` of this request's
+    at a time. Yields (name_key, items_with_that_name, nutrition) as each
+    lookup finishes.
+
+    Stops yielding once `budget_s` is spent; items whose lookup had not finished
+    are left marked `nutrition_pending`. Lookups that already started finish in
+    the background so the nutrition cache is warm for the next request; queued
+    ones are cancelled.
+    """
+    service = service or get_nutrition_service()
+    max_in_flight = max_in_flight or config.ENRICH_MAX_IN_FLIGHT
+    budget_s = budget_s if budget_s is not None else config.ENRICH_BUDGET_S
+    deadline = time.monotonic() + budget_s
+
+    groups: Dict[str, List[Dict[str, Any]]] = {}
+    names: Dict[str, str] = {}
+    for item in items:
+        name = lookup_name(item)
+        key = normalize_name(name)
+        if not key:
+            continue
+        groups.setdefault(key, []).append(item)
+        names.setdefault(key, name)
+        item["nutrition_pending"] = True
+
+    if not groups:
+        return
+
+    executor = get_enrich_executor()
+    queued = list(groups)
+    futures = {}
+    pending = set()
+
+    def submit_next():
+        while queued and len(pending) < max(1, max_in_flight):
+            key = queued.pop(0)
+            future = executor.submit(service.get_nutrition, names[key])
+            futures[future] = key
+            pending.add(future)
+
+    try:
+        submit_next()
+        while pending:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                break
+            done, _ = wait(pending, timeout=remaining, return_when=FIRST_COMPLETED)
+            pending.difference_update(done)
+            submit_next()
+            for future in done:
+                key = futures[future]
+                try:
+                    nutrition = future.result()
+                except Exception as e:
+                    logging.error(f"Nutrition lookup for {names[key]} failed: {e}")
+                    nutrition = {}
+                for item in groups[key]:
+                    item["nutrition"] = nutrition
+                    item.pop("nutrition_pending", None)
+                yield key, groups[key], nutrition
+    finally:
+        for future in pending:
+            future.cancel()
+
+def enrich_nutrition(items: List[Dict[str, Any]], **kwargs) -> Dict[str, Any]:
+    """Enriches `items` in place and returns a short summary for the response."""
+    start = time.monotonic()
+    resolved = sum(1 for _ in iter_nutrition(items, **kwargs))
+    pending = sum(1 for item in items if item.get("nutrition_pending"))
+    return {
+        "names": len({normalize_name(lookup_name(item)) for item in items}),
+        "resolved": resolved,
+        "pending_items": pending,
+        "elapsed": round(time.monotonic() - start, 3),
+    }
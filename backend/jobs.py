@@ -0,0 +1,226 @@
+from datetime import datetime, timedelta, timezone
+from typing import Dict, Any, List, Optional, Tuple
+import hashlib
+import logging
+import threading
+import uuid
+
+from sqlalchemy.exc import IntegrityError
+
+import config
+from database import SessionLocal
+from leaderboard import leaderboard_cache
+from models import RefreshJobRecord
+from smart_pantry import STAPLE_ITEMS, update_benchmarks, stale_staples
+
+# Finished jobs kept around for GET /api/benchmarks/refresh/{id}
+MAX_JOB_HISTORY = 50
+
+def staple_set_key(items: List[Dict[str, str]]) -> str:
+    """Identifies a staple set; at most one refresh per key runs at a time."""
+    names = "\n".join(sorted(item["name"] for item in items))
+    return hashlib.sha1(names.encode()).hexdigest()[:12]
+
+def _aware(value: Optional[datetime]) -> Optional[datetime]:
+    # SQLite hands back naive UTC
+    if value is not None and value.tzinfo is None:
+        return value.replace(tzinfo=timezone.utc)
+    return value
+
+class RefreshJob:
+    """
+    State of one benchmark refresh. The worker thread updates it in memory and
+    writes every change through to its `refresh_jobs` row, which is what other
+    uvicorn workers (and GET /api/benchmarks/refresh/{id}) read.
+    """
+    def __init__(self, key: str, incremental: bool, max_age_s: Optional[float], session_factory=SessionLocal):
+        self.id = uuid.uuid4().hex
+        self.key = key
+        self.incremental = incremental
+        self.max_age_s = max_age_s
+        self.status = "queued"  # queued -> running -> succeeded | failed
+        self.created_at = datetime.now(timezone.utc)
+        self.started_at: Optional[datetime] = None
+        self.finished_at: Optional[datetime] = None
+        self.items: Dict[str, Dict[str, Any]] = {}
+        self.summary: Optional[Dict[str, Any]] = None
+        self.error: Optional[str] = None
+        self._session_factory = session_factory
+        self._lock = threading.Lock()
+
+    @classmethod
+    def from_record(cls, row: RefreshJobRecord) -> "RefreshJob":
+        job = cls(row.staple_key, bool(row.incremental), row.max_age_s)
+        job.id = row.id
+        job.status = row.status
+        job.created_at = _aware(row.created_at)
+        job.started_at = _aware(row.started_at)
+        job.finished_at = _aware(row.finished_at)
+        job.items = dict(row.items or {})
+        job.summary = row.summary
+        job.error = row.error
+        return job
+
+    def record(self) -> RefreshJobRecord:
+        """A new row for this job, holding the staple set's running lock."""
+        return RefreshJobRecord(
+            id=self.id,
+            staple_key=self.key,
+            running_key=self.key,
+            status=self.status,
+            incremental=self.incremental,
+            max_age_s=self.max_age_s,
+            items={},
+            created_at=self.created_at,
+            heartbeat_at=self.created_at,
+        )
+
+    def save(self):
+        """Writes the current state to the job's row; a finished job releases the running lock."""
+        with self._lock:
+            values = {
+                "status": self.status,
+                "items": {name: dict(state) for name, state in self.items.items()},
+                "summary": self.summary,
+                "error": self.error,
+                "started_at": self.started_at,
+                "finished_at": self.finished_at,
+                "heartbeat_at": datetime.now(timezone.utc),
+            }
+            if self.status in ("succeeded", "failed"):
+                values["running_key"] = None
+            db = self._session_factory()
+            try:
+                db.query(RefreshJobRecord).filter(RefreshJobRecord.id == self.id).update(values)
+                db.commit()
+            except Exception as e:
+                db.rollback()
+                logging.error(f"Failed to save refresh job {self.id}: {e}")
+            finally:
+                db.close()
+
+    def set_item(self, name: str, status: str, elapsed: Optional[float]):
+        with self._lock:
+            self.items[name] = {
+                "status": status,
+                "elapsed": round(elapsed, 3) if elapsed is not None else None,
+            }
+        self.save()
+
+    def to_dict(self) -> Dict[str, Any]:
+        with self._lock:
+            items = {name: dict(state) for name, state in self.items.items()}
+        done = sum(1 for state in items.values() if state["status"] not in ("pending", "running"))
+        return {
+            "id": self.id,
+            "status": self.status,
+            "incremental": self.incremental,
+            "max_age_s": self.max_age_s,
+            "created_at": self.created_at.isoformat(),
+            "started_at": self.started_at.isoformat() if self.started_at else None,
+            "finished_at": self.finished_at.isoformat() if self.finished_at else None,
+            "progress": {"done": done, "total": len(items)},
+            "items": items,
+            "summary": self.summary,
+            "error": self.error,
+        }
+
+class JobManager:
+    """
+    Runs benchmark refreshes on their own threads with their own DB sessions
+    (never the request's), and refuses to start a second refresh of the same
+    staple set while one is running; callers get the running job instead.
+
+    Jobs live in the `refresh_jobs` table, so the overlap guard and job lookups
+    hold across uvicorn workers: a unique index on `running_key` lets only one
+    unfinished job per staple set exist. A running job whose worker died (no
+    progress for REFRESH_JOB_STALE_S) is marked failed by the next submit.
+    """
+    def __init__(self, session_factory=SessionLocal):
+        self._session_factory = session_factory
+
+    def submit_refresh(self, incremental: bool = False, max_age_s: float = None) -> Tuple[RefreshJob, bool]:
+        """Returns (job, started). `started` is False when an overlapping job was already running."""
+        key = staple_set_key(STAPLE_ITEMS)
+        job = RefreshJob(key, incremental, max_age_s if incremental else None, self._session_factory)
+        db = self._session_factory()
+        try:
+            for _ in range(2):
+                db.add(job.record())
+                try:
+                    db.commit()
+                    break
+                except IntegrityError:
+                    db.rollback()
+                running = db.query(RefreshJobRecord).filter(RefreshJobRecord.running_key == key).first()
+                if running is not None and not self._abandon_if_stale(db, running):
+                    return RefreshJob.from_record(running), False
+                # The lock was stale (now released) or its job just finished: try again
+            else:
+                raise RuntimeError(f"Could not take the refresh lock for staple set {key}")
+            self._prune(db)
+        finally:
+            db.close()
+
+        threading.Thread(target=self._run, args=(job,), name=f"refresh-{job.id[:8]}", daemon=True).start()
+        return job, True
+
+    def _abandon_if_stale(self, db, running: RefreshJobRecord) -> bool:
+        heartbeat = _aware(running.heartbeat_at or running.created_at)
+        if heartbeat and datetime.now(timezone.utc) - heartbeat < timedelta(seconds=config.REFRESH_JOB_STALE_S):
+            return False
+        logging.warning(f"Refresh job {running.id} made no progress since {heartbeat}; marking it failed")
+        running.status = "failed"
+        running.error = "abandoned: no progress from its worker"
+        running.finished_at = datetime.now(timezone.utc)
+        running.running_key = None
+        db.commit()
+        return True
+
+    def _prune(self, db):
+        """Drops finished jobs beyond the newest MAX_JOB_HISTORY."""
+        old = (
+            db.query(RefreshJobRecord.id)
+            .filter(RefreshJobRecord.running_key.is_(None))
+            .order_by(RefreshJobRecord.created_at.desc())
+            .offset(MAX_JOB_HISTORY)
+            .all()
+        )
+        if old:
+            db.query(RefreshJobRecord).filter(RefreshJobRecord.id.in_([row.id for row in old])).delete(
+                synchronize_session=False
+            )
+            db.commit()
+
+    def get(self, job_id: str) -> Optional[RefreshJob]:
+        db = self._session_factory()
+        try:
+            row = db.get(RefreshJobRecord, job_id)
+            return RefreshJob.from_record(row) if row is not None else None
+        finally:
+            db.close()
+
+    def _run(self, job: RefreshJob):
+        job.status = "running"
+        job.started_at = datetime.now(timezone.utc)
+        db = self._session_factory()
+        try:
+            items = stale_staples(db, job.max_age_s) if job.incremental else STAPLE_ITEMS
+            with job._lock:
+                for item in items:
+                    job.items[item["name"]] = {"status": "pending", "elapsed": None}
+            job.save()
+            job.summary = update_benchmarks(db, items=items, progress=job.set_item)
+            leaderboard_cache.rebuild(db)
+            job.status = "succeeded"
+        except Exception as e:
+            logging.error(f"Benchmark refresh job {job.id} failed: {e}")
+            db.rollback()
+            job.error = str(e)
+            job.status = "failed"
+        finally:
+            db.close()
+            job.finished_at = datetime.now(timezone.utc)
+            job.save()
+
+job_manager = JobManager()
@@ -0,0 +1,132 @@
+from bisect import bisect_right
+from typing import Dict, Any, List, Optional, Tuple
+import base64
+import json
+import logging
+import threading
+
+from sqlalchemy import func
+from sqlalchemy.orm import Session
+from models import BenchmarkItem
+
+# Leaderboard metric -> (BenchmarkItem column, best value first is descending?)
+METRICS: Dict[str, Tuple[str, bool]] = {
+    "protein": ("protein_per_dollar", True),
+    "calories": ("calories_per_dollar", True),
+    "price": ("lowest_price", False),
+}
+DEFAULT_METRIC = "protein"
+
+class InvalidCursor(ValueError):
+    pass
+
+def _row(item: BenchmarkItem) -> Dict[str, Any]:
+    return {column.name: getattr(item, column.name) for column in BenchmarkItem.__table__.columns}
+
+def encode_cursor(sort_key: Tuple[float, int]) -> str:
+    return base64.urlsafe_b64encode(json.dumps(list(sort_key)).encode()).decode().rstrip("=")
+
+def decode_cursor(cursor: str) -> Tuple[float, int]:
+    try:
+        value, item_id = json.loads(base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4)))
+        return float(value), int(item_id)
+    except Exception:
+        raise InvalidCursor(f"Malformed leaderboard cursor: {cursor!r}")
+
+def benchmarks_version(db: Session) -> Tuple[Any, ...]:
+    """
+    Cheap fingerprint of benchmark_items: row count, highest id and latest
+    last_updated. Any refresh, in any process, changes at least one of them.
+    """
+    count, max_id, updated = db.query(
+        func.count(BenchmarkItem.id), func.max(BenchmarkItem.id), func.max(BenchmarkItem.last_updated)
+    ).one()
+    return count, max_id, str(updated) if updated is not None else None
+
+class Ranking:
+    """One metric's ordering (optionally within a category), best first, ties broken by id."""
+    def __init__(self, rows: List[Dict[str, Any]], column: str, descending: bool):
+        ranked = sorted(
+            (row for row in rows if row[column] is not None),
+            key=lambda row: (-row[column] if descending else row[column], row["id"]),
+        )
+        self.rows = ranked
+        self.keys = [(-row[column] if descending else row[column], row["id"]) for row in ranked]
+
+    def page(self, after: Optional[Tuple[float, int]], limit: int) -> Tuple[List[Dict[str, Any]], Optional[Tuple[float, int]]]:
+        """Rows strictly after the `after` key, plus the key to continue from (None on the last page)."""
+        start = bisect_right(self.keys, after) if after is not None else 0
+        end = start + limit
+        next_key = self.keys[end - 1] if end < len(self.keys) else None
+        return self.rows[start:end], next_key
+
+class LeaderboardCache:
+    """
+    Rankings for every metric, overall and per category, computed in one pass over
+    benchmark_items and kept in memory. Each read first compares benchmarks_version
+    (one aggregate query) with the version the rankings were built from, so a
+    refresh run by another worker process is picked up on the next read. Otherwise
+    reads only bisect into a precomputed ranking; they never sort.
+
+    Cursors are keyset positions (sort value, id) rather than offsets, so a page
+    stays stable when a rebuild lands between two requests.
+    """
+    def __init__(self):
+        self._rankings: Optional[Dict[Tuple[str, Optional[str]], Ranking]] = None
+        self._rows: List[Dict[str, Any]] = []
+        self._version: Optional[Tuple[Any, ...]] = None
+        self._lock = threading.Lock()
+
+    def rebuild(self, db: Session, version: Tuple[Any, ...] = None) -> Dict[Tuple[str, Optional[str]], Ranking]:
+        # Read the version first: a write landing in between just triggers one more rebuild
+        version = version if version is not None else benchmarks_version(db)
+        rows = [_row(item) for item in db.query(BenchmarkItem).all()]
+        categories = {row["category"] for row in rows if row["category"]}
+        rankings = {}
+        for metric, (column, descending) in METRICS.items():
+            rankings[(metric, None)] = Ranking(rows, column, descending)
+            for category in categories:
+                in_category = [row for row in rows if row["category"] == category]
+                rankings[(metric, category)] = Ranking(in_category, column, descending)
+        with self._lock:
+            self._rankings = rankings
+            self._rows = rows
+            self._version = version
+        logging.info(f"Leaderboard rebuilt: {len(rows)} benchmarks, {len(categories)} categories")
+        return rankings
+
+    def _current(self, db: Session) -> Tuple[Dict[Tuple[str, Optional[str]], Ranking], List[Dict[str, Any]]]:
+        """Rankings and rows, rebuilt first if benchmark_items changed since they were computed."""
+        version = benchmarks_version(db)
+        with self._lock:
+            if self._rankings is not None and self._version == version:
+                return self._rankings, self._rows
+        rankings = self.rebuild(db, version)
+        with self._lock:
+            return rankings, self._rows
+
+    def benchmarks(self, db: Session) -> List[Dict[str, Any]]:
+        """Every BenchmarkItem, as plain dicts."""
+        return self._current(db)[1]
+
+    def page(
+        self,
+        db: Session,
+        metric: str = DEFAULT_METRIC,
+        category: Optional[str] = None,
+        cursor: Optional[str] = None,
+        limit: int = 10,
+    ) -> Tuple[List[Dict[str, Any]], Optional[str]]:
+        """Returns (rows, next_cursor). Raises InvalidCursor for a cursor this API didn't issue."""
+        after = decode_cursor(cursor) if cursor else None
+        rankings, _ = self._current(db)
+
+        if metric not in METRICS:
+            metric = DEFAULT_METRIC
+        ranking = rankings.get((metric, category))
+        if ranking is None:
+            return [], None
+        rows, next_key = ranking.page(after, limit)
+        return rows, encode_cursor(next_key) if next_key is not None else None
+
+leaderboard_cache = LeaderboardCache()
@@ -1,5 +1,7 @@
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
+from metrics import MetricsMiddleware
+from profiler import ProfilingMiddleware, profiled, list_profiles, profile_path, HEADER as PROFILE_HEADER
 
 app = FastAPI(title="CheapNut API")
 
@@ -14,22 +16,62 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["X-Next-Cursor", PROFILE_HEADER],
 )
+app.add_middleware(ProfilingMiddleware)
+app.add_middleware(MetricsMiddleware)
 
-from scrapers.mock_scraper import MockGroceryScraper, MockFastFoodScraper
-from scrapers.walmart import WalmartScraper
-from scrapers.jack_in_the_box import JackInTheBoxScraper
-from scrapers.safeway import SafewayScraper
-from scrapers.whole_foods import WholeFoodsScraper
-from scrapers.target import TargetScraper
-from scrapers.costco import CostcoScraper
-from scrapers.trader_joes import TraderJoesScraper
-from scrapers.mcdonalds import McDonaldsScraper
-from scrapers.taco_bell import TacoBellScraper
-from scrapers.starbucks import StarbucksScraper
-from scrapers.chipotle import ChipotleScraper
-from nutrition_service import NutritionService
-from typing import List
+from search_service import search_all_stores, get_store_scrapers
+from enrichment import enrich_nutrition
+from search_stream import iter_search_events, to_ndjson, to_sse
+from fastapi.responses import FileResponse, Response, StreamingResponse
+from scrapers.browser_pool import get_browser_pool, browser_pool_stats, page_load_stats, shutdown_browser_pools
+from scrapers.result_cache import get_result_cache
+from scrapers.menu_snapshot import menu_stats, start_menu_scheduler
+from scrapers.http_fetch import tier_stats
+from scrapers.health import store_health_stats
+from singleflight import singleflight_stats
+from jobs import job_manager
+from leaderboard import leaderboard_cache, InvalidCursor
+from compare import compare_batch
+from metrics import CONTENT_TYPE as METRICS_CONTENT_TYPE, Histogram, render as render_metrics
+from database import get_db, get_async_db, engine, dispose_async_engine
+from sqlalchemy.orm import Session
+from sqlalchemy.ext.asyncio import AsyncSession
+from fastapi import Depends, HTTPException, Query
+import crud
+import schemas
+import config
+import logging
+import os
+import threading
+from typing import List, Optional
+
+_search_stage_seconds = Histogram(
+    "cheapnut_search_stage_seconds",
+    "/api/search time per stage: stores (scrape fan-out), enrichment (nutrition), persist (database).",
+    ["stage"],
+)
+
+@app.on_event("startup")
+def warm_browser_pool():
+    # Warm in the background so a missing/slow Chrome never blocks app startup
+    if config.BROWSER_POOL_PREWARM:
+        threading.Thread(target=get_browser_pool(headless=True).warm, name="browser-pool-warm", daemon=True).start()
+
+@app.on_event("startup")
+def schedule_menu_refresh():
+    if config.MENU_SCHEDULER:
+        start_menu_scheduler(get_store_scrapers())
+
+@app.on_event("shutdown")
+def close_browser_pool():
+    shutdown_browser_pools()
+
+@app.on_event("shutdown")
+async def close_database():
+    await dispose_async_engine()
+    engine.dispose()
 
 @app.get("/")
 def read_root():
@@ -39,146 +81,211 @@ def read_root():
 def health_check():
     return {"status": "ok"}
 
+@app.get("/metrics", include_in_schema=False)
+def get_metrics():
+    """Latency histograms, outcome counters and live gauges in the Prometheus text format."""
+    return Response(content=render_metrics(), media_type=METRICS_CONTENT_TYPE)
+
+@app.get("/api/admin/browser-pool")
+def get_browser_pool_stats():
+    """
+    Pool size, lease wait times and recycle counts, for sizing the pool under load,
+    plus per-store page load time and weight under the lean and full browser profiles.
+    """
+    return {"pools": browser_pool_stats(), "page_loads": page_load_stats()}
+
+@app.get("/api/admin/fetch-tiers")
+def get_fetch_tiers():
+    """Per store, how many searches were served over plain HTTP, by the browser, from cache or from a menu snapshot."""
+    return {"stores": tier_stats()}
+
+@app.get("/api/admin/stores/health")
+def get_store_health():
+    """
+    Circuit breaker state per store (closed / open / half_open), why it opened and
+    when it is retried, plus the p95 page load its browser wait timeout adapts to.
+    """
+    return {"stores": store_health_stats([store for store, _, _ in get_store_scrapers()])}
+
+@app.get("/api/admin/inflight")
+def get_inflight():
+    """
+    Coalesced work per kind (store searches, nutrition lookups): calls made, how many
+    actually ran and how many waited on an identical call already in flight.
+    """
+    return {"flights": singleflight_stats()}
+
+@app.get("/api/admin/profiles")
+def get_profiles():
+    """
+    Saved request profiles, newest first. Search, compare and leaderboard requests
+    sent with `X-Profile: 1` (sampled collapsed stacks) or `X-Profile: cprofile`
+    (a cProfile stats file) get one; its id comes back in the X-Profile-Id header.
+    """
+    return {"profiles": list_profiles(), "enabled": config.PROFILING}
+
+@app.get("/api/admin/profiles/{report_id}")
+def get_profile(report_id: str):
+    """A profile's file: collapsed stacks for flamegraph.pl / speedscope, or cProfile stats for pstats / snakeviz."""
+    path = profile_path(report_id)
+    if path is None:
+        raise HTTPException(status_code=404, detail="Profile not found")
+    return FileResponse(path, filename=os.path.basename(path))
+
+@app.get("/api/admin/menus")
+def get_menu_snapshots():
+    """Version, item count and age of each fast-food menu snapshot (null until first scraped)."""
+    return {"menus": menu_stats(get_store_scrapers()), "refresh_s": config.MENU_REFRESH_S}
+
+@app.get("/api/admin/cache")
+def get_cache_stats():
+    """Per-store hit/miss/stale counts for the search result cache, for tuning TTLs."""
+    return get_result_cache().stats()
+
 @app.get("/api/search")
-def search_items(q: str):
-    # Initialize scrapers (Note: In prod, these should be singleton or pooled)
-    walmart = WalmartScraper(headless=True)
-    jitb = JackInTheBoxScraper(headless=True)
-    safeway = SafewayScraper(headless=True)
-    wholefoods = WholeFoodsScraper(headless=True)
-    target = TargetScraper(headless=True)
-    costco = CostcoScraper(headless=True)
-    traderjoes = TraderJoesScraper(headless=True)
-    mcdonalds = McDonaldsScraper(headless=True)
-    tacobell = TacoBellScraper(headless=True)
-    starbucks = StarbucksScraper(headless=True)
-    chipotle = ChipotleScraper(headless=True)
-    
-    # Fallback/Mock for others for now
-    mock_grocery = MockGroceryScraper()
-    mock_fastfood = MockFastFoodScraper()
-    
-    # Run searches
-    results = {
-        "grocery": [],
-        "fastfood": []
-    }
-    
-    # Grocery
-    results["grocery"].extend(walmart.search(q))
-    results["grocery"].extend(safeway.search(q))
-    results["grocery"].extend(wholefoods.search(q))
-    results["grocery"].extend(target.search(q))
-    results["grocery"].extend(costco.search(q))
-    results["grocery"].extend(traderjoes.search(q))
-
-    # Fallback if empty
-    if not results["grocery"]:
-        results["grocery"] = mock_grocery.search(q)
-        
-    # Fast Food
-    results["fastfood"].extend(jitb.search(q))
-    results["fastfood"].extend(mcdonalds.search(q))
-    results["fastfood"].extend(tacobell.search(q))
-    results["fastfood"].extend(starbucks.search(q))
-    results["fastfood"].extend(chipotle.search(q))
-    
-    if not results["fastfood"]:
-        results["fastfood"] = mock_fastfood.search(q)
-
-    # Enrich with Nutrition Data
-    nutrition_service = NutritionService()
-    
-    # We can limit nutrition calls to top 3 items per category to save time/rate limits
-    for category in ["grocery", "fastfood"]:
-        for item in results[category][:3]:
-            # Use the item name for nutrition lookup
-            # Cleanup name slightly? 
-            clean_name = item["name"].split(',')[0] 
-            item["nutrition"] = nutrition_service.get_nutrition(clean_name)
+@profiled
+def search_items(q: str, deadline: Optional[float] = None, db: Session = Depends(get_db)):
+    """
+    Searches every store concurrently. Stores that fail or miss their deadline
+    are reported under "errors" (with "partial": true) instead of holding up the response.
+    `deadline` optionally tightens the overall budget (seconds, capped at the configured one).
+    Send `X-Profile: 1` (or `?profile=1`) to save a profile of the request; see /api/admin/profiles.
+    """
+    if deadline is not None:
+        deadline = min(deadline, config.SEARCH_DEADLINE_S)
+    with _search_stage_seconds.time("stores"):
+        results = search_all_stores(q, deadline_s=deadline)
+
+    # Enrich every item with nutrition data, concurrently and within a time budget.
+    # Anything not back in time is returned with "nutrition_pending": true.
+    with _search_stage_seconds.time("enrichment"):
+        results["enrichment"] = enrich_nutrition(results["grocery"] + results["fastfood"])
+
+    # Keep every real (non-mock) offer, in one bulk upsert
+    offers = [item for category in ["grocery", "fastfood"] if category not in results["fallback"]
+              for item in results[category]]
+    try:
+        with _search_stage_seconds.time("persist"):
+            crud.upsert_items(db, offers)
+    except Exception as e:
+        logging.error(f"Failed to persist offers for '{q}': {e}")
+        db.rollback()
 
     return results
 
-# --- New Best Value Endpoints ---
+@app.get("/api/search/stream")
+def search_items_stream(q: str, format: str = "ndjson", deadline: Optional[float] = None):
+    """
+    Streaming variant of /api/search: one message per store as it finishes, then
+    nutrition patches, then a summary with per-store timings.
+    `format` is "ndjson" (default) or "sse" for Server-Sent Events.
+    """
+    if deadline is not None:
+        deadline = min(deadline, config.SEARCH_DEADLINE_S)
+    events = iter_search_events(q, deadline_s=deadline)
+    if format == "sse":
+        return StreamingResponse(to_sse(events), media_type="text/event-stream",
+                                 headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"})
+    return StreamingResponse(to_ndjson(events), media_type="application/x-ndjson")
 
-from smart_pantry import update_benchmarks
-from database import get_db, engine
-from models import Base, BenchmarkItem
-from analysis_engine import AnalysisEngine
-from sqlalchemy.orm import Session
-from fastapi import Depends, BackgroundTasks
+@app.get("/api/items/search")
+def search_saved_items(q: str, limit: int = 20, offset: int = 0, db: Session = Depends(get_db)):
+    """
+    Searches previously scraped offers in the database (full-text, best match first).
+    Answers repeat queries without touching any store.
+    """
+    limit = max(1, min(limit, 100))
+    return crud.search_items(db, q, limit=limit, offset=max(0, offset))
 
-# Ensure tables exist (dev convenience)
-Base.metadata.create_all(bind=engine) 
+@app.get("/api/items/best-value")
+async def best_value_items(per: str = "g", item_type: Optional[str] = None, limit: int = 20, offset: int = 0, db: AsyncSession = Depends(get_async_db)):
+    """
+    Previously scraped offers with the lowest unit price, per 100g (per=g) or 100ml (per=ml).
+    Only offers whose package size could be read from the title are ranked.
+    A plain indexed read, so it runs on the async session instead of taking a threadpool worker.
+    """
+    limit = max(1, min(limit, 100))
+    return await crud.best_value_items_async(db, per=per, item_type=item_type, limit=limit, offset=max(0, offset))
+
+# --- New Best Value Endpoints ---
 
 @app.post("/api/benchmarks/refresh")
-def refresh_benchmarks(background_tasks: BackgroundTasks, db: Session = Depends(get_db)):
+def refresh_benchmarks(incremental: bool = False, max_age_hours: float = 24.0):
     """
-    Triggers a background task to update staple prices.
+    Starts a background job to update staple prices and returns its id.
+    With `incremental=true` only staples older than `max_age_hours` are refreshed.
+    If a refresh is already running, its job is returned instead of starting another.
     """
-    background_tasks.add_task(update_benchmarks, db)
-    return {"message": "Benchmark update started in background"}
+    job, started = job_manager.submit_refresh(incremental=incremental, max_age_s=max_age_hours * 3600)
+    return {
+        "message": "Benchmark update started in background" if started else "Benchmark update already running",
+        "job_id": job.id,
+        "status": job.status,
+        "already_running": not started,
+    }
+
+@app.get("/api/benchmarks/refresh/{job_id}")
+def get_refresh_job(job_id: str):
+    """Status, per-staple progress and timings of a benchmark refresh job."""
+    job = job_manager.get(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="Refresh job not found")
+    return job.to_dict()
 
 @app.get("/api/benchmarks/leaderboard")
-def get_leaderboard(metric: str = "protein_per_dollar", db: Session = Depends(get_db)):
+@profiled
+def get_leaderboard(
+    response: Response,
+    metric: str = "protein",
+    category: Optional[str] = None,
+    cursor: Optional[str] = None,
+    limit: int = Query(10, ge=1, le=100),
+    db: Session = Depends(get_db),
+):
     """
     Returns top items sorted by the requested metric.
-    Metric options: protein_per_dollar, calories_per_dollar, lowest_price
+    Metric options: protein, calories (most per dollar first), price (cheapest first)
+
+    Pages come from rankings precomputed after each benchmark refresh. When more
+    rows follow, pass the `X-Next-Cursor` response header back as `cursor`.
     """
-    # Map friendly query param to column
-    metric_map = {
-        "protein": BenchmarkItem.protein_per_dollar,
-        "calories": BenchmarkItem.calories_per_dollar,
-        "price": BenchmarkItem.lowest_price
-    }
-    
-    sort_col = metric_map.get(metric, BenchmarkItem.protein_per_dollar)
-    
-    # Sort Descending for value, Ascending for price?
-    # Usually we want "More per dollar" -> Descending
-    if metric == "price":
-        items = db.query(BenchmarkItem).order_by(sort_col.asc()).limit(10).all()
-    else:
-        items = db.query(BenchmarkItem).order_by(sort_col.desc()).limit(10).all()
-        
-    return items
+    try:
+        rows, next_cursor = leaderboard_cache.page(db, metric=metric, category=category, cursor=cursor, limit=limit)
+    except InvalidCursor as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    if next_cursor:
+        response.headers["X-Next-Cursor"] = next_cursor
+    return rows
 
 @app.get("/api/compare/opportunity-cost")
+@profiled
 def compare_item(query: str, db: Session = Depends(get_db)):
     """
-    Compares a fast food query against the 'best' protein benchmark.
-    """
-    # 1. Get Fast Food Info
-    # Use generic scrapers or mock for now
-    # Ideally reuse the search_items logic but strictly for 1 item
-    pass  # To be implemented cleanly, reusing search logic or a new helper
-
-    # Reuse the search function logic? Or create a helper.
-    # Let's instantiate a quick scraper or use the existing 'search_items' logic if refactored.
-    # For MVP, let's just do a quick McDonald's search
-    
-    mcd = McDonaldsScraper(headless=True)
-    results = mcd.search(query)
-    mcd.driver.quit()
-    
-    if not results:
+    Compares a fast food query against the 'best' protein benchmark and returns
+    AnalysisEngine.calculate_opportunity_cost's result for it ({} if the item has
+    no price). The batch endpoint returns the fuller per-item shape.
+    The item must already have been scraped (e.g. by /api/search); nothing is scraped here.
+    """
+    comparison = compare_batch(db, [query], metric="protein", top_k=1)
+    result = comparison["results"][0]
+    if result["item"] is None:
         return {"error": "Item not found"}
-        
-    target_item = results[0]  # Take top result
-    
-    # Enrich
-    nut_service = NutritionService()
-    target_item["nutrition"] = nut_service.get_nutrition(target_item["name"])
-    
-    # 2. Get Benchmark
-    # Compare against best protein per dollar item
-    benchmark = db.query(BenchmarkItem).order_by(BenchmarkItem.protein_per_dollar.desc()).first()
-    
-    if not benchmark:
+    if not comparison["benchmarks"]:
         return {"error": "No benchmarks available. Run refresh first."}
-        
-    # 3. Calculate
-    analysis = AnalysisEngine.calculate_opportunity_cost(target_item, benchmark)
-    
-    return analysis
+    if not result["alternatives"]:
+        return {}
+    return result["alternatives"][0]
 
+@app.post("/api/compare/opportunity-cost/batch")
+@profiled
+def compare_items_batch(request: schemas.CompareBatchRequest, db: Session = Depends(get_db)):
+    """
+    Compares many fast food items (cached offer names, or offers with price and
+    nutrition) against every benchmark at once. Each item gets its `top_k` best
+    grocery alternatives, ranked by how much more `metric` the same money buys.
+    Served from cached offers and benchmarks only.
+    """
+    if len(request.items) > config.COMPARE_BATCH_MAX_ITEMS:
+        raise HTTPException(status_code=400, detail=f"At most {config.COMPARE_BATCH_MAX_ITEMS} items per comparison")
+    entries = [item if isinstance(item, str) else item.model_dump() for item in request.items]
+    return compare_batch(db, entries, metric=request.metric, top_k=max(1, min(request.top_k, 50)))
@@ -0,0 +1,215 @@
+from bisect import bisect_left
+from typing import Callable, Dict, List, Sequence, Tuple
+import math
+import threading
+import time
+
+# Seconds; scrapes run from milliseconds (cache, HTTP tier) to tens of seconds (cold Chrome)
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 20.0, 30.0, 60.0)
+
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+def _escape(value) -> str:
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+def _labels(names: Sequence[str], values: Sequence) -> str:
+    if not names:
+        return ""
+    return "{" + ",".join(f'{name}="{_escape(value)}"' for name, value in zip(names, values)) + "}"
+
+def _number(value: float) -> str:
+    if math.isinf(value):
+        return "+Inf" if value > 0 else "-Inf"
+    return repr(float(value)) if value != int(value) else str(int(value))
+
+class _Metric:
+    kind = ""
+
+    def __init__(self, name: str, help: str, labels: Sequence[str] = ()):
+        self.name = name
+        self.help = help
+        self.label_names = tuple(labels)
+        self._lock = threading.Lock()
+        with _registry_lock:
+            _registry.append(self)
+
+    def _check(self, values: Tuple) -> Tuple:
+        if len(values) != len(self.label_names):
+            raise ValueError(f"{self.name} takes labels {self.label_names}, got {values}")
+        return values
+
+    def _header(self) -> List[str]:
+        return [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} {self.kind}"]
+
+class Counter(_Metric):
+    """Monotonic count per label set."""
+    kind = "counter"
+
+    def __init__(self, name: str, help: str, labels: Sequence[str] = ()):
+        super().__init__(name, help, labels)
+        self._values: Dict[Tuple, float] = {}
+
+    def inc(self, *labels, amount: float = 1.0):
+        with self._lock:
+            self._values[labels] = self._values.get(labels, 0.0) + amount
+
+    def collect(self) -> List[str]:
+        with self._lock:
+            values = sorted(self._values.items(), key=lambda kv: tuple(map(str, kv[0])))
+        return self._header() + [
+            f"{self.name}{_labels(self.label_names, self._check(key))} {_number(value)}" for key, value in values
+        ]
+
+class _Timer:
+    __slots__ = ("histogram", "labels", "start")
+
+    def __init__(self, histogram: "Histogram", labels: Tuple):
+        self.histogram = histogram
+        self.labels = labels
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        self.histogram.observe(time.perf_counter() - self.start, *self.labels)
+        return False
+
+class Histogram(_Metric):
+    """
+    Cumulative-bucket histogram per label set. An observation is a bisect and
+    two additions under the metric's lock, cheap enough for every request.
+    """
+    kind = "histogram"
+
+    def __init__(self, name: str, help: str, labels: Sequence[str] = (), buckets: Sequence[float] = LATENCY_BUCKETS):
+        super().__init__(name, help, labels)
+        self.buckets = tuple(sorted(buckets))
+        # label values -> [count per bucket (+Inf last), sum]
+        self._series: Dict[Tuple, list] = {}
+
+    def observe(self, value: float, *labels):
+        index = bisect_left(self.buckets, value)
+        with self._lock:
+            series = self._series.get(labels)
+            if series is None:
+                series = self._series[labels] = [[0] * (len(self.buckets) + 1), 0.0]
+            series[0][index] += 1
+            series[1] += value
+
+    def time(self, *labels) -> _Timer:
+        """`with histogram.time("Walmart", "page_load"):` observes the block's duration."""
+        return _Timer(self, labels)
+
+    def collect(self) -> List[str]:
+        with self._lock:
+            series = sorted(
+                ((key, list(counts), total) for key, (counts, total) in self._series.items()),
+                key=lambda s: tuple(map(str, s[0])),
+            )
+        lines = self._header()
+        names = self.label_names + ("le",)
+        for key, counts, total in series:
+            self._check(key)
+            cumulative = 0
+            for bound, count in zip(self.buckets + (math.inf,), counts):
+                cumulative += count
+                lines.append(f"{self.name}_bucket{_labels(names, key + (_number(bound),))} {cumulative}")
+            lines.append(f"{self.name}_sum{_labels(self.label_names, key)} {_number(total)}")
+            lines.append(f"{self.name}_count{_labels(self.label_names, key)} {cumulative}")
+        return lines
+
+class CallbackGauge(_Metric):
+    """
+    Gauge read from live state when /metrics is scraped, so keeping it current
+    costs nothing. `fn` returns {label values tuple: value}.
+    """
+    kind = "gauge"
+
+    def __init__(self, name: str, help: str, labels: Sequence[str], fn: Callable[[], Dict[Tuple, float]]):
+        super().__init__(name, help, labels)
+        self.fn = fn
+
+    def collect(self) -> List[str]:
+        values = sorted(self.fn().items(), key=lambda kv: tuple(map(str, kv[0])))
+        return self._header() + [
+            f"{self.name}{_labels(self.label_names, self._check(key))} {_number(value)}" for key, value in values
+        ]
+
+_registry: List[_Metric] = []
+_registry_lock = threading.Lock()
+
+def render() -> str:
+    """Every registered metric in the Prometheus text exposition format."""
+    with _registry_lock:
+        metrics = list(_registry)
+    lines = []
+    for metric in metrics:
+        try:
+            lines.extend(metric.collect())
+        except Exception as e:
+            # One broken gauge callback shouldn't take the whole scrape down
+            lines.append(f"# {metric.name} unavailable: {_escape(e)}")
+    return "\n".join(lines) + "\n"
+
+# --- Metrics shared across modules ---
+
+scrape_stage_seconds = Histogram(
+    "cheapnut_scrape_stage_seconds",
+    "Time per store in each scrape stage: http_fetch, parse, browser_lease, page_load, extract, total.",
+    ["store", "stage"],
+)
+scrapes_total = Counter(
+    "cheapnut_scrapes_total",
+    "Store scrapes by outcome: success, empty, error, skipped (circuit open), no_browser (pool exhausted).",
+    ["store", "outcome"],
+)
+upstream_request_seconds = Histogram(
+    "cheapnut_upstream_request_seconds",
+    "Latency of outbound HTTP requests (store pages, OpenFoodFacts) by host.",
+    ["upstream"],
+)
+upstream_responses_total = Counter(
+    "cheapnut_upstream_responses_total",
+    "Outbound HTTP responses by host and status code (\"error\" when no response came back).",
+    ["upstream", "status"],
+)
+
+http_request_seconds = Histogram(
+    "cheapnut_http_request_duration_seconds",
+    "API request latency by route, method and status.",
+    ["handler", "method", "status"],
+)
+
+def observe_upstream(upstream: str, seconds: float, status):
+    upstream_request_seconds.observe(seconds, upstream)
+    upstream_responses_total.inc(upstream, str(status))
+
+class MetricsMiddleware:
+    """
+    ASGI middleware timing every request by route template (not raw path, which
+    would make a series per query), method and status. Streaming responses are
+    timed until the last chunk is sent.
+    """
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        start = time.perf_counter()
+        status = [500]
+
+        async def send_with_status(message):
+            if message["type"] == "http.response.start":
+                status[0] = message["status"]
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_status)
+        finally:
+            route = scope.get("route")
+            handler = getattr(route, "path", None) or "unmatched"
+            http_request_seconds.observe(time.perf_counter() - start, handler, scope["method"], str(status[0]))
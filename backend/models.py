@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String, Float, JSON, DateTime, Enum
+from sqlalchemy import Column, Integer, String, Float, JSON, DateTime, Enum, Boolean, Index, DDL, event
 from sqlalchemy.sql import func
 import enum
 from database import Base
@@ -9,6 +9,10 @@ class ItemType(str, enum.Enum):
 
 class Item(Base):
     __tablename__ = "items"
+    __table_args__ = (
+        # One row per offer; scrapes upsert on (store_name, name)
+        Index("uq_items_store_name_name", "store_name", "name", unique=True),
+    )
 
     id = Column(Integer, primary_key=True, index=True)
     name = Column(String, index=True)
@@ -17,15 +21,45 @@ class Item(Base):
     price = Column(Float)
     unit = Column(String) # e.g. "lb", "oz", "item"
     quantity = Column(Float) # Amount of unit, e.g. 2 (lbs)
+
+    # Net contents parsed from the title at ingest (see quantity_parser.py)
+    net_grams = Column(Float)
+    net_ml = Column(Float)
+    pack_count = Column(Float)
+    price_per_100g = Column(Float, index=True)
+    price_per_100ml = Column(Float, index=True)
     
     # Nutrition data per 100g or per serving? 
     # Let's aim for per 100g standard, or store serving size info.
     # Storing raw JSON from API for flexibility.
-    nutrition_data = Column(JSON) 
+    nutrition_data = Column(JSON(none_as_null=True)) 
     
     created_at = Column(DateTime(timezone=True), server_default=func.now())
     updated_at = Column(DateTime(timezone=True), onupdate=func.now())
 
+# Full-text index over item names, used by crud.search_items.
+# SQLite: an FTS5 table kept in sync with `items` by triggers.
+ITEMS_FTS_SQLITE = [
+    "CREATE VIRTUAL TABLE IF NOT EXISTS items_fts USING fts5(name, content='items', content_rowid='id')",
+    "CREATE TRIGGER IF NOT EXISTS items_fts_ai AFTER INSERT ON items BEGIN "
+    "INSERT INTO items_fts(rowid, name) VALUES (new.id, new.name); END",
+    "CREATE TRIGGER IF NOT EXISTS items_fts_ad AFTER DELETE ON items BEGIN "
+    "INSERT INTO items_fts(items_fts, rowid, name) VALUES ('delete', old.id, old.name); END",
+    "CREATE TRIGGER IF NOT EXISTS items_fts_au AFTER UPDATE OF name ON items BEGIN "
+    "INSERT INTO items_fts(items_fts, rowid, name) VALUES ('delete', old.id, old.name); "
+    "INSERT INTO items_fts(rowid, name) VALUES (new.id, new.name); END",
+    "INSERT INTO items_fts(items_fts) VALUES ('rebuild')",
+]
+# Postgres: a GIN index over the name's tsvector.
+ITEMS_FTS_POSTGRES = [
+    "CREATE INDEX IF NOT EXISTS ix_items_name_tsv ON items USING GIN (to_tsvector('english', coalesce(name, '')))",
+]
+
+for _stmt in ITEMS_FTS_SQLITE:
+    event.listen(Item.__table__, "after_create", DDL(_stmt).execute_if(dialect="sqlite"))
+for _stmt in ITEMS_FTS_POSTGRES:
+    event.listen(Item.__table__, "after_create", DDL(_stmt).execute_if(dialect="postgresql"))
+
 class Comparison(Base):
     __tablename__ = "comparisons"
 
@@ -45,14 +79,43 @@ class BenchmarkItem(Base):
 
     id = Column(Integer, primary_key=True, index=True)
     name = Column(String, index=True) # e.g. "Frozen Green Beans"
-    lowest_price = Column(Float)
+    category = Column(String, index=True) # e.g. "frozen_sides", from STAPLE_ITEMS
+    lowest_price = Column(Float, index=True)
     unit = Column(String) # e.g. "lb"
     store = Column(String) # e.g. "Walmart"
     
     # Normalized metrics for comparison
     price_per_100g = Column(Float)
-    calories_per_dollar = Column(Float)
-    protein_per_dollar = Column(Float)
+    calories_per_dollar = Column(Float, index=True)
+    protein_per_dollar = Column(Float, index=True)
     
     last_updated = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now())
 
+class NutritionCacheEntry(Base):
+    __tablename__ = "nutrition_cache"
+
+    id = Column(Integer, primary_key=True, index=True)
+    query_key = Column(String, unique=True, index=True) # normalized product name
+    nutrition_data = Column(JSON) # {} for a cached miss
+    found = Column(Boolean, default=True) # False = negative entry (no product upstream)
+    hit_count = Column(Integer, default=0)
+    fetched_at = Column(DateTime(timezone=True), server_default=func.now())
+
+class RefreshJobRecord(Base):
+    __tablename__ = "refresh_jobs"
+
+    id = Column(String, primary_key=True) # uuid hex
+    staple_key = Column(String, index=True) # jobs.staple_set_key
+    # staple_key while queued/running, NULL once finished: the unique index lets only
+    # one worker process run a given staple set at a time
+    running_key = Column(String, unique=True, index=True, nullable=True)
+    status = Column(String) # queued -> running -> succeeded | failed
+    incremental = Column(Boolean, default=False)
+    max_age_s = Column(Float)
+    items = Column(JSON) # {staple name: {"status", "elapsed"}}
+    summary = Column(JSON)
+    error = Column(String)
+    created_at = Column(DateTime(timezone=True), index=True)
+    started_at = Column(DateTime(timezone=True))
+    finished_at = Column(DateTime(timezone=True))
+    heartbeat_at = Column(DateTime(timezone=True)) # last progress write, to spot jobs whose worker died
@@ -1,40 +1,251 @@
 import requests
+from requests.adapters import HTTPAdapter
 import logging
-from typing import Dict, Any, Optional
+import re
+import threading
+import time
+from datetime import datetime, timezone
+from urllib.parse import urlparse
+from typing import Dict, Any, Optional, Tuple
+from sqlalchemy.exc import IntegrityError
+
+import config
+from database import SessionLocal
+from models import NutritionCacheEntry
+from rate_limit import TokenBucket
+from off_index import OffIndex, get_off_index, nutriments_from_row
+from product_matcher import clean_title, best_candidate
+from singleflight import SingleFlight
+from metrics import Counter, Histogram, observe_upstream
+
+_http_session: Optional[requests.Session] = None
+_http_session_lock = threading.Lock()
+
+def get_http_session() -> requests.Session:
+    """Process-wide requests.Session so OpenFoodFacts calls reuse keep-alive connections."""
+    global _http_session
+    with _http_session_lock:
+        if _http_session is None:
+            session = requests.Session()
+            adapter = HTTPAdapter(
+                pool_connections=config.NUTRITION_HTTP_POOL_SIZE,
+                pool_maxsize=config.NUTRITION_HTTP_POOL_SIZE,
+            )
+            session.mount("http://", adapter)
+            session.mount("https://", adapter)
+            session.headers.update({"User-Agent": "CheapNut/1.0 (Integration Test)"})
+            _http_session = session
+        return _http_session
+
+_rate_limiter = TokenBucket(config.OPENFOODFACTS_RATE_PER_S, config.OPENFOODFACTS_BURST)
+
+# Concurrent lookups of the same name share one cache read + API call
+_lookups = SingleFlight("nutrition_lookups")
+
+_stage_seconds = Histogram(
+    "cheapnut_nutrition_stage_seconds",
+    "Nutrition lookup time per stage: index, cache_read, api, cache_write.",
+    ["stage"],
+)
+_lookups_total = Counter(
+    "cheapnut_nutrition_lookups_total",
+    "Nutrition lookups by where they were answered (index, cache, api) and outcome (found, miss, error).",
+    ["source", "outcome"],
+)
+
+def normalize_name(name: str) -> str:
+    """Cache key for a product name: lowercase, punctuation stripped, whitespace collapsed."""
+    return re.sub(r"\s+", " ", re.sub(r"[^\w\s]", " ", name.lower())).strip()
+
+def format_nutrition(nutriments: Dict[str, Any], serving_size: str = None) -> Dict[str, Any]:
+    """Projects OpenFoodFacts per-100g nutriments onto the fields the API returns."""
+    return {
+        "calories": nutriments.get("energy-kcal_100g", 0),
+        "protein": f"{nutriments.get('proteins_100g', 0)}g",
+        "carbohydrates": f"{nutriments.get('carbohydrates_100g', 0)}g",
+        "fat": f"{nutriments.get('fat_100g', 0)}g",
+        "vitamin_a": f"{nutriments.get('vitamin-a_100g', 0)}g",
+        "vitamin_c": f"{nutriments.get('vitamin-c_100g', 0)}g",
+        "iron": f"{nutriments.get('iron_100g', 0)}g",
+        "calcium": f"{nutriments.get('calcium_100g', 0)}g",
+        "serving_size": serving_size or "100g"
+    }
 
 class NutritionService:
+    """
+    Looks up nutrition data in the local OpenFoodFacts index (see off_index.py) when
+    one has been built, otherwise on the OpenFoodFacts API, memoized in the
+    `nutrition_cache` table. With an index present the API is only used if
+    CHEAPNUT_OFF_NETWORK_FALLBACK is enabled.
+
+    Found products are cached for `ttl_s`; names with no upstream match are cached
+    as misses for the shorter `negative_ttl_s`. Network errors are never cached.
+    `base_url` and `session_factory` can point the service at a local stub and test DB.
+    """
+    # How many search candidates are ranked per lookup
+    CANDIDATES = 20
+
+    def __init__(
+        self,
+        base_url: str = None,
+        session_factory=None,
+        http: requests.Session = None,
+        ttl_s: float = None,
+        negative_ttl_s: float = None,
+        rate_limiter: TokenBucket = None,
+        index: OffIndex = None,
+        network_fallback: bool = None,
+    ):
+        self.base_url = (base_url or config.OPENFOODFACTS_URL).rstrip("/")
+        self.session_factory = session_factory or SessionLocal
+        self.http = http or get_http_session()
+        self.ttl_s = ttl_s if ttl_s is not None else config.NUTRITION_CACHE_TTL_S
+        self.negative_ttl_s = negative_ttl_s if negative_ttl_s is not None else config.NUTRITION_NEGATIVE_TTL_S
+        self.rate_limiter = rate_limiter or _rate_limiter
+        self.index = index or get_off_index()
+        self.network_fallback = network_fallback if network_fallback is not None else config.OFF_NETWORK_FALLBACK
+
     def get_nutrition(self, query: str) -> Dict[str, Any]:
         """
         Fetch nutrition data from OpenFoodFacts based on a query string.
         Returns a dictionary of relevant nutrients.
+
+        Scraped titles are cleaned of brand and size tokens before searching, and
+        the returned candidates are ranked against the title so the closest product wins.
+        Concurrent lookups that clean to the same name wait on one upstream call.
         """
+        search_terms = clean_title(query) or query
+        key = normalize_name(search_terms)
+        if not key:
+            return {}
+
+        if self.index.available():
+            try:
+                with _stage_seconds.time("index"):
+                    rows = self.index.candidates(search_terms, limit=self.CANDIDATES)
+                    best = best_candidate(query, [r["product_name"] for r in rows])
+                row = rows[best] if best is not None else None
+                _lookups_total.inc("index", "found" if row else "miss")
+            except Exception as e:
+                logging.warning(f"Local OpenFoodFacts index lookup failed for {query}: {e}")
+                _lookups_total.inc("index", "error")
+                row = None
+            if row:
+                return format_nutrition(nutriments_from_row(row), row.get("serving_size"))
+            if not self.network_fallback:
+                return {}
+
+        nutrition, _ = _lookups.do((self.base_url, key), lambda: self._lookup(key, query, search_terms))
+        return nutrition
+
+    def _lookup(self, key: str, query: str, search_terms: str) -> Dict[str, Any]:
+        with _stage_seconds.time("cache_read"):
+            cached = self._cache_get(key)
+        if cached is not None:
+            _lookups_total.inc("cache", "found" if cached else "miss")
+            return cached
+
+        with _stage_seconds.time("api"):
+            nutrition, cacheable = self._fetch(query, search_terms)
+        _lookups_total.inc("api", "error" if not cacheable else "found" if nutrition else "miss")
+        if cacheable:
+            with _stage_seconds.time("cache_write"):
+                self._cache_put(key, nutrition)
+        return nutrition
+
+    def _cache_get(self, key: str) -> Optional[Dict[str, Any]]:
+        db = self.session_factory()
+        try:
+            entry = db.query(NutritionCacheEntry).filter(NutritionCacheEntry.query_key == key).first()
+            if entry is None:
+                return None
+
+            fetched_at = entry.fetched_at
+            if fetched_at.tzinfo is None:  # SQLite hands back naive datetimes
+                fetched_at = fetched_at.replace(tzinfo=timezone.utc)
+            age = (datetime.now(timezone.utc) - fetched_at).total_seconds()
+            if age > (self.ttl_s if entry.found else self.negative_ttl_s):
+                return None
+
+            entry.hit_count = (entry.hit_count or 0) + 1
+            db.commit()
+            return dict(entry.nutrition_data or {})
+        except Exception as e:
+            logging.warning(f"Nutrition cache read failed for {key}: {e}")
+            db.rollback()
+            return None
+        finally:
+            db.close()
+
+    def _cache_put(self, key: str, nutrition: Dict[str, Any]):
+        db = self.session_factory()
+        try:
+            entry = db.query(NutritionCacheEntry).filter(NutritionCacheEntry.query_key == key).first()
+            if entry is None:
+                entry = NutritionCacheEntry(query_key=key, hit_count=0)
+                db.add(entry)
+            entry.nutrition_data = nutrition
+            entry.found = bool(nutrition)
+            entry.fetched_at = datetime.now(timezone.utc)
+            db.commit()
+        except IntegrityError:
+            # Another worker cached the same name first; theirs is just as good
+            db.rollback()
+        except Exception as e:
+            logging.warning(f"Nutrition cache write failed for {key}: {e}")
+            db.rollback()
+        finally:
+            db.close()
+
+    def _fetch(self, query: str, search_terms: str) -> Tuple[Dict[str, Any], bool]:
+        """Returns (nutrition, cacheable). Only definitive answers from upstream are cacheable."""
+        if not self.rate_limiter.acquire(timeout=config.NUTRITION_HTTP_TIMEOUT_S):
+            logging.warning(f"OpenFoodFacts rate limit: gave up waiting to look up {query}")
+            return {}, False
+
+        host, start = urlparse(self.base_url).hostname or "", time.perf_counter()
         try:
             # OpenFoodFacts Search API
-            url = f"https://world.openfoodfacts.org/cgi/search.pl?search_terms={query}&search_simple=1&action=process&json=1"
-            response = requests.get(url, headers={"User-Agent": "CheapNut/1.0 (Integration Test)"}, timeout=5)
-            
-            if response.status_code == 200:
-                data = response.json()
-                products = data.get('products', [])
-                
-                if products:
-                    # Get the first relevant product
-                    product = products[0]
-                    nutriments = product.get('nutriments', {})
-                    
-                    return {
-                        "calories": nutriments.get("energy-kcal_100g", 0),
-                        "protein": f"{nutriments.get('proteins_100g', 0)}g",
-                        "carbohydrates": f"{nutriments.get('carbohydrates_100g', 0)}g",
-                        "fat": f"{nutriments.get('fat_100g', 0)}g",
-                        "vitamin_a": f"{nutriments.get('vitamin-a_100g', 0)}g",
-                        "vitamin_c": f"{nutriments.get('vitamin-c_100g', 0)}g",
-                        "iron": f"{nutriments.get('iron_100g', 0)}g",
-                        "calcium": f"{nutriments.get('calcium_100g', 0)}g",
-                        "serving_size": product.get("serving_size", "100g")
-                    }
-            
-            return {}
+            response = self.http.get(
+                f"{self.base_url}/cgi/search.pl",
+                params={
+                    "search_terms": search_terms, "search_simple": 1, "action": "process", "json": 1,
+                    "page_size": self.CANDIDATES,
+                },
+                timeout=config.NUTRITION_HTTP_TIMEOUT_S,
+            )
+            observe_upstream(host, time.perf_counter() - start, response.status_code)
+
+            if response.status_code != 200:
+                logging.warning(f"OpenFoodFacts returned {response.status_code} for {query}")
+                return {}, False
+
+            data = response.json()
+            products = data.get('products', [])
+            if not products:
+                return {}, True
+
+            # Rank the candidates against the full title rather than trusting products[0]
+            best = best_candidate(query, [p.get("product_name") or "" for p in products])
+            if best is None:
+                return {}, True
+            product = products[best]
+            nutriments = product.get('nutriments', {})
+
+            return format_nutrition(nutriments, product.get("serving_size")), True
+        except requests.RequestException as e:
+            observe_upstream(host, time.perf_counter() - start, "error")
+            logging.error(f"Error fetching nutrition for {query}: {e}")
+            return {}, False
         except Exception as e:
             logging.error(f"Error fetching nutrition for {query}: {e}")
-            return {}
+            return {}, False
+
+_default_service: Optional[NutritionService] = None
+
+def get_nutrition_service() -> NutritionService:
+    """Shared service for request handlers (the service itself holds no per-request state)."""
+    global _default_service
+    if _default_service is None:
+        _default_service = NutritionService()
+    return _default_service
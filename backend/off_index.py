@@ -0,0 +1,230 @@
+"""
+Local OpenFoodFacts index for zero-network nutrition lookups.
+
+Builds a SQLite file from the OpenFoodFacts bulk export (JSONL or CSV, optionally
+gzipped) holding only the nutriments NutritionService returns, plus an FTS5
+full-text index over product names and brands.
+
+    python off_index.py import openfoodfacts-products.jsonl.gz
+    python off_index.py import en.openfoodfacts.org.products.csv.gz --db ./off_index.db
+    python off_index.py lookup "frozen green beans"
+"""
+from typing import Dict, Any, Iterator, List, Optional, Tuple
+import argparse
+import csv
+import gzip
+import io
+import json
+import logging
+import os
+import re
+import sqlite3
+import sys
+import threading
+import time
+
+import config
+
+# (column, OpenFoodFacts nutriment key) pairs we keep per product, all per 100g
+NUTRIMENT_COLUMNS: List[Tuple[str, str]] = [
+    ("energy_kcal", "energy-kcal_100g"),
+    ("proteins", "proteins_100g"),
+    ("carbohydrates", "carbohydrates_100g"),
+    ("fat", "fat_100g"),
+    ("fiber", "fiber_100g"),
+    ("vitamin_a", "vitamin-a_100g"),
+    ("vitamin_c", "vitamin-c_100g"),
+    ("iron", "iron_100g"),
+    ("calcium", "calcium_100g"),
+]
+
+_COLUMNS = ["code", "product_name", "brands", "serving_size"] + [col for col, _ in NUTRIMENT_COLUMNS]
+
+_SCHEMA = f"""
+CREATE TABLE IF NOT EXISTS off_products (
+    code TEXT PRIMARY KEY,
+    product_name TEXT NOT NULL,
+    brands TEXT,
+    serving_size TEXT,
+    {", ".join(f"{col} REAL" for col, _ in NUTRIMENT_COLUMNS)}
+);
+CREATE VIRTUAL TABLE IF NOT EXISTS off_products_fts USING fts5(
+    product_name, brands, content='off_products', content_rowid='rowid'
+);
+"""
+
+_TOKEN_RE = re.compile(r"[a-z0-9]+")
+
+def _to_float(value) -> Optional[float]:
+    if value in (None, ""):
+        return None
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        return None
+
+def _open_text(path: str) -> io.TextIOBase:
+    if path.endswith(".gz"):
+        return gzip.open(path, "rt", encoding="utf-8", errors="replace", newline="")
+    return open(path, "r", encoding="utf-8", errors="replace", newline="")
+
+def _row(code, name, brands, serving_size, nutriment_lookup) -> Optional[tuple]:
+    if not code or not name:
+        return None
+    values = [_to_float(nutriment_lookup(key)) for _, key in NUTRIMENT_COLUMNS]
+    if all(v is None for v in values):
+        return None  # nothing useful to serve for this product
+    return (str(code), name.strip(), (brands or "").strip(), (serving_size or "").strip(), *values)
+
+def iter_jsonl_rows(path: str) -> Iterator[tuple]:
+    """Streams projected rows out of the JSONL export one line at a time."""
+    with _open_text(path) as f:
+        for line in f:
+            try:
+                product = json.loads(line)
+            except ValueError:
+                continue
+            nutriments = product.get("nutriments") or {}
+            row = _row(
+                product.get("code"), product.get("product_name"), product.get("brands"),
+                product.get("serving_size"), nutriments.get
+            )
+            if row:
+                yield row
+
+def iter_csv_rows(path: str) -> Iterator[tuple]:
+    """Streams projected rows out of the tab-separated CSV export."""
+    csv.field_size_limit(sys.maxsize)
+    with _open_text(path) as f:
+        for record in csv.DictReader(f, delimiter="\t", quoting=csv.QUOTE_NONE):
+            row = _row(
+                record.get("code"), record.get("product_name"), record.get("brands"),
+                record.get("serving_size"), record.get
+            )
+            if row:
+                yield row
+
+def import_dump(path: str, db_path: str = None, chunk_size: int = 5000) -> Dict[str, Any]:
+    """
+    Streams a bulk export into the index in chunks of `chunk_size` rows, then
+    rebuilds the FTS index in one pass. Returns import stats.
+    """
+    db_path = db_path or config.OFF_INDEX_PATH
+    rows = iter_csv_rows(path) if ".csv" in os.path.basename(path) else iter_jsonl_rows(path)
+
+    start = time.monotonic()
+    conn = sqlite3.connect(db_path)
+    try:
+        # The index is rebuildable from the dump, so trade durability for import speed
+        conn.execute("PRAGMA journal_mode=OFF")
+        conn.execute("PRAGMA synchronous=OFF")
+        conn.executescript(_SCHEMA)
+
+        insert = (
+            f"INSERT OR REPLACE INTO off_products ({', '.join(_COLUMNS)}) "
+            f"VALUES ({', '.join('?' for _ in _COLUMNS)})"
+        )
+        imported = 0
+        chunk = []
+        for row in rows:
+            chunk.append(row)
+            if len(chunk) >= chunk_size:
+                conn.executemany(insert, chunk)
+                conn.commit()
+                imported += len(chunk)
+                chunk = []
+        if chunk:
+            conn.executemany(insert, chunk)
+            conn.commit()
+            imported += len(chunk)
+
+        rows_done = time.monotonic()
+        conn.execute("INSERT INTO off_products_fts(off_products_fts) VALUES('rebuild')")
+        conn.commit()
+    finally:
+        conn.close()
+
+    elapsed = time.monotonic() - start
+    return {
+        "rows": imported,
+        "elapsed_s": round(elapsed, 3),
+        "fts_rebuild_s": round(time.monotonic() - rows_done, 3),
+        "rows_per_s": round(imported / elapsed, 1) if elapsed else 0.0,
+    }
+
+def fts_query(text: str, match_all: bool = True) -> str:
+    """Turns free text into an FTS5 query; every token is quoted so punctuation can't break it."""
+    tokens = _TOKEN_RE.findall(text.lower())
+    return (" AND " if match_all else " OR ").join(f'"{t}"' for t in tokens)
+
+class OffIndex:
+    """Read-only access to a built index. Safe to share across threads."""
+    def __init__(self, db_path: str = None):
+        self.db_path = db_path or config.OFF_INDEX_PATH
+        self._local = threading.local()
+
+    def available(self) -> bool:
+        return bool(self.db_path) and os.path.exists(self.db_path)
+
+    def _conn(self) -> sqlite3.Connection:
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(f"file:{self.db_path}?mode=ro", uri=True)
+            conn.row_factory = sqlite3.Row
+            self._local.conn = conn
+        return conn
+
+    def candidates(self, query: str, limit: int = 20) -> List[Dict[str, Any]]:
+        """
+        Products whose name/brand match the query, best bm25 rank first.
+        Tries all tokens first and loosens to any token if that finds nothing.
+        """
+        if not self.available():
+            return []
+        conn = self._conn()
+        for match_all in (True, False):
+            match = fts_query(query, match_all)
+            if not match:
+                return []
+            rows = conn.execute(
+                "SELECT p.* FROM off_products_fts f JOIN off_products p ON p.rowid = f.rowid "
+                "WHERE off_products_fts MATCH ? ORDER BY bm25(off_products_fts) LIMIT ?",
+                (match, limit)
+            ).fetchall()
+            if rows:
+                return [dict(row) for row in rows]
+        return []
+
+    def lookup(self, query: str) -> Optional[Dict[str, Any]]:
+        """Best matching product for the query, or None."""
+        rows = self.candidates(query, limit=1)
+        return rows[0] if rows else None
+
+def nutriments_from_row(row: Dict[str, Any]) -> Dict[str, Any]:
+    """Maps an index row back to OpenFoodFacts nutriment keys."""
+    return {key: row[col] for col, key in NUTRIMENT_COLUMNS if row.get(col) is not None}
+
+_index: Optional[OffIndex] = None
+
+def get_off_index() -> OffIndex:
+    global _index
+    if _index is None:
+        _index = OffIndex()
+    return _index
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO)
+    parser = argparse.ArgumentParser(description="Build or query the local OpenFoodFacts index")
+    parser.add_argument("--db", default=None, help="index file (default: CHEAPNUT_OFF_INDEX_PATH)")
+    sub = parser.add_subparsers(dest="command", required=True)
+    p_import = sub.add_parser("import", help="import a JSONL/CSV(.gz) bulk export")
+    p_import.add_argument("dump")
+    p_import.add_argument("--chunk-size", type=int, default=5000)
+    p_lookup = sub.add_parser("lookup", help="show the best matches for a name")
+    p_lookup.add_argument("query")
+    args = parser.parse_args()
+
+    if args.command == "import":
+        print(json.dumps(import_dump(args.dump, args.db, args.chunk_size), indent=2))
+    else:
+        print(json.dumps(OffIndex(args.db).candidates(args.query, limit=5), indent=2))
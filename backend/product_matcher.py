@@ -0,0 +1,114 @@
+from collections import Counter
+from typing import Dict, List, Optional, Sequence, Set, Tuple
+import re
+
+# Store and house brands that say nothing about what the food is
+BRAND_PHRASES: List[str] = [
+    "great value", "member's mark", "members mark", "marketside", "kirkland signature", "kirkland",
+    "signature select", "signature selects", "signature farms", "o organics", "lucerne",
+    "365 by whole foods market", "whole foods market", "365", "good & gather", "good and gather",
+    "market pantry", "favorite day", "trader joe's", "trader joes", "simply balanced",
+]
+
+# Packaging and filler words that shouldn't influence a match
+STOPWORDS: Set[str] = {
+    "the", "and", "of", "with", "a", "in", "ea", "each", "per", "bag", "bags", "can", "cans",
+    "jar", "box", "bottle", "tub", "pouch", "package", "pkg", "value", "size", "family",
+}
+
+_BRAND_RE = re.compile(
+    r"\b(?:" + "|".join(re.escape(b) for b in sorted(BRAND_PHRASES, key=len, reverse=True)) + r")(?=\W|$)"
+)
+_SIZE_RE = re.compile(
+    r"\b\d+(?:\.\d+)?[\s-]*(?:x\s*\d+(?:\.\d+)?\s*)?"
+    r"(?:fl\.?\s*oz|oz|ounces?|lbs?|pounds?|kg|g|grams?|ml|l|liters?|litres?|gal|gallons?|qt|pt|"
+    r"ct|count|pk|pack|packs|dozen|doz)\b\.?"
+)
+_NON_WORD_RE = re.compile(r"[^a-z0-9]+")
+
+# Matches scoring below this are treated as "no match" rather than a wrong answer
+MIN_MATCH_SCORE = 0.3
+
+def clean_title(title: str) -> str:
+    """
+    Reduces a scraped product title to the words that describe the food.
+    "Great Value Frozen Cut Green Beans, 12 oz" -> "frozen cut green beans"
+    """
+    text = title.lower().replace("’", "'")
+    text = _SIZE_RE.sub(" ", text)
+    text = _BRAND_RE.sub(" ", text)
+    tokens = [t for t in _NON_WORD_RE.split(text) if t and t not in STOPWORDS and not t.isdigit()]
+    return " ".join(tokens)
+
+def _trigrams(tokens: Sequence[str]) -> Set[str]:
+    grams = set()
+    for token in tokens:
+        padded = f"  {token} "
+        grams.update(padded[i:i + 3] for i in range(len(padded) - 2))
+    return grams
+
+class CandidateIndex:
+    """
+    Token/trigram inverted index over candidate names (e.g. OpenFoodFacts products).
+
+    A title is scored against candidates sharing at least one trigram with it:
+    trigram Dice similarity (robust to plurals and typos) blended with the
+    fraction of the title's words the candidate contains. Candidates are cleaned
+    with the same rules as titles so brands and sizes can't dominate the score.
+    """
+    TRIGRAM_WEIGHT = 0.6
+    TOKEN_WEIGHT = 0.4
+
+    def __init__(self, names: Sequence[str]):
+        self.names = list(names)
+        self._tokens: List[Set[str]] = []
+        self._gram_counts: List[int] = []
+        self._postings: Dict[str, List[int]] = {}
+        for idx, name in enumerate(self.names):
+            tokens = clean_title(name).split()
+            grams = _trigrams(tokens)
+            self._tokens.append(set(tokens))
+            self._gram_counts.append(len(grams))
+            for gram in grams:
+                self._postings.setdefault(gram, []).append(idx)
+
+    def match(self, title: str, top_k: int = 1, shortlist: int = 50) -> List[Tuple[int, float]]:
+        """Best `top_k` (candidate index, score) pairs for a title, highest score first."""
+        tokens = clean_title(title).split()
+        if not tokens:
+            return []
+        grams = _trigrams(tokens)
+
+        overlaps: Counter = Counter()
+        for gram in grams:
+            postings = self._postings.get(gram)
+            if postings:
+                overlaps.update(postings)
+        if not overlaps:
+            return []
+
+        query_tokens = set(tokens)
+        scored = []
+        for idx, shared in overlaps.most_common(shortlist):
+            dice = 2.0 * shared / (len(grams) + self._gram_counts[idx])
+            coverage = len(query_tokens & self._tokens[idx]) / len(query_tokens)
+            scored.append((idx, self.TRIGRAM_WEIGHT * dice + self.TOKEN_WEIGHT * coverage))
+        scored.sort(key=lambda pair: pair[1], reverse=True)
+        return scored[:top_k]
+
+    def best(self, title: str, min_score: float = MIN_MATCH_SCORE) -> Optional[Tuple[int, float]]:
+        matches = self.match(title, top_k=1)
+        if matches and matches[0][1] >= min_score:
+            return matches[0]
+        return None
+
+    def match_batch(self, titles: Sequence[str], min_score: float = MIN_MATCH_SCORE) -> List[Optional[Tuple[int, float]]]:
+        """Best match (or None) for every title, in order."""
+        return [self.best(title, min_score) for title in titles]
+
+def best_candidate(title: str, names: Sequence[str], min_score: float = MIN_MATCH_SCORE) -> Optional[int]:
+    """Index of the name in `names` that best matches `title`, or None if nothing is close enough."""
+    if not names:
+        return None
+    match = CandidateIndex(names).best(title, min_score)
+    return match[0] if match else None
@@ -0,0 +1,276 @@
+from collections import Counter
+from contextvars import ContextVar
+from datetime import datetime, timezone
+from typing import Any, Callable, Dict, List, Optional
+from urllib.parse import parse_qs
+import cProfile
+import functools
+import json
+import logging
+import os
+import re
+import sys
+import threading
+import time
+import uuid
+
+import config
+
+MODE_SAMPLE = "sample"
+MODE_CPROFILE = "cprofile"
+
+HEADER = "X-Profile-Id"
+
+_REPORT_ID_RE = re.compile(r"^[0-9TZ]+-[0-9a-f]{8}$")
+
+# The opted-in profile for the request being handled, if any
+_current: ContextVar[Optional["RequestProfile"]] = ContextVar("cheapnut_profile", default=None)
+
+# Only one cProfile session can be active per process (3.12+ raises otherwise);
+# cProfile requests that find it taken are sampled instead
+_cprofile_lock = threading.Lock()
+
+def _mode(value: Optional[str]) -> Optional[str]:
+    """`X-Profile` / `?profile=` value -> mode; "1", "true", "sample" sample stacks, "cprofile" traces."""
+    value = (value or "").strip().lower()
+    if value in ("1", "true", "yes", MODE_SAMPLE):
+        return MODE_SAMPLE
+    if value == MODE_CPROFILE:
+        return MODE_CPROFILE
+    return None
+
+def _frame_label(frame) -> str:
+    return f"{frame.f_globals.get('__name__', '?')}:{frame.f_code.co_name}"
+
+def _thread_role(thread: threading.Thread) -> str:
+    # "search_3" -> "search", "enrich_0" -> "enrich"
+    return thread.name.rsplit("_", 1)[0]
+
+class StackSampler:
+    """
+    Samples the Python stacks of every thread in the process every `interval_s`
+    from a background thread, so the scraper and enrichment pools a request fans
+    out to are covered. Each stack is rooted at its thread's role: "request" for
+    `thread_id`, otherwise the thread name without its pool index. Counts are kept
+    per collapsed stack ("a;b;c"), the input flamegraph.pl and speedscope take.
+
+    Threads aren't tied to requests, so work for other requests running at the
+    same time (and idle threads) shows up too.
+    """
+    def __init__(self, thread_id: int, interval_s: float = None):
+        self.thread_id = thread_id
+        self.interval_s = interval_s or config.PROFILE_INTERVAL_S
+        self.stacks: Counter = Counter()
+        self.samples = 0
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def start(self):
+        self._thread = threading.Thread(target=self._run, name="profile-sampler", daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+        if self._thread:
+            self._thread.join()
+
+    def _roles(self) -> Dict[int, str]:
+        roles = {thread.ident: _thread_role(thread) for thread in threading.enumerate()}
+        roles[self.thread_id] = "request"
+        return roles
+
+    def _run(self):
+        own = threading.get_ident()
+        while not self._stop.wait(self.interval_s):
+            frames = sys._current_frames()
+            roles = self._roles()
+            for ident, frame in frames.items():
+                if ident == own:
+                    continue
+                role = roles.get(ident, "thread")
+                stack = []
+                while frame is not None:
+                    stack.append(_frame_label(frame))
+                    frame = frame.f_back
+                stack.append(role)
+                self.stacks[";".join(reversed(stack))] += 1
+            self.samples += 1
+
+    def collapsed(self) -> str:
+        return "".join(f"{stack} {count}\n" for stack, count in self.stacks.most_common())
+
+class RequestProfile:
+    """One opted-in request: its report id, and the profile once the handler has run."""
+    def __init__(self, mode: str, path: str, query: str):
+        self.requested_mode = mode
+        self.mode = mode
+        self.path = path
+        self.query = query
+        self.id = f"{datetime.now(timezone.utc).strftime('%Y%m%dT%H%M%SZ')}-{uuid.uuid4().hex[:8]}"
+        self.saved = False
+
+    def run(self, fn: Callable, *args, **kwargs):
+        """
+        Runs the handler under the sampler (or cProfile) and saves the report, even
+        if it raises. A cProfile request made while another one is being traced is
+        sampled instead; a sampled request too short to get a sample saves nothing.
+        """
+        started_at = datetime.now(timezone.utc)
+        start = time.perf_counter()
+        sampler, tracer = None, None
+        try:
+            if self.mode == MODE_CPROFILE:
+                tracer = self._start_tracer()
+            if tracer is None:
+                self.mode = MODE_SAMPLE
+                sampler = StackSampler(threading.get_ident())
+                sampler.start()
+            return fn(*args, **kwargs)
+        finally:
+            elapsed = time.perf_counter() - start
+            if tracer:
+                tracer.disable()
+                _cprofile_lock.release()
+            if sampler:
+                sampler.stop()
+            try:
+                self._save(started_at, elapsed, sampler, tracer)
+            except Exception as e:
+                logging.error(f"Failed to save profile {self.id} for {self.path}: {e}")
+
+    def _start_tracer(self) -> Optional[cProfile.Profile]:
+        """An enabled cProfile holding _cprofile_lock, or None if another session is active."""
+        if not _cprofile_lock.acquire(blocking=False):
+            return None
+        tracer = cProfile.Profile()
+        try:
+            tracer.enable()
+        except ValueError as e:
+            # Another profiler (e.g. a debugger) owns the 3.12+ monitoring slot
+            _cprofile_lock.release()
+            logging.warning(f"cProfile unavailable for {self.path}, sampling instead: {e}")
+            return None
+        return tracer
+
+    def _save(self, started_at: datetime, elapsed: float, sampler: Optional[StackSampler], tracer):
+        if sampler and sampler.samples == 0:
+            return
+        os.makedirs(config.PROFILE_DIR, exist_ok=True)
+        base = os.path.join(config.PROFILE_DIR, self.id)
+        if tracer:
+            filename = self.id + ".prof"
+            tracer.dump_stats(base + ".prof")
+        else:
+            filename = self.id + ".folded"
+            with open(base + ".folded", "w", encoding="utf-8") as f:
+                f.write(sampler.collapsed())
+        meta = {
+            "id": self.id,
+            "mode": self.mode,
+            "requested_mode": self.requested_mode,
+            "path": self.path,
+            "query": self.query,
+            "started_at": started_at.isoformat(),
+            "elapsed_s": round(elapsed, 4),
+            "samples": sampler.samples if sampler else None,
+            # cProfile only traces the handler thread before 3.12 (sys.monitoring is process-wide)
+            "threads": "handler" if tracer and sys.version_info < (3, 12) else "all",
+            "file": filename,
+        }
+        with open(base + ".json", "w", encoding="utf-8") as f:
+            json.dump(meta, f)
+        self.saved = True
+        _prune()
+
+def _prune():
+    """Keeps the newest PROFILE_MAX_REPORTS reports."""
+    reports = list_profiles()
+    for meta in reports[config.PROFILE_MAX_REPORTS:]:
+        for name in (meta["id"] + ".json", meta["file"]):
+            try:
+                os.remove(os.path.join(config.PROFILE_DIR, name))
+            except OSError:
+                pass
+
+def profiled(fn: Callable) -> Callable:
+    """
+    Marks a sync endpoint as profilable. Requests that didn't opt in pay one
+    context-variable read; opted-in ones run under RequestProfile.run in the
+    thread that executes the handler.
+    """
+    @functools.wraps(fn)
+    def wrapper(*args, **kwargs):
+        profile = _current.get()
+        if profile is None:
+            return fn(*args, **kwargs)
+        return profile.run(fn, *args, **kwargs)
+    return wrapper
+
+class ProfilingMiddleware:
+    """
+    ASGI middleware that notices the opt-in (`X-Profile: 1|cprofile` header or
+    `?profile=1|cprofile`) and hands the request a RequestProfile for @profiled
+    to run under. The report id comes back in the X-Profile-Id header.
+    """
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or not config.PROFILING:
+            await self.app(scope, receive, send)
+            return
+
+        mode = None
+        for name, value in scope["headers"]:
+            if name == b"x-profile":
+                mode = _mode(value.decode("latin-1"))
+                break
+        query = scope.get("query_string", b"").decode("latin-1")
+        if mode is None and "profile=" in query:
+            mode = _mode(parse_qs(query).get("profile", [None])[0])
+        if mode is None:
+            await self.app(scope, receive, send)
+            return
+
+        profile = RequestProfile(mode, scope["path"], query)
+
+        async def send_with_id(message):
+            if message["type"] == "http.response.start" and profile.saved:
+                message["headers"] = list(message.get("headers", [])) + [
+                    (HEADER.lower().encode(), profile.id.encode())
+                ]
+            await send(message)
+
+        token = _current.set(profile)
+        try:
+            await self.app(scope, receive, send_with_id)
+        finally:
+            _current.reset(token)
+
+def list_profiles() -> List[Dict[str, Any]]:
+    """Saved reports, newest first."""
+    try:
+        names = os.listdir(config.PROFILE_DIR)
+    except FileNotFoundError:
+        return []
+    reports = []
+    for name in names:
+        if not name.endswith(".json"):
+            continue
+        try:
+            with open(os.path.join(config.PROFILE_DIR, name), encoding="utf-8") as f:
+                reports.append(json.load(f))
+        except (OSError, ValueError):
+            continue
+    reports.sort(key=lambda meta: meta["id"], reverse=True)
+    return reports
+
+def profile_path(report_id: str) -> Optional[str]:
+    """File holding a report's stacks or cProfile stats, or None if there's no such report."""
+    if not _REPORT_ID_RE.match(report_id):
+        return None
+    for meta in list_profiles():
+        if meta["id"] == report_id:
+            path = os.path.join(config.PROFILE_DIR, meta["file"])
+            return path if os.path.exists(path) else None
+    return None
@@ -0,0 +1,141 @@
+from typing import Dict, Any, List, NamedTuple, Optional
+import re
+
+# Conversion to grams / millilitres
+GRAMS_PER_UNIT: Dict[str, float] = {
+    "g": 1.0, "gram": 1.0, "grams": 1.0,
+    "kg": 1000.0, "kilogram": 1000.0, "kilograms": 1000.0,
+    "oz": 28.3495, "ounce": 28.3495, "ounces": 28.3495,
+    "lb": 453.592, "lbs": 453.592, "pound": 453.592, "pounds": 453.592,
+}
+ML_PER_UNIT: Dict[str, float] = {
+    "ml": 1.0, "milliliter": 1.0, "milliliters": 1.0, "millilitre": 1.0, "millilitres": 1.0,
+    "l": 1000.0, "liter": 1000.0, "liters": 1000.0, "litre": 1000.0, "litres": 1000.0,
+    "floz": 29.5735,
+    "gal": 3785.41, "gallon": 3785.41, "gallons": 3785.41,
+    "qt": 946.353, "quart": 946.353, "quarts": 946.353,
+    "pt": 473.176, "pint": 473.176, "pints": 473.176,
+}
+# Units that count pieces; "pk"/"pack" multiply a per-piece size if one follows
+COUNT_UNITS: Dict[str, float] = {"ct": 1, "count": 1, "each": 1, "ea": 1, "dozen": 12, "doz": 12}
+PACK_UNITS = {"pk", "pack", "packs"}
+
+_NUMBER = r"\d{1,3}(?:,\d{3})+(?:\.\d+)?|\d+(?:\.\d+)?|\.\d+"
+_UNITS = sorted(
+    list(GRAMS_PER_UNIT) + [u for u in ML_PER_UNIT if u != "floz"] + list(COUNT_UNITS) + list(PACK_UNITS),
+    key=len, reverse=True,
+)
+
+# One pass over the title finds every size token:
+#   "12 oz", "1.5 lbs", "32 fl oz", "6 x 12 oz" (multipack), "12-pack", "pack of 6", "1/2 gal"
+_QUANTITY_RE = re.compile(
+    r"(?<![\w.])(?:"
+    r"(?:(?P<times>\d+)\s*[x×]\s*)?"
+    r"(?:(?P<num>\d+)/(?P<den>\d+)|(?P<amount>" + _NUMBER + r"))"
+    r"[\s-]*(?P<unit>fl\.?\s*oz\.?|fluid\s+ounces?|" + "|".join(_UNITS) + r")"
+    r"|pack\s+of\s+(?P<pack_of>\d+)"
+    r")(?![a-z])",
+    re.IGNORECASE,
+)
+
+# A weight followed by one of these is nutrition copy ("20g protein"), not the package size
+_NUTRIENT_RE = re.compile(
+    r"\s*(?:of\s+)?(?:protein|fat|carb(?:s|ohydrates?)?|sugars?|fib(?:er|re))\b",
+    re.IGNORECASE,
+)
+
+class PackageSize(NamedTuple):
+    """Net contents of one listing. At most one of grams/ml is set; count is pieces."""
+    grams: Optional[float] = None
+    ml: Optional[float] = None
+    count: Optional[float] = None
+
+    @property
+    def weight_g(self) -> Optional[float]:
+        """Net weight, treating liquids as water (1 ml ~ 1 g) when only a volume is known."""
+        return self.grams if self.grams is not None else self.ml
+
+def parse_quantity(title: str) -> Optional[PackageSize]:
+    """
+    Package size from a scraped title, or None if it doesn't state one.
+
+    The first weight or volume in the title wins, skipping nutrition claims like
+    "20g protein". It is taken as the size of one piece: a multipack count
+    ("6 x 12 oz", "12 pk ... 12 fl oz", "pack of 6") or a piece count ("1.5 oz,
+    10 ct", "dozen") multiplies it. Piece counts are also reported as `count`.
+    """
+    if not title:
+        return None
+
+    measure = None  # (kind, amount)
+    packs = None
+    count = None
+    for m in _QUANTITY_RE.finditer(title):
+        if m.group("pack_of"):
+            packs = packs or float(m.group("pack_of"))
+            continue
+
+        if m.group("amount"):
+            amount = float(m.group("amount").replace(",", ""))
+        else:
+            den = float(m.group("den"))
+            if not den:
+                continue
+            amount = float(m.group("num")) / den
+        unit = re.sub(r"[\s.]", "", m.group("unit").lower())
+        if unit.startswith("fl") or unit.startswith("fluid"):
+            unit = "floz"
+
+        if unit in PACK_UNITS:
+            packs = packs or amount
+        elif unit in COUNT_UNITS:
+            count = count or amount * COUNT_UNITS[unit]
+        elif measure is None:
+            if _NUTRIENT_RE.match(title, m.end()):
+                continue
+            if m.group("times"):
+                amount *= float(m.group("times"))
+            if unit in GRAMS_PER_UNIT:
+                measure = ("g", amount * GRAMS_PER_UNIT[unit])
+            else:
+                measure = ("ml", amount * ML_PER_UNIT[unit])
+
+    if measure is None:
+        if count is None and packs is None:
+            return None
+        return PackageSize(count=count or packs)
+
+    kind, amount = measure
+    if packs:
+        amount *= packs
+    elif count:
+        amount *= count
+    amount = round(amount, 2)
+    return PackageSize(grams=amount, count=count) if kind == "g" else PackageSize(ml=amount, count=count)
+
+def annotate_offer(offer: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Adds normalized size and unit-price fields to a scraped offer (in place):
+    net_grams, net_ml, pack_count, price_per_100g, price_per_100ml.
+
+    The size comes from the title; failing that, an offer priced per weight or
+    volume unit (e.g. unit "lb") is taken to be one of that unit.
+    """
+    size = parse_quantity(offer.get("name") or "")
+    unit = (offer.get("unit") or "").lower()
+    if (size is None or size.weight_g is None) and (unit in GRAMS_PER_UNIT or unit in ML_PER_UNIT):
+        size = parse_quantity(f"{offer.get('quantity') or 1} {unit}")
+    size = size or PackageSize()
+
+    price = offer.get("price") or 0
+    offer["net_grams"] = size.grams
+    offer["net_ml"] = size.ml
+    offer["pack_count"] = size.count
+    offer["price_per_100g"] = round(price * 100.0 / size.grams, 4) if price > 0 and size.grams else None
+    offer["price_per_100ml"] = round(price * 100.0 / size.ml, 4) if price > 0 and size.ml else None
+    return offer
+
+def annotate_offers(offers: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    for offer in offers:
+        annotate_offer(offer)
+    return offers
@@ -1,5 +1,5 @@
 from pydantic import BaseModel
-from typing import Optional, Dict, Any, List
+from typing import Optional, Dict, Any, List, Union
 from datetime import datetime
 
 class ItemBase(BaseModel):
@@ -10,6 +10,11 @@ class ItemBase(BaseModel):
     unit: str
     quantity: float
     nutrition_data: Optional[Dict[str, Any]] = None
+    net_grams: Optional[float] = None
+    net_ml: Optional[float] = None
+    pack_count: Optional[float] = None
+    price_per_100g: Optional[float] = None
+    price_per_100ml: Optional[float] = None
 
 class ItemCreate(ItemBase):
     pass
@@ -20,7 +25,7 @@ class Item(ItemBase):
     updated_at: Optional[datetime] = None
 
     class Config:
-        orm_mode = True
+        from_attributes = True
 
 class ComparisonBase(BaseModel):
     name: str
@@ -35,4 +40,16 @@ class Comparison(ComparisonBase):
     created_at: datetime
 
     class Config:
-        orm_mode = True
+        from_attributes = True
+
+class FastFoodOffer(BaseModel):
+    name: str
+    price: float
+    store: Optional[str] = None
+    nutrition: Optional[Dict[str, Any]] = None
+
+class CompareBatchRequest(BaseModel):
+    # Each entry is a name to look up among cached restaurant offers, or an offer itself
+    items: List[Union[str, FastFoodOffer]]
+    metric: str = "protein" # rank alternatives by "protein" or "calories"
+    top_k: int = 5
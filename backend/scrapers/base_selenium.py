@@ -1,46 +1,233 @@
-from selenium import webdriver
-from selenium.webdriver.chrome.service import Service as ChromeService
-from selenium.webdriver.chrome.options import Options
-from webdriver_manager.chrome import ChromeDriverManager
-from typing import List, Optional
-from .interface import ScraperInterface, ProductInfo
+from selenium.common.exceptions import TimeoutException
+from typing import Callable, List, Optional, Tuple
+from .interface import ScraperInterface, ScraperBlocked, ProductInfo
+from .health import CircuitOpen, get_store_health
+from .browser_pool import (
+    get_browser_pool, BrowserPoolExhausted, PooledBrowser, wait_until_ready, page_complete, page_weight,
+    record_page_load,
+)
+from .http_fetch import (
+    NeedsBrowser, fetch_html, is_blocked_title, next_data, iter_json_products, record_tier,
+    TIER_HTTP, TIER_BROWSER,
+)
+from .extraction import ExtractionSpec, extract_dom, extract_html, extract_products
+from .result_cache import normalize_query
+from singleflight import SingleFlight
+from metrics import scrape_stage_seconds, scrapes_total
+import threading
 import logging
+import time
+
+import config
+
+# Consecutive product-less HTTP pages before a store is sent straight to the browser
+_HTTP_MISSES_BEFORE_BACKOFF = 2
+
+# Identical searches in flight at once share one scrape, keyed on (store, normalized query)
+_searches = SingleFlight("store_searches")
 
 class SeleniumScraper(ScraperInterface):
+    """
+    Tiered scraper. A search first tries a plain HTTP fetch of `search_url(query)`
+    parsed by `parse_html` (embedded __NEXT_DATA__ JSON, then the store's `spec`
+    on the server-rendered HTML). Only if that is blocked, fails, or finds
+    nothing (the page renders client-side) does it lease a pooled browser and run
+    `_perform_search`, which by default extracts the same `spec` from the rendered
+    page in one script call. Every result is stamped with the tier that served it.
+
+    A store that is blocked over plain HTTP, or whose pages keep coming back
+    without products, skips the HTTP tier for HTTP_TIER_BACKOFF_S.
+
+    Every fetch goes through the store's circuit breaker (scrapers.health):
+    failures and bot walls raise instead of returning [], and while the circuit
+    is open the fetch raises CircuitOpen without touching the network. A page
+    that loaded without products is an empty result, not a failure, and running
+    out of pooled browsers is a local problem that leaves the breaker alone.
+
+    Each stage is timed into cheapnut_scrape_stage_seconds and every fetch's
+    outcome counted in cheapnut_scrapes_total (see metrics.py).
+    """
+    store = ""
+    item_type = "grocery"
+    unit = "item"
+    # Where the product cards are, for both tiers
+    spec: Optional[ExtractionSpec] = None
+    # Look for products in the page's __NEXT_DATA__ JSON first
+    use_next_data = False
+    max_results: Optional[int] = 10
+
     def __init__(self, headless: bool = True):
-        self.options = Options()
-        if headless:
-            self.options.add_argument("--headless=new")
-        self.options.add_argument("--no-sandbox")
-        self.options.add_argument("--disable-dev-shm-usage")
-        self.options.add_argument("--disable-gpu")
-        self.options.add_argument("--window-size=1920,1080")
-        self.options.add_argument('user-agent=Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36')
-        
-        self.driver = None
+        self.headless = headless
+        # Drivers are leased per thread, so one scraper instance can serve concurrent searches
+        self._local = threading.local()
+        self._http_skip_until = 0.0
+        self._http_misses = 0
+
+    @property
+    def driver(self):
+        return getattr(self._local, "driver", None)
+
+    @driver.setter
+    def driver(self, value):
+        self._local.driver = value
 
     def _setup_driver(self):
         if not self.driver:
-            self.driver = webdriver.Chrome(
-                service=ChromeService(ChromeDriverManager().install()),
-                options=self.options
-            )
+            self._local.pool = get_browser_pool(self.headless)
+            self._local.lease = self._local.pool.acquire()
+            self.driver = self._local.lease.driver
 
     def _teardown_driver(self):
-        if self.driver:
-            self.driver.quit()
-            self.driver = None
+        lease: Optional[PooledBrowser] = getattr(self._local, "lease", None)
+        if lease:
+            self._local.lease = None
+            self._local.pool.release(lease)
+        self.driver = None
 
-    def search(self, query: str) -> List[ProductInfo]:
+    def search_url(self, query: str) -> Optional[str]:
+        """Page the HTTP tier fetches for `query`; None sends every search to the browser."""
+        return None
+
+    def _offer(self, name: str, price: float, image: str = "") -> ProductInfo:
+        offer = {
+            "name": name,
+            "price": price,
+            "unit": self.unit,
+            "store": self.store,
+            "type": self.item_type,
+            "nutrition": {},
+        }
+        if image:
+            offer["image"] = image
+        return offer
+
+    def parse_html(self, html: str) -> List[ProductInfo]:
+        """Products in a server-rendered page. Pure function of the HTML, so saved pages can be checked offline."""
+        results = []
+        if self.use_next_data:
+            data = next_data(html)
+            if data:
+                results = [self._offer(name, price, image) for name, price, image in iter_json_products(data)]
+
+        if not results and self.spec:
+            records = extract_html(html, self.spec, self.max_results)
+            results = [self._offer(*product) for product in extract_products(records, self.spec, self.max_results)]
+
+        return results[:self.max_results] if self.max_results else results
+
+    def _extract_page(self, url: str) -> List[ProductInfo]:
+        """
+        Loads `url` in the leased browser, waits until the products are there (or
+        the network goes idle) and extracts `spec` in a single script call.
+
+        If the products never show up but the page itself finished loading, the
+        search had no results and [] is returned. Only a page still loading at
+        the timeout raises TimeoutException.
+        """
+        spec = self.spec
+        health = get_store_health(self.store)
+        timeout = health.ready_timeout()
+        start = time.perf_counter()
+        with scrape_stage_seconds.time(self.store, "page_load"):
+            self.driver.get(url)
+            if is_blocked_title(self.driver.title):
+                raise ScraperBlocked(f"{self.store} served a bot check ({self.driver.title})")
+            try:
+                wait_until_ready(self.driver, spec.ready_selector, timeout)
+            except TimeoutException:
+                health.observe_load(timeout)
+                if not page_complete(self.driver):
+                    raise
+                logging.info(f"{self.store}: no products on {url} after {timeout:.1f}s; treating as no results")
+                return []
+        with scrape_stage_seconds.time(self.store, "extract"):
+            records = extract_dom(self.driver, spec, self.max_results)
+            results = [self._offer(*product) for product in extract_products(records, spec, self.max_results)]
+        elapsed = time.perf_counter() - start
+        health.observe_load(elapsed)
+        record_page_load(self.store, self._local.lease.lean, elapsed, page_weight(self.driver))
+        return results
+
+    def _try_http(self, url: Optional[str]) -> Optional[List[ProductInfo]]:
+        """Results from the HTTP tier, or None if the browser is needed."""
+        if not url or not config.HTTP_TIER_ENABLED or time.monotonic() < self._http_skip_until:
+            return None
         try:
-            self._setup_driver()
-            return self._perform_search(query)
+            with scrape_stage_seconds.time(self.store, "http_fetch"):
+                html = fetch_html(url)
+            with scrape_stage_seconds.time(self.store, "parse"):
+                results = self.parse_html(html)
+        except NeedsBrowser as e:
+            logging.info(f"{self.store}: HTTP tier can't serve {url} ({e}); using the browser")
+            self._http_skip_until = time.monotonic() + config.HTTP_TIER_BACKOFF_S
+            return None
         except Exception as e:
-            logging.error(f"Error during search: {e}")
-            return []
+            logging.warning(f"{self.store}: HTTP tier failed on {url}: {e}")
+            return None
+
+        if results:
+            self._http_misses = 0
+            return results
+        # Might just be a query with no results, so only back off once it keeps happening
+        self._http_misses += 1
+        if self._http_misses >= _HTTP_MISSES_BEFORE_BACKOFF:
+            logging.info(f"{self.store}: pages render client-side; using the browser for now")
+            self._http_skip_until = time.monotonic() + config.HTTP_TIER_BACKOFF_S
+            self._http_misses = 0
+        return None
+
+    def _fetch_tiered(self, url: Optional[str], browser_fetch: Callable[[], List[ProductInfo]]) -> Tuple[List[ProductInfo], str]:
+        health = get_store_health(self.store)
+        if not health.allow():
+            scrapes_total.inc(self.store, "skipped")
+            raise CircuitOpen(f"{self.store} is skipped until its circuit breaker cooldown ends")
+        start = time.perf_counter()
+        try:
+            results = self._try_http(url)
+            tier = TIER_HTTP
+            if results is None:
+                tier = TIER_BROWSER
+                try:
+                    # Includes Chrome startup when no warm session is idle
+                    with scrape_stage_seconds.time(self.store, "browser_lease"):
+                        self._setup_driver()
+                    results = browser_fetch() or []
+                finally:
+                    self._teardown_driver()
+        except BrowserPoolExhausted:
+            # Our capacity, not the store's health
+            health.record_aborted()
+            scrapes_total.inc(self.store, "no_browser")
+            raise
+        except ScraperBlocked as e:
+            health.record_failure(str(e), blocked=True)
+            scrapes_total.inc(self.store, "error")
+            raise
+        except Exception as e:
+            health.record_failure(f"{type(e).__name__}: {e}".strip())
+            scrapes_total.inc(self.store, "error")
+            raise
         finally:
-            self._teardown_driver()
+            scrape_stage_seconds.observe(time.perf_counter() - start, self.store, "total")
+        health.record_success()
+        scrapes_total.inc(self.store, "success" if results else "empty")
+        for result in results:
+            result["tier"] = tier
+        record_tier(self.store, tier)
+        return results, tier
+
+    def search(self, query: str) -> List[ProductInfo]:
+        """Scrapes `query`, or waits on the identical scrape already in flight for this store."""
+        def scrape() -> List[ProductInfo]:
+            results, _ = self._fetch_tiered(self.search_url(query), lambda: self._perform_search(query))
+            return results
+
+        results, _ = _searches.do((self.store, normalize_query(query)), scrape)
+        return results
 
     def _perform_search(self, query: str) -> List[ProductInfo]:
-        """Override this in subclasses"""
-        return []
+        """Browser tier for a search; override for sites `spec` can't describe."""
+        url = self.search_url(query)
+        if not url or not self.spec:
+            return []
+        return self._extract_page(url)
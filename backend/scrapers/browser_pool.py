@@ -0,0 +1,417 @@
+from selenium import webdriver
+from selenium.webdriver.common.by import By
+from selenium.webdriver.support.ui import WebDriverWait
+from selenium.webdriver.support import expected_conditions as EC
+from selenium.webdriver.chrome.service import Service as ChromeService
+from selenium.webdriver.chrome.options import Options
+from webdriver_manager.chrome import ChromeDriverManager
+from contextlib import contextmanager
+from functools import lru_cache
+from typing import Dict, Any, List, Optional, Tuple
+import threading
+import logging
+import time
+
+import config
+from metrics import CallbackGauge, Histogram
+
+USER_AGENT = 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36'
+
+# Requests lean sessions never make: images, media, fonts, and the ad/analytics
+# hosts the store sites load alongside their product grids
+BLOCKED_URL_PATTERNS = [
+    "*.png", "*.jpg", "*.jpeg", "*.gif", "*.webp", "*.avif", "*.svg", "*.ico",
+    "*.mp4", "*.webm", "*.m3u8", "*.mp3",
+    "*.woff", "*.woff2", "*.ttf", "*.otf", "*.eot",
+    "*doubleclick.net*", "*googlesyndication.com*", "*googletagmanager.com*",
+    "*google-analytics.com*", "*googleadservices.com*", "*amazon-adsystem.com*",
+    "*facebook.net*", "*connect.facebook.com*", "*analytics.tiktok.com*", "*bat.bing.com*",
+    "*hotjar.com*", "*optimizely.com*", "*adobedtm.com*", "*demdex.net*", "*omtrdc.net*",
+    "*criteo.com*", "*criteo.net*", "*scorecardresearch.com*", "*quantserve.com*",
+    "*segment.io*", "*segment.com*", "*nr-data.net*", "*newrelic.com*",
+    "*branch.io*", "*quantummetric.com*", "*pinimg.com*", "*snapchat.com*",
+]
+
+# Resource Timing keeps 250 entries by default; heavy pages need more to be weighed
+_TIMING_BUFFER_JS = "performance.setResourceTimingBufferSize(5000);"
+
+# Network activity and bytes over the wire for the current page, per Resource Timing
+# (cross-origin responses without Timing-Allow-Origin report 0 bytes)
+_PAGE_WEIGHT_JS = """
+const entries = performance.getEntriesByType("navigation").concat(performance.getEntriesByType("resource"));
+return {
+    state: document.readyState,
+    requests: entries.length,
+    bytes: entries.reduce((total, e) => total + (e.transferSize || 0), 0),
+};
+"""
+
+_start_seconds = Histogram("cheapnut_browser_start_seconds", "Time to launch and configure a Chrome session.")
+
+class BrowserPoolExhausted(Exception):
+    """Raised when no browser session could be leased within the lease timeout."""
+    pass
+
+def build_chrome_options(headless: bool = True, lean: bool = False) -> Options:
+    options = Options()
+    if headless:
+        options.add_argument("--headless=new")
+    options.add_argument("--no-sandbox")
+    options.add_argument("--disable-dev-shm-usage")
+    options.add_argument("--disable-gpu")
+    options.add_argument("--window-size=1920,1080")
+    options.add_argument(f'user-agent={USER_AGENT}')
+    if lean:
+        # driver.get returns at DOMContentLoaded; scrapers wait for what they need
+        options.page_load_strategy = "eager"
+        options.add_argument("--blink-settings=imagesEnabled=false")
+        options.add_experimental_option("prefs", {
+            "profile.managed_default_content_settings.images": 2,
+            "profile.default_content_setting_values.notifications": 2,
+            "profile.default_content_setting_values.geolocation": 2,
+        })
+    return options
+
+def _prepare_session(driver, lean: bool):
+    """CDP setup for a new session: a bigger timing buffer, plus the request blocklist when lean."""
+    try:
+        driver.execute_cdp_cmd("Page.addScriptToEvaluateOnNewDocument", {"source": _TIMING_BUFFER_JS})
+        if lean:
+            driver.execute_cdp_cmd("Network.enable", {})
+            driver.execute_cdp_cmd("Network.setBlockedURLs", {"urls": BLOCKED_URL_PATTERNS})
+    except Exception as e:
+        logging.warning(f"Could not configure browser session over CDP: {e}")
+
+def wait_until_ready(driver, selector: Optional[str] = None, timeout: float = None):
+    """
+    Blocks until `selector` matches (TimeoutException if it never does) or, with
+    no selector, until the page has parsed and made no new request for
+    BROWSER_NETWORK_IDLE_S. A page that never goes quiet is used as-is at the timeout.
+    """
+    timeout = config.BROWSER_READY_TIMEOUT_S if timeout is None else timeout
+    if selector:
+        WebDriverWait(driver, timeout).until(EC.presence_of_element_located((By.CSS_SELECTOR, selector)))
+        return
+
+    deadline = time.monotonic() + timeout
+    last_requests, quiet_since = -1, time.monotonic()
+    while time.monotonic() < deadline:
+        weight = driver.execute_script(_PAGE_WEIGHT_JS)
+        now = time.monotonic()
+        if weight["requests"] != last_requests or weight["state"] == "loading":
+            last_requests, quiet_since = weight["requests"], now
+        elif now - quiet_since >= config.BROWSER_NETWORK_IDLE_S:
+            return
+        time.sleep(0.1)
+
+def page_weight(driver) -> Dict[str, int]:
+    """Requests made and bytes transferred so far by the current page."""
+    try:
+        weight = driver.execute_script(_PAGE_WEIGHT_JS)
+        return {"requests": int(weight["requests"]), "bytes": int(weight["bytes"])}
+    except Exception:
+        return {"requests": 0, "bytes": 0}
+
+def page_complete(driver) -> bool:
+    """Whether the current page has finished loading (document.readyState is "complete")."""
+    try:
+        return driver.execute_script("return document.readyState") == "complete"
+    except Exception:
+        return False
+
+@lru_cache(maxsize=1)
+def _chromedriver_path() -> str:
+    # Resolving the driver hits the network/disk; do it once per process
+    return ChromeDriverManager().install()
+
+class PooledBrowser:
+    """A live Chrome session plus the bookkeeping the pool needs to recycle it."""
+    def __init__(self, driver, lean: bool = False):
+        self.driver = driver
+        self.lean = lean
+        self.pages = 0
+        self.created_at = time.monotonic()
+
+class BrowserPool:
+    """
+    Process-wide pool of warm Chrome sessions.
+
+    Scrapers lease a session per search instead of launching Chrome each time.
+    Sessions are health-checked when leased and recycled after `max_pages`
+    leases or once the page's JS heap grows past `max_memory_mb`. `lean`
+    sessions skip images, media, fonts and trackers (see BLOCKED_URL_PATTERNS).
+    """
+    def __init__(
+        self,
+        headless: bool = True,
+        lean: bool = None,
+        size: int = None,
+        lease_timeout_s: float = None,
+        max_pages: int = None,
+        max_memory_mb: float = None,
+    ):
+        self.headless = headless
+        self.lean = config.BROWSER_LEAN if lean is None else lean
+        self.size = size or config.BROWSER_POOL_SIZE
+        self.lease_timeout_s = lease_timeout_s if lease_timeout_s is not None else config.BROWSER_LEASE_TIMEOUT_S
+        self.max_pages = max_pages or config.BROWSER_MAX_PAGES
+        self.max_memory_mb = max_memory_mb if max_memory_mb is not None else config.BROWSER_MAX_MEMORY_MB
+
+        self._idle: List[PooledBrowser] = []
+        self._live = 0  # idle + leased + being created
+        self._waiting = 0
+        self._closed = False
+        self._cond = threading.Condition()
+
+        self._stats = {
+            "created": 0,
+            "leases": 0,
+            "lease_timeouts": 0,
+            "lease_wait_total_s": 0.0,
+            "lease_wait_max_s": 0.0,
+            "recycled_pages": 0,
+            "recycled_memory": 0,
+            "recycled_unhealthy": 0,
+            "create_errors": 0,
+        }
+
+    def _create(self) -> PooledBrowser:
+        with _start_seconds.time():
+            driver = webdriver.Chrome(
+                service=ChromeService(_chromedriver_path()),
+                options=build_chrome_options(self.headless, self.lean)
+            )
+            _prepare_session(driver, self.lean)
+        with self._cond:
+            self._stats["created"] += 1
+        return PooledBrowser(driver, self.lean)
+
+    def _quit(self, browser: PooledBrowser):
+        try:
+            browser.driver.quit()
+        except Exception as e:
+            logging.warning(f"Error quitting pooled browser: {e}")
+
+    def _is_healthy(self, browser: PooledBrowser) -> bool:
+        try:
+            return browser.driver.execute_script("return 1") == 1
+        except Exception:
+            return False
+
+    def _heap_mb(self, browser: PooledBrowser) -> float:
+        try:
+            used = browser.driver.execute_script(
+                "return (performance.memory && performance.memory.usedJSHeapSize) || 0"
+            )
+            return float(used or 0) / (1024 * 1024)
+        except Exception:
+            return 0.0
+
+    def warm(self, count: int = None):
+        """Starts sessions up front so the first searches don't pay Chrome cold-start."""
+        count = min(count or self.size, self.size)
+        for _ in range(count):
+            with self._cond:
+                if self._closed or self._live >= self.size:
+                    return
+                self._live += 1
+            try:
+                browser = self._create()
+            except Exception as e:
+                with self._cond:
+                    self._live -= 1
+                    self._stats["create_errors"] += 1
+                logging.error(f"Failed to pre-warm browser session: {e}")
+                return
+            with self._cond:
+                self._idle.append(browser)
+                self._cond.notify()
+        logging.info(f"Browser pool warmed with {count} session(s)")
+
+    def acquire(self, timeout: float = None) -> PooledBrowser:
+        timeout = self.lease_timeout_s if timeout is None else timeout
+        start = time.monotonic()
+        deadline = start + timeout
+
+        while True:
+            browser = None
+            with self._cond:
+                while not self._idle and self._live >= self.size:
+                    remaining = deadline - time.monotonic()
+                    if remaining <= 0 or self._closed:
+                        self._stats["lease_timeouts"] += 1
+                        raise BrowserPoolExhausted(
+                            f"No browser session available after {timeout:.1f}s (pool size {self.size})"
+                        )
+                    self._waiting += 1
+                    try:
+                        self._cond.wait(remaining)
+                    finally:
+                        self._waiting -= 1
+
+                if self._idle:
+                    browser = self._idle.pop()
+                else:
+                    self._live += 1
+
+            if browser is None:
+                try:
+                    browser = self._create()
+                except Exception:
+                    with self._cond:
+                        self._live -= 1
+                        self._stats["create_errors"] += 1
+                        self._cond.notify()
+                    raise
+            elif not self._is_healthy(browser):
+                logging.warning("Discarding unhealthy pooled browser session")
+                self._discard(browser, "recycled_unhealthy")
+                continue
+
+            waited = time.monotonic() - start
+            with self._cond:
+                self._stats["leases"] += 1
+                self._stats["lease_wait_total_s"] += waited
+                self._stats["lease_wait_max_s"] = max(self._stats["lease_wait_max_s"], waited)
+            return browser
+
+    def release(self, browser: PooledBrowser):
+        browser.pages += 1
+        if self._closed:
+            self._discard(browser, None)
+            return
+
+        reason = None
+        if browser.pages >= self.max_pages:
+            reason = "recycled_pages"
+        elif self.max_memory_mb and self._heap_mb(browser) >= self.max_memory_mb:
+            reason = "recycled_memory"
+        if reason:
+            self._discard(browser, reason)
+            return
+
+        with self._cond:
+            self._idle.append(browser)
+            self._cond.notify()
+
+    def _discard(self, browser: PooledBrowser, reason: Optional[str]):
+        self._quit(browser)
+        with self._cond:
+            self._live -= 1
+            if reason:
+                self._stats[reason] += 1
+            self._cond.notify()
+
+    @contextmanager
+    def lease(self, timeout: float = None):
+        browser = self.acquire(timeout)
+        try:
+            yield browser.driver
+        finally:
+            self.release(browser)
+
+    def stats(self) -> Dict[str, Any]:
+        with self._cond:
+            stats = dict(self._stats)
+            stats.update({
+                "headless": self.headless,
+                "lean": self.lean,
+                "size": self.size,
+                "live": self._live,
+                "idle": len(self._idle),
+                "in_use": self._live - len(self._idle),
+                "waiting": self._waiting,
+                "lease_timeout_s": self.lease_timeout_s,
+                "max_pages": self.max_pages,
+                "max_memory_mb": self.max_memory_mb,
+            })
+        leases = stats["leases"]
+        stats["lease_wait_avg_s"] = round(stats["lease_wait_total_s"] / leases, 4) if leases else 0.0
+        stats["lease_wait_total_s"] = round(stats["lease_wait_total_s"], 4)
+        stats["lease_wait_max_s"] = round(stats["lease_wait_max_s"], 4)
+        return stats
+
+    def close(self):
+        with self._cond:
+            self._closed = True
+            idle, self._idle = self._idle, []
+            self._live -= len(idle)
+            self._cond.notify_all()
+        for browser in idle:
+            self._quit(browser)
+
+_pools: Dict[Tuple[bool, bool], BrowserPool] = {}
+_pools_lock = threading.Lock()
+
+def get_browser_pool(headless: bool = True, lean: bool = None) -> BrowserPool:
+    """Returns the shared pool for the given mode (lean per BROWSER_LEAN by default), creating it on first use."""
+    lean = config.BROWSER_LEAN if lean is None else lean
+    with _pools_lock:
+        pool = _pools.get((headless, lean))
+        if pool is None:
+            pool = _pools[(headless, lean)] = BrowserPool(headless=headless, lean=lean)
+        return pool
+
+def browser_pool_stats() -> List[Dict[str, Any]]:
+    with _pools_lock:
+        pools = list(_pools.values())
+    return [pool.stats() for pool in pools]
+
+def _session_gauge() -> Dict[Tuple[str, str, str], int]:
+    values = {}
+    for stats in browser_pool_stats():
+        profile = "lean" if stats["lean"] else "full"
+        mode = "headless" if stats["headless"] else "headed"
+        for state in ("live", "idle", "in_use", "waiting"):
+            values[(mode, profile, state)] = stats[state]
+    return values
+
+CallbackGauge(
+    "cheapnut_browser_sessions",
+    "Chrome sessions per pool: live, idle, in_use, and callers waiting for a lease.",
+    ["mode", "profile", "state"],
+    _session_gauge,
+)
+
+def shutdown_browser_pools():
+    with _pools_lock:
+        pools = list(_pools.values())
+        _pools.clear()
+    for pool in pools:
+        pool.close()
+
+_page_loads: Dict[str, Dict[str, Dict[str, float]]] = {}
+_page_loads_lock = threading.Lock()
+
+def record_page_load(store: str, lean: bool, seconds: float, weight: Dict[str, int]):
+    profile = "lean" if lean else "full"
+    with _page_loads_lock:
+        totals = _page_loads.setdefault(store, {}).setdefault(profile, {
+            "pages": 0, "load_total_s": 0.0, "load_max_s": 0.0, "bytes_total": 0, "requests_total": 0,
+        })
+        totals["pages"] += 1
+        totals["load_total_s"] += seconds
+        totals["load_max_s"] = max(totals["load_max_s"], seconds)
+        totals["bytes_total"] += weight.get("bytes", 0)
+        totals["requests_total"] += weight.get("requests", 0)
+
+def page_load_stats() -> Dict[str, Dict[str, Dict[str, float]]]:
+    """
+    Per store and browser profile ("lean" / "full"): pages loaded, average and
+    worst time from navigation to extracted products, and average bytes and
+    requests per page.
+    """
+    with _page_loads_lock:
+        stats = {}
+        for store, profiles in _page_loads.items():
+            stats[store] = {}
+            for profile, totals in profiles.items():
+                pages = totals["pages"]
+                stats[store][profile] = {
+                    "pages": pages,
+                    "load_avg_s": round(totals["load_total_s"] / pages, 3),
+                    "load_max_s": round(totals["load_max_s"], 3),
+                    "kb_avg": round(totals["bytes_total"] / pages / 1024, 1),
+                    "requests_avg": round(totals["requests_total"] / pages, 1),
+                }
+        return stats
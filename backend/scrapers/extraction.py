@@ -0,0 +1,148 @@
+from typing import Any, Dict, List, NamedTuple, Optional, Pattern, Tuple
+import json
+import re
+
+from bs4 import BeautifulSoup
+
+from .http_fetch import parse_price
+
+# Price-anchored pages: a short text node with a "$" in it marks a product's price
+_ANCHOR_MAX_LEN = 20
+
+class ExtractionSpec(NamedTuple):
+    """
+    Where a store's product cards live on a page. The same spec drives the
+    browser tier (one execute_script per page) and the HTTP tier (BeautifulSoup).
+
+    Selectors are CSS. `name`, `price` and `image` are looked up inside each
+    `container`; the first number `price_regex` captures is the price (the
+    shared dollar-amount pattern when unset). With no `container` the page is
+    price-anchored: every short "$" text node's grandparent is a card, its
+    price line the price and its last other line the name. `fallback` is a
+    second container selector, used only when `container` matches nothing.
+
+    The browser waits for `wait_for` (default `container`) to appear, or for
+    the network to go idle when there is nothing to wait for.
+    """
+    container: Optional[str] = None
+    name: Optional[str] = None
+    price: Optional[str] = None
+    image: Optional[str] = None
+    price_regex: Optional[str] = None
+    wait_for: Optional[str] = None
+    fallback: Optional[str] = None
+
+    @property
+    def ready_selector(self) -> Optional[str]:
+        return self.wait_for or self.container
+
+# Runs in the page: every card's raw name/price/image text in one round trip.
+# Records match what extract_html builds from the same spec.
+_EXTRACT_JS = """
+const spec = arguments[0];
+const limit = arguments[1];
+const text = el => el ? (el.innerText || el.textContent || "").trim() : "";
+const out = [];
+if (spec.container) {
+    let cards = document.querySelectorAll(spec.container);
+    if (!cards.length && spec.fallback) cards = document.querySelectorAll(spec.fallback);
+    for (const card of cards) {
+        const name = spec.name ? text(card.querySelector(spec.name)) : "";
+        if (!name) continue;
+        const img = spec.image ? card.querySelector(spec.image) : null;
+        out.push({
+            name: name,
+            price: spec.price ? text(card.querySelector(spec.price)) : "",
+            image: img ? (img.src || img.getAttribute("src") || "") : "",
+        });
+        if (limit && out.length >= limit) break;
+    }
+} else {
+    const seen = new Set();
+    const walker = document.createTreeWalker(document.body, NodeFilter.SHOW_TEXT);
+    while (walker.nextNode()) {
+        const value = walker.currentNode.nodeValue.trim();
+        if (!value.includes("$") || value.length >= arguments[2]) continue;
+        const parent = walker.currentNode.parentElement;
+        const card = parent && parent.parentElement;
+        if (!card || seen.has(card)) continue;
+        seen.add(card);
+        out.push({text: text(card)});
+    }
+}
+return JSON.stringify(out);
+"""
+
+def extract_dom(driver: Any, spec: ExtractionSpec, limit: Optional[int] = None) -> List[Dict[str, str]]:
+    """Raw card records from the live page, in a single WebDriver call."""
+    raw = driver.execute_script(_EXTRACT_JS, spec._asdict(), limit or 0, _ANCHOR_MAX_LEN)
+    return json.loads(raw) if raw else []
+
+def extract_html(html: str, spec: ExtractionSpec, limit: Optional[int] = None) -> List[Dict[str, str]]:
+    """Raw card records from server-rendered HTML; same shape as extract_dom."""
+    soup = BeautifulSoup(html, "html.parser")
+    out = []
+    if spec.container:
+        cards = soup.select(spec.container)
+        if not cards and spec.fallback:
+            cards = soup.select(spec.fallback)
+        for card in cards:
+            name_el = card.select_one(spec.name) if spec.name else None
+            name = name_el.get_text(" ", strip=True) if name_el else ""
+            if not name:
+                continue
+            price_el = card.select_one(spec.price) if spec.price else None
+            image_el = card.select_one(spec.image) if spec.image else None
+            out.append({
+                "name": name,
+                "price": price_el.get_text(" ", strip=True) if price_el else "",
+                "image": (image_el.get("src") or "") if image_el else "",
+            })
+            if limit and len(out) >= limit:
+                break
+    else:
+        seen = set()
+        for node in soup.find_all(string=True):
+            value = node.strip()
+            if "$" not in value or len(value) >= _ANCHOR_MAX_LEN:
+                continue
+            card = node.parent.parent if node.parent else None
+            if card is None or id(card) in seen:
+                continue
+            seen.add(id(card))
+            out.append({"text": card.get_text("\n", strip=True)})
+    return out
+
+def parse_record(record: Dict[str, str], pattern: Optional[Pattern] = None) -> Optional[Tuple[str, float, str]]:
+    """(name, price, image) for one raw card record, or None if it isn't a product."""
+    if "text" not in record:
+        return record["name"], parse_price(record.get("price"), pattern), record.get("image", "")
+
+    name, price = None, 0.0
+    for line in record["text"].split("\n"):
+        line = line.strip()
+        if "$" in line:
+            price = parse_price(line, pattern) or price
+        elif len(line) > 3:
+            name = line
+    return (name, price, "") if name else None
+
+def extract_products(records: List[Dict[str, str]], spec: ExtractionSpec, limit: Optional[int] = None) -> List[Tuple[str, float, str]]:
+    """
+    Parsed (name, price, image) per card, up to `limit`. Price-anchored pages
+    repeat a product across nested cards, so there only a name's first card counts.
+    """
+    pattern = re.compile(spec.price_regex) if spec.price_regex else None
+    products, seen = [], set()
+    for record in records:
+        product = parse_record(record, pattern)
+        if product is None:
+            continue
+        if not spec.container:
+            if product[0] in seen:
+                continue
+            seen.add(product[0])
+        products.append(product)
+        if limit and len(products) >= limit:
+            break
+    return products
@@ -0,0 +1,173 @@
+from collections import deque
+from typing import Any, Deque, Dict, List, Optional, Tuple
+import logging
+import math
+import threading
+import time
+
+import config
+from metrics import CallbackGauge
+
+CLOSED = "closed"
+OPEN = "open"
+HALF_OPEN = "half_open"
+
+# Page loads kept per store for the p95
+_LOAD_WINDOW = 50
+
+class CircuitOpen(Exception):
+    """The store is being skipped until its cooldown ends."""
+    pass
+
+class StoreHealth:
+    """
+    Circuit breaker and load-time tracker for one store.
+
+    Closed: scrapes run. BREAKER_FAILURES failures (or BREAKER_CAPTCHAS bot walls)
+    in a row open the circuit: the store is skipped for a cooldown, after which it
+    is half-open and exactly one probe scrape is let through. A successful probe
+    closes the circuit; a failed one reopens it with double the cooldown. Scrapes
+    that never reached the store (no browser free) are neither: see record_aborted.
+    """
+    def __init__(self, store: str):
+        self.store = store
+        self.state = CLOSED
+        self.failures = 0
+        self.captchas = 0
+        self.opens = 0  # consecutive openings, for the exponential cooldown
+        self.cooldown_s = 0.0
+        self.open_until = 0.0
+        self.probing = False
+        self.probe_started = 0.0
+        self.last_error: Optional[str] = None
+        self.load_times: Deque[float] = deque(maxlen=_LOAD_WINDOW)
+        self.counts = {"successes": 0, "failures": 0, "blocked": 0, "skipped": 0, "probes": 0}
+        self._lock = threading.Lock()
+
+    def allow(self) -> bool:
+        """Whether a scrape may run now; counts it as skipped if not."""
+        with self._lock:
+            if self.state == OPEN and time.time() >= self.open_until:
+                self.state = HALF_OPEN
+                self.probing = False
+            if self.state == CLOSED:
+                return True
+            # A probe that never reported back (abandoned past the store timeout) doesn't hold the slot
+            if self.state == HALF_OPEN and (not self.probing or time.time() - self.probe_started > config.STORE_TIMEOUT_S):
+                self.probing = True
+                self.probe_started = time.time()
+                self.counts["probes"] += 1
+                return True
+            self.counts["skipped"] += 1
+            return False
+
+    def record_success(self):
+        with self._lock:
+            self.counts["successes"] += 1
+            if self.state != CLOSED:
+                logging.info(f"{self.store} recovered; circuit closed")
+            self.state = CLOSED
+            self.failures = self.captchas = self.opens = 0
+            self.probing = False
+
+    def record_aborted(self):
+        """The scrape ended before reaching the store; frees a half-open probe slot without judging the store."""
+        with self._lock:
+            if self.state == HALF_OPEN:
+                self.probing = False
+
+    def record_failure(self, error: str, blocked: bool = False):
+        with self._lock:
+            self.counts["blocked" if blocked else "failures"] += 1
+            self.last_error = error
+            self.failures += 1
+            if blocked:
+                self.captchas += 1
+            if self.state == HALF_OPEN or self.failures >= config.BREAKER_FAILURES or (
+                blocked and self.captchas >= config.BREAKER_CAPTCHAS
+            ):
+                self._open(blocked)
+
+    def _open(self, blocked: bool):
+        base = config.BREAKER_CAPTCHA_COOLDOWN_S if blocked else config.BREAKER_COOLDOWN_S
+        self.cooldown_s = min(base * (2 ** self.opens), config.BREAKER_MAX_COOLDOWN_S)
+        self.opens += 1
+        self.state = OPEN
+        self.open_until = time.time() + self.cooldown_s
+        self.probing = False
+        self.failures = self.captchas = 0
+        logging.warning(f"{self.store} circuit open for {self.cooldown_s:.0f}s after: {self.last_error}")
+
+    def observe_load(self, seconds: float):
+        # Loads that timed out are observed at the timeout, so the p95 (and the timeout) can grow
+        with self._lock:
+            self.load_times.append(seconds)
+
+    def p95_load_s(self) -> Optional[float]:
+        with self._lock:
+            samples = sorted(self.load_times)
+        if not samples:
+            return None
+        return samples[max(0, math.ceil(0.95 * len(samples)) - 1)]
+
+    def ready_timeout(self) -> float:
+        """
+        How long the browser waits for this store's products: its p95 load with
+        headroom, capped. A half-open probe always gets the full ceiling, so a
+        store that slowed down past its adapted timeout can still close the circuit.
+        """
+        ceiling = config.BROWSER_READY_TIMEOUT_S
+        if self.state == HALF_OPEN or len(self.load_times) < config.ADAPTIVE_TIMEOUT_MIN_SAMPLES:
+            return ceiling
+        timeout = self.p95_load_s() * config.ADAPTIVE_TIMEOUT_FACTOR
+        return min(ceiling, max(config.ADAPTIVE_TIMEOUT_FLOOR_S, timeout))
+
+    def stats(self) -> Dict[str, Any]:
+        p95 = self.p95_load_s()
+        with self._lock:
+            now = time.time()
+            stats = {
+                "state": self.state,
+                "skipping": self.state == OPEN or (self.state == HALF_OPEN and self.probing),
+                "consecutive_failures": self.failures,
+                "cooldown_s": self.cooldown_s if self.state != CLOSED else 0.0,
+                "retry_in_s": round(max(0.0, self.open_until - now), 1) if self.state == OPEN else 0.0,
+                "last_error": self.last_error,
+                "load_samples": len(self.load_times),
+                **self.counts,
+            }
+        stats["p95_load_s"] = round(p95, 3) if p95 is not None else None
+        stats["ready_timeout_s"] = round(self.ready_timeout(), 3)
+        return stats
+
+_health: Dict[str, StoreHealth] = {}
+_health_lock = threading.Lock()
+
+def get_store_health(store: str) -> StoreHealth:
+    with _health_lock:
+        health = _health.get(store)
+        if health is None:
+            health = _health[store] = StoreHealth(store)
+        return health
+
+def store_health_stats(stores: List[str] = None) -> Dict[str, Dict[str, Any]]:
+    """Breaker and load stats for every store seen so far, plus any in `stores` (reported closed)."""
+    for store in stores or []:
+        get_store_health(store)
+    with _health_lock:
+        tracked = list(_health.values())
+    return {health.store: health.stats() for health in tracked}
+
+_STATE_VALUES = {CLOSED: 0, HALF_OPEN: 1, OPEN: 2}
+
+def _circuit_gauge() -> Dict[Tuple[str], int]:
+    with _health_lock:
+        tracked = list(_health.values())
+    return {(health.store,): _STATE_VALUES[health.state] for health in tracked}
+
+CallbackGauge(
+    "cheapnut_store_circuit_state",
+    "Circuit breaker per store: 0 closed, 1 half-open, 2 open.",
+    ["store"],
+    _circuit_gauge,
+)
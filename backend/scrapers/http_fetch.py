@@ -0,0 +1,171 @@
+from typing import Any, Dict, Iterator, List, Optional, Pattern, Tuple
+import argparse
+import json
+import re
+import threading
+import time
+from urllib.parse import urlparse
+
+import requests
+from requests.adapters import HTTPAdapter
+
+import config
+from metrics import observe_upstream
+
+# Which tier answered a store's search; stamped on every result as "tier"
+TIER_HTTP = "http"
+TIER_BROWSER = "browser"
+TIER_CACHE = "cache"
+TIER_MENU = "menu"
+# Mock data filling a category no real store answered (search_service.fallback_results)
+TIER_MOCK = "mock"
+
+# Page titles of bot walls rather than results
+BLOCK_MARKERS = ["Robot or human?", "Access Denied", "Pardon Our Interruption", "Just a moment..."]
+
+_PRICE_RE = re.compile(r"\$?\s*(\d{1,3}(?:,\d{3})+(?:\.\d+)?|\d+(?:\.\d+)?)")
+_TITLE_RE = re.compile(r"<title[^>]*>(.*?)</title>", re.IGNORECASE | re.DOTALL)
+_NEXT_DATA_RE = re.compile(r'<script[^>]+id="__NEXT_DATA__"[^>]*>(.*?)</script>', re.DOTALL)
+
+class NeedsBrowser(Exception):
+    """The plain HTTP fetch can't serve this page (blocked, error status, or rendered client-side)."""
+
+_session: Optional[requests.Session] = None
+_session_lock = threading.Lock()
+
+def get_http_session() -> requests.Session:
+    """Process-wide keep-alive session for store pages fetched without a browser."""
+    global _session
+    with _session_lock:
+        if _session is None:
+            session = requests.Session()
+            adapter = HTTPAdapter(pool_connections=config.HTTP_TIER_POOL_SIZE, pool_maxsize=config.HTTP_TIER_POOL_SIZE)
+            session.mount("http://", adapter)
+            session.mount("https://", adapter)
+            session.headers.update({
+                "User-Agent": (
+                    "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 "
+                    "(KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36"
+                ),
+                "Accept": "text/html,application/xhtml+xml,application/xml;q=0.9,*/*;q=0.8",
+                "Accept-Language": "en-US,en;q=0.9",
+            })
+            _session = session
+        return _session
+
+def fetch_html(url: str, session: requests.Session = None) -> str:
+    """GETs a page; raises NeedsBrowser unless it came back as a usable 200."""
+    session = session or get_http_session()
+    host, start = urlparse(url).hostname or "", time.perf_counter()
+    try:
+        response = session.get(url, timeout=config.HTTP_TIER_TIMEOUT_S)
+    except requests.RequestException as e:
+        observe_upstream(host, time.perf_counter() - start, "error")
+        raise NeedsBrowser(f"fetch failed: {e}")
+    observe_upstream(host, time.perf_counter() - start, response.status_code)
+    if response.status_code != 200:
+        raise NeedsBrowser(f"HTTP {response.status_code}")
+    html = response.text
+    title = _TITLE_RE.search(html)
+    if title and is_blocked_title(title.group(1)):
+        raise NeedsBrowser(f"blocked ({title.group(1).strip()})")
+    return html
+
+def is_blocked_title(title: str) -> bool:
+    """Whether a page title is one of the bot walls in BLOCK_MARKERS."""
+    title = (title or "").lower()
+    return any(marker.lower() in title for marker in BLOCK_MARKERS)
+
+def parse_price(text: Any, pattern: Optional[Pattern] = None) -> float:
+    """
+    First dollar amount in a price label ("$5.16", "5.99 / ea", "$1,299.00"), else 0.0.
+    A store-specific `pattern` must capture the amount in its first group.
+    """
+    if isinstance(text, (int, float)):
+        return float(text)
+    if not text:
+        return 0.0
+    match = (pattern or _PRICE_RE).search(str(text))
+    if not match:
+        return 0.0
+    try:
+        return float(match.group(1).replace(",", ""))
+    except ValueError:
+        return 0.0
+
+def next_data(html: str) -> Optional[Dict[str, Any]]:
+    """The JSON blob Next.js sites server-render into <script id="__NEXT_DATA__">, if any."""
+    match = _NEXT_DATA_RE.search(html)
+    if not match:
+        return None
+    try:
+        return json.loads(match.group(1))
+    except ValueError:
+        return None
+
+# Keys that hold a product's price in the JSON stores embed, most specific first
+_PRICE_KEYS = ["currentPrice", "salePrice", "regularPrice", "price", "priceString", "linePrice"]
+
+def _json_price(product: Dict[str, Any]) -> Optional[float]:
+    info = product.get("priceInfo")
+    if isinstance(info, dict):
+        product = {**product, **info}
+    for key in _PRICE_KEYS:
+        value = product.get(key)
+        if isinstance(value, dict):
+            value = value.get("price", value.get("amount"))
+        if value is not None and not isinstance(value, (dict, list, bool)):
+            price = parse_price(value)
+            if price:
+                return price
+    return None
+
+def iter_json_products(data: Any) -> Iterator[Tuple[str, float, str]]:
+    """
+    Walks embedded page JSON for product-shaped objects (a string name plus a
+    price field) and yields (name, price, image) in document order, once per name.
+    """
+    seen = set()
+    stack = [data]
+    while stack:
+        node = stack.pop()
+        if isinstance(node, dict):
+            name = node.get("name") or node.get("productName") or node.get("title")
+            if isinstance(name, str) and name.strip() and name not in seen:
+                price = _json_price(node)
+                if price is not None:
+                    seen.add(name)
+                    image = node.get("image") or node.get("imageUrl") or node.get("thumbnailUrl") or ""
+                    yield name.strip(), price, image if isinstance(image, str) else ""
+                    continue
+            stack.extend(reversed(list(node.values())))
+        elif isinstance(node, list):
+            stack.extend(reversed(node))
+
+_tier_counts: Dict[str, Dict[str, int]] = {}
+_tier_lock = threading.Lock()
+
+def record_tier(store: str, tier: str):
+    with _tier_lock:
+        counts = _tier_counts.setdefault(store, {})
+        counts[tier] = counts.get(tier, 0) + 1
+
+def tier_stats() -> Dict[str, Dict[str, int]]:
+    """Per store, how many searches each tier served since startup."""
+    with _tier_lock:
+        return {store: dict(counts) for store, counts in _tier_counts.items()}
+
+if __name__ == "__main__":
+    # Check a store's HTTP-tier parser against a saved page, no network involved:
+    #   python -m scrapers.http_fetch "Walmart" saved_search.html
+    from search_service import STORES
+
+    parser = argparse.ArgumentParser()
+    parser.add_argument("store")
+    parser.add_argument("html_file")
+    args = parser.parse_args()
+
+    classes = {store: cls for store, _, cls in STORES}
+    scraper = classes[args.store]()
+    with open(args.html_file, encoding="utf-8") as f:
+        print(json.dumps(scraper.parse_html(f.read()), indent=2))
@@ -15,6 +15,10 @@ class ProductInfo(Dict[str, Any]):
     """
     pass
 
+class ScraperBlocked(Exception):
+    """The store answered with a bot wall / CAPTCHA instead of results."""
+    pass
+
 class ScraperInterface(ABC):
     @abstractmethod
     def search(self, query: str) -> List[ProductInfo]:
@@ -0,0 +1,204 @@
+from concurrent.futures import ThreadPoolExecutor
+from typing import List, Dict, Any, Optional, Set
+import hashlib
+import json
+import logging
+import re
+import threading
+import time
+
+import config
+from .base_selenium import SeleniumScraper
+from .interface import ProductInfo
+from .http_fetch import record_tier, TIER_MENU
+from .health import CircuitOpen
+
+_TOKEN_RE = re.compile(r"\w+")
+
+# Most results a menu query returns, as the page scrapers always did
+MAX_RESULTS = 10
+
+class MenuSnapshot:
+    """
+    One scrape of a store's whole menu, with a token index for lookups.
+
+    `version` is a hash of the menu's names and prices, so it only changes when
+    the menu does; `fetched_at` is when it was scraped.
+    """
+    def __init__(self, store: str, items: List[ProductInfo], fetched_at: float = None):
+        self.store = store
+        self.fetched_at = fetched_at if fetched_at is not None else time.time()
+        self.items: List[ProductInfo] = []
+        self._names: List[str] = []
+        seen = set()
+        for item in items:
+            if item.get("name") and item["name"] not in seen:
+                seen.add(item["name"])
+                self.items.append(item)
+                self._names.append(item["name"].lower())
+
+        self._postings: Dict[str, Set[int]] = {}
+        for idx, name in enumerate(self._names):
+            for token in _TOKEN_RE.findall(name):
+                self._postings.setdefault(token, set()).add(idx)
+        # Query token -> menu tokens containing it; menus have a few hundred tokens at most
+        self._expansions: Dict[str, Set[str]] = {}
+
+        digest = hashlib.sha1(
+            json.dumps(sorted((item["name"], item.get("price")) for item in self.items)).encode()
+        ).hexdigest()
+        self.version = digest[:12]
+
+    def _candidates(self, token: str) -> Set[int]:
+        tokens = self._expansions.get(token)
+        if tokens is None:
+            tokens = {t for t in self._postings if token in t}
+            self._expansions[token] = tokens
+        ids: Set[int] = set()
+        for t in tokens:
+            ids |= self._postings[t]
+        return ids
+
+    def search(self, query: str, limit: int = MAX_RESULTS) -> List[ProductInfo]:
+        """Items whose name contains `query` (case-insensitive), in menu order."""
+        needle = query.lower()
+        tokens = _TOKEN_RE.findall(needle)
+        if tokens:
+            ids = None
+            for token in tokens:
+                ids = self._candidates(token) if ids is None else ids & self._candidates(token)
+                if not ids:
+                    return []
+            ordered = sorted(ids)
+        else:
+            ordered = range(len(self._names))
+
+        results = []
+        for idx in ordered:
+            if needle in self._names[idx]:  # the index narrows; substring match decides
+                results.append({**self.items[idx], "menu_version": self.version, "tier": TIER_MENU})
+                if len(results) >= limit:
+                    break
+        return results
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "version": self.version,
+            "items": len(self.items),
+            "fetched_at": self.fetched_at,
+            "age_s": round(time.time() - self.fetched_at, 1),
+        }
+
+class MenuScraper(SeleniumScraper):
+    """
+    Base for fast-food scrapers whose site has one full menu page. Subclasses
+    set `menu_url` and `spec` (or override `_scrape_menu()`) to get every item;
+    `search` is then an in-memory lookup against the latest MenuSnapshot.
+
+    The menu is scraped on the first query and re-scraped once older than
+    MENU_REFRESH_S, in the background while the old snapshot keeps serving
+    (or on the schedule started by start_menu_scheduler). A failed or empty
+    scrape never replaces a good snapshot.
+    """
+    # Full menu page; fetched over plain HTTP first, like SeleniumScraper.search_url
+    menu_url: Optional[str] = None
+    item_type = "restaurant"
+    max_results = None
+
+    _refresh_executor = ThreadPoolExecutor(max_workers=2, thread_name_prefix="menu-refresh")
+
+    def __init__(self, headless: bool = True):
+        super().__init__(headless)
+        self.snapshot: Optional[MenuSnapshot] = None
+        self._scrape_lock = threading.Lock()
+        self._refreshing = False
+        self._failed_at: Optional[float] = None
+
+    def _scrape_menu(self) -> List[ProductInfo]:
+        """Browser tier for the whole menu; override for sites `spec` can't describe."""
+        if not self.menu_url or not self.spec:
+            return []
+        return self._extract_page(self.menu_url)
+
+    def refresh_menu(self, if_missing: bool = False) -> Optional[MenuSnapshot]:
+        """
+        Scrapes the menu now (one scrape per store at a time) and returns the current snapshot.
+        With `if_missing`, a snapshot another thread finished meanwhile is returned instead.
+        """
+        with self._scrape_lock:
+            if if_missing and self.snapshot is not None:
+                return self.snapshot
+            try:
+                items, _ = self._fetch_tiered(self.menu_url, self._scrape_menu)
+            except CircuitOpen:
+                return self.snapshot
+            except Exception as e:
+                logging.error(f"Error scraping {self.store} menu: {e}")
+                items = []
+
+            if items:
+                snapshot = MenuSnapshot(self.store, items)
+                if self.snapshot is None or snapshot.version != self.snapshot.version:
+                    logging.info(f"{self.store} menu is now version {snapshot.version} ({len(snapshot.items)} items)")
+                self.snapshot = snapshot
+                self._failed_at = None
+            else:
+                logging.warning(f"{self.store} menu scrape returned nothing; keeping the previous snapshot")
+                self._failed_at = time.time()
+            return self.snapshot
+
+    def _refresh_in_background(self):
+        try:
+            self.refresh_menu()
+        finally:
+            self._refreshing = False
+
+    def refresh_due(self) -> bool:
+        """Menu missing or older than MENU_REFRESH_S, and no scrape failed in the last MENU_RETRY_S."""
+        now = time.time()
+        if self._failed_at is not None and now - self._failed_at < config.MENU_RETRY_S:
+            return False
+        return self.snapshot is None or now - self.snapshot.fetched_at >= config.MENU_REFRESH_S
+
+    def search(self, query: str) -> List[ProductInfo]:
+        snapshot = self.snapshot
+        if snapshot is None:
+            if not self.refresh_due():
+                return []
+            snapshot = self.refresh_menu(if_missing=True)
+            if snapshot is None:
+                return []
+        elif self.refresh_due() and not self._refreshing:
+            self._refreshing = True
+            self._refresh_executor.submit(self._refresh_in_background)
+        record_tier(self.store, TIER_MENU)
+        return snapshot.search(query)
+
+def menu_stats(scrapers: List[Any]) -> Dict[str, Any]:
+    """Snapshot version/size/age for every menu scraper in a (store, category, scraper) list."""
+    stats = {}
+    for store, _, scraper in scrapers:
+        if isinstance(scraper, MenuScraper):
+            stats[store] = scraper.snapshot.stats() if scraper.snapshot else None
+    return stats
+
+# How often the scheduler checks for menus due a refresh (seconds)
+_SCHEDULER_TICK_S = 60.0
+
+def start_menu_scheduler(scrapers: List[Any]) -> threading.Thread:
+    """
+    Background thread that re-scrapes every menu once it is older than
+    MENU_REFRESH_S; the first pass warms all menus.
+    """
+    menus = [scraper for _, _, scraper in scrapers if isinstance(scraper, MenuScraper)]
+
+    def loop():
+        while True:
+            for scraper in menus:
+                if scraper.refresh_due():
+                    scraper.refresh_menu()
+            time.sleep(min(config.MENU_REFRESH_S, _SCHEDULER_TICK_S))
+
+    thread = threading.Thread(target=loop, name="menu-scheduler", daemon=True)
+    thread.start()
+    return thread
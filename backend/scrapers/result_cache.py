@@ -0,0 +1,214 @@
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from typing import List, Dict, Any, Optional, Tuple
+import copy
+import json
+import logging
+import re
+import sqlite3
+import threading
+import time
+
+import config
+from .interface import ScraperInterface, ProductInfo
+from .http_fetch import record_tier, TIER_CACHE
+
+FRESH = "fresh"
+STALE = "stale"
+
+def normalize_query(query: str) -> str:
+    """Lowercases and collapses whitespace so 'Green  Beans ' and 'green beans' share an entry."""
+    return re.sub(r"\s+", " ", query.strip().lower())
+
+class SearchResultCache:
+    """
+    Two-tier TTL cache of per-store search results keyed on (store, normalized query).
+
+    Tier 1 is an in-memory LRU bounded to `max_entries`. Tier 2 is an optional
+    SQLite file (`db_path`) that survives restarts. An entry is fresh for its
+    store's TTL, then stale (still served, but refreshed in the background) for
+    another `stale_ttl_s`, after which it is treated as a miss.
+    """
+    def __init__(
+        self,
+        max_entries: int = None,
+        default_ttl_s: float = None,
+        stale_ttl_s: float = None,
+        store_ttls: Dict[str, float] = None,
+        db_path: Optional[str] = None,
+    ):
+        self.max_entries = max_entries or config.RESULT_CACHE_MAX_ENTRIES
+        self.default_ttl_s = default_ttl_s if default_ttl_s is not None else config.RESULT_CACHE_TTL_S
+        self.stale_ttl_s = stale_ttl_s if stale_ttl_s is not None else config.RESULT_CACHE_STALE_S
+        self.store_ttls = store_ttls if store_ttls is not None else config.RESULT_CACHE_STORE_TTLS
+
+        self._memory: "OrderedDict[Tuple[str, str], Tuple[float, List[ProductInfo]]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._stats: Dict[str, Dict[str, int]] = {}
+
+        self._db = None
+        self._db_lock = threading.Lock()
+        db_path = db_path if db_path is not None else config.RESULT_CACHE_DB_PATH
+        if db_path:
+            self._db = sqlite3.connect(db_path, check_same_thread=False)
+            self._db.execute(
+                "CREATE TABLE IF NOT EXISTS search_cache ("
+                " store TEXT NOT NULL, query TEXT NOT NULL, results TEXT NOT NULL,"
+                " stored_at REAL NOT NULL, PRIMARY KEY (store, query))"
+            )
+            self._db.commit()
+
+    def ttl_for(self, store: str) -> float:
+        return self.store_ttls.get(store, self.default_ttl_s)
+
+    def record(self, store: str, key: str):
+        with self._lock:
+            counters = self._stats.setdefault(
+                store, {"hits": 0, "misses": 0, "stale": 0, "refreshes": 0, "refresh_errors": 0}
+            )
+            counters[key] += 1
+
+    def _load_from_db(self, key: Tuple[str, str]) -> Optional[Tuple[float, List[ProductInfo]]]:
+        if self._db is None:
+            return None
+        with self._db_lock:
+            row = self._db.execute(
+                "SELECT stored_at, results FROM search_cache WHERE store = ? AND query = ?", key
+            ).fetchone()
+        if row is None:
+            return None
+        return row[0], json.loads(row[1])
+
+    def get(self, store: str, query: str) -> Tuple[Optional[List[ProductInfo]], Optional[str]]:
+        """Returns (results, FRESH|STALE), or (None, None) on a miss. Counts the outcome."""
+        key = (store, normalize_query(query))
+        with self._lock:
+            entry = self._memory.get(key)
+            if entry is not None:
+                self._memory.move_to_end(key)
+        if entry is None:
+            entry = self._load_from_db(key)
+            if entry is not None:
+                self._put_memory(key, entry)
+
+        if entry is not None:
+            age = time.time() - entry[0]
+            ttl = self.ttl_for(store)
+            if age < ttl:
+                self.record(store, "hits")
+                return copy.deepcopy(entry[1]), FRESH
+            if age < ttl + self.stale_ttl_s:
+                self.record(store, "stale")
+                return copy.deepcopy(entry[1]), STALE
+
+        self.record(store, "misses")
+        return None, None
+
+    def _put_memory(self, key: Tuple[str, str], entry: Tuple[float, List[ProductInfo]]):
+        with self._lock:
+            self._memory[key] = entry
+            self._memory.move_to_end(key)
+            while len(self._memory) > self.max_entries:
+                self._memory.popitem(last=False)
+
+    def set(self, store: str, query: str, results: List[ProductInfo]):
+        key = (store, normalize_query(query))
+        entry = (time.time(), copy.deepcopy(results))
+        self._put_memory(key, entry)
+        if self._db is not None:
+            with self._db_lock:
+                self._db.execute(
+                    "INSERT OR REPLACE INTO search_cache (store, query, results, stored_at) VALUES (?, ?, ?, ?)",
+                    (key[0], key[1], json.dumps(entry[1]), entry[0])
+                )
+                self._db.commit()
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            stores = {store: dict(counters) for store, counters in self._stats.items()}
+            entries = len(self._memory)
+        for counters in stores.values():
+            lookups = counters["hits"] + counters["stale"] + counters["misses"]
+            counters["hit_ratio"] = round((counters["hits"] + counters["stale"]) / lookups, 3) if lookups else 0.0
+        return {
+            "memory_entries": entries,
+            "max_entries": self.max_entries,
+            "persistent": self._db is not None,
+            "default_ttl_s": self.default_ttl_s,
+            "stale_ttl_s": self.stale_ttl_s,
+            "store_ttls": self.store_ttls,
+            "stores": stores,
+        }
+
+class CachedScraper(ScraperInterface):
+    """
+    Wraps another scraper's `search` with the result cache.
+    Stale entries are returned immediately while a background refresh re-scrapes them.
+    Empty results are never cached since scrapers also return [] on failure.
+    """
+    _refresh_executor = ThreadPoolExecutor(max_workers=2, thread_name_prefix="cache-refresh")
+    _refreshing = set()
+    _refreshing_lock = threading.Lock()
+
+    def __init__(self, store: str, scraper: ScraperInterface, cache: SearchResultCache = None):
+        self.store = store
+        self.scraper = scraper
+        self.cache = cache or get_result_cache()
+
+    def _scrape_and_store(self, query: str) -> List[ProductInfo]:
+        results = self.scraper.search(query)
+        if results:
+            self.cache.set(self.store, query, results)
+        return results
+
+    def _refresh(self, query: str):
+        key = (self.store, normalize_query(query))
+        try:
+            self._scrape_and_store(query)
+            self.cache.record(self.store, "refreshes")
+        except Exception as e:
+            self.cache.record(self.store, "refresh_errors")
+            logging.warning(f"Background refresh of {self.store} '{query}' failed: {e}")
+        finally:
+            with self._refreshing_lock:
+                self._refreshing.discard(key)
+
+    def search(self, query: str) -> List[ProductInfo]:
+        results, state = self.cache.get(self.store, query)
+        if state is not None:
+            for result in results:
+                result["tier"] = TIER_CACHE
+            record_tier(self.store, TIER_CACHE)
+        if state == FRESH:
+            return results
+        if state == STALE:
+            key = (self.store, normalize_query(query))
+            with self._refreshing_lock:
+                start_refresh = key not in self._refreshing
+                self._refreshing.add(key)
+            if start_refresh:
+                self._refresh_executor.submit(self._refresh, query)
+            return results
+        return self._scrape_and_store(query)
+
+class LiveScraper(ScraperInterface):
+    """
+    A CachedScraper's store scraped live: never answers from the cache, but
+    still stores what it finds so the next user search is fresh too.
+    """
+    def __init__(self, cached: CachedScraper):
+        self.cached = cached
+
+    def search(self, query: str) -> List[ProductInfo]:
+        return self.cached._scrape_and_store(query)
+
+_cache: Optional[SearchResultCache] = None
+_cache_lock = threading.Lock()
+
+def get_result_cache() -> SearchResultCache:
+    """Returns the process-wide result cache, creating it on first use."""
+    global _cache
+    with _cache_lock:
+        if _cache is None:
+            _cache = SearchResultCache()
+        return _cache
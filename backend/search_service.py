@@ -0,0 +1,202 @@
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
+from typing import List, Dict, Any, Iterator, Optional, Tuple
+import logging
+import threading
+import time
+
+import config
+from quantity_parser import annotate_offers
+from scrapers.interface import ScraperInterface
+from scrapers.health import CircuitOpen
+from scrapers.http_fetch import TIER_MOCK
+from scrapers.result_cache import CachedScraper
+from scrapers.menu_snapshot import MenuScraper
+from scrapers.mock_scraper import MockGroceryScraper, MockFastFoodScraper
+from scrapers.walmart import WalmartScraper
+from scrapers.jack_in_the_box import JackInTheBoxScraper
+from scrapers.safeway import SafewayScraper
+from scrapers.whole_foods import WholeFoodsScraper
+from scrapers.target import TargetScraper
+from scrapers.costco import CostcoScraper
+from scrapers.trader_joes import TraderJoesScraper
+from scrapers.mcdonalds import McDonaldsScraper
+from scrapers.taco_bell import TacoBellScraper
+from scrapers.starbucks import StarbucksScraper
+from scrapers.chipotle import ChipotleScraper
+
+# (store name, result category, scraper class) for every store /api/search fans out to
+STORES: List[Tuple[str, str, type]] = [
+    ("Walmart", "grocery", WalmartScraper),
+    ("Safeway", "grocery", SafewayScraper),
+    ("Whole Foods", "grocery", WholeFoodsScraper),
+    ("Target", "grocery", TargetScraper),
+    ("Costco", "grocery", CostcoScraper),
+    ("Trader Joe's", "grocery", TraderJoesScraper),
+    ("Jack in the Box", "fastfood", JackInTheBoxScraper),
+    ("McDonald's", "fastfood", McDonaldsScraper),
+    ("Taco Bell", "fastfood", TacoBellScraper),
+    ("Starbucks", "fastfood", StarbucksScraper),
+    ("Chipotle", "fastfood", ChipotleScraper),
+]
+
+# Store name under which mock fallback data is reported in "tiers" and in streamed events
+MOCK_STORE = "mock"
+
+# How often the fan-out loop re-checks per-store deadlines while waiting (seconds)
+_POLL_INTERVAL_S = 0.25
+
+_scrapers: Optional[List[Tuple[str, str, ScraperInterface]]] = None
+_scrapers_lock = threading.Lock()
+
+def build_scrapers(headless: bool = True) -> List[Tuple[str, str, ScraperInterface]]:
+    """
+    Instantiates one scraper per registered store. Page scrapers are wrapped in the
+    result cache; menu scrapers already answer from their in-memory menu snapshot.
+    """
+    scrapers = []
+    for store, category, cls in STORES:
+        scraper = cls(headless=headless)
+        if not isinstance(scraper, MenuScraper):
+            scraper = CachedScraper(store, scraper)
+        scrapers.append((store, category, scraper))
+    return scrapers
+
+def get_store_scrapers() -> List[Tuple[str, str, ScraperInterface]]:
+    """Shared scrapers for request handlers; scraper instances are safe to use concurrently."""
+    global _scrapers
+    with _scrapers_lock:
+        if _scrapers is None:
+            _scrapers = build_scrapers()
+        return _scrapers
+
+def iter_store_results(
+    query: str,
+    scrapers: Optional[List[Tuple[str, str, ScraperInterface]]] = None,
+    max_workers: int = None,
+    deadline_s: float = None,
+    store_timeout_s: float = None,
+) -> Iterator[Dict[str, Any]]:
+    """
+    Runs every store's search concurrently and yields one result dict per store
+    as soon as it is known:
+        {"store", "category", "results", "error", "elapsed", "tier"}
+
+    `tier` says what served the store: "http", "browser", "cache" or "menu"
+    (None if it returned nothing).
+
+    At most `max_workers` stores are scraped at once. A store is given up on
+    (error="timeout") once it has been running for `store_timeout_s`, or when the
+    overall `deadline_s` for the request passes, whichever comes first. Stores
+    whose circuit breaker is open are skipped (error="circuit_open").
+    Abandoned scrapes keep running in their worker thread but are never waited on.
+    """
+    if scrapers is None:
+        scrapers = get_store_scrapers()
+    max_workers = max_workers or config.SEARCH_MAX_WORKERS
+    deadline_s = deadline_s if deadline_s is not None else config.SEARCH_DEADLINE_S
+    store_timeout_s = store_timeout_s if store_timeout_s is not None else config.STORE_TIMEOUT_S
+
+    request_start = time.monotonic()
+    request_deadline = request_start + deadline_s
+    started: Dict[str, float] = {}
+
+    def run(store: str, scraper: ScraperInterface) -> List[Dict[str, Any]]:
+        started[store] = time.monotonic()
+        return annotate_offers(scraper.search(query) or [])
+
+    executor = ThreadPoolExecutor(max_workers=max(1, max_workers), thread_name_prefix="search")
+    try:
+        futures = {
+            executor.submit(run, store, scraper): (store, category)
+            for store, category, scraper in scrapers
+        }
+        pending = set(futures)
+
+        def finished(future, results, error):
+            store, category = futures[future]
+            start = started.get(store, request_start)
+            return {
+                "store": store,
+                "category": category,
+                "results": results,
+                "error": error,
+                "elapsed": round(time.monotonic() - start, 3),
+                "tier": results[0].get("tier") if results else None,
+            }
+
+        while pending:
+            now = time.monotonic()
+
+            # Give up on stores that blew their own budget or the request's
+            for future in list(pending):
+                store, _ = futures[future]
+                start = started.get(store)
+                store_expired = start is not None and now - start >= store_timeout_s
+                if now >= request_deadline or store_expired:
+                    pending.discard(future)
+                    future.cancel()
+                    logging.warning(f"Search for '{query}' at {store} timed out")
+                    yield finished(future, [], "timeout")
+            if not pending:
+                break
+
+            next_wake = min(
+                [request_deadline]
+                + [started[futures[f][0]] + store_timeout_s for f in pending if futures[f][0] in started]
+            )
+            timeout = min(max(0.0, next_wake - now), _POLL_INTERVAL_S)
+            done, _ = wait(pending, timeout=timeout, return_when=FIRST_COMPLETED)
+
+            for future in done:
+                pending.discard(future)
+                try:
+                    yield finished(future, future.result() or [], None)
+                except CircuitOpen:
+                    yield finished(future, [], "circuit_open")
+                except Exception as e:
+                    store, _ = futures[future]
+                    logging.error(f"Search for '{query}' at {store} failed: {e}")
+                    yield finished(future, [], f"error: {e}")
+    finally:
+        executor.shutdown(wait=False, cancel_futures=True)
+
+def fallback_results(category: str, query: str) -> List[Dict[str, Any]]:
+    """Mock data shown for a category when no real store returned anything, stamped with tier "mock"."""
+    scraper = MockGroceryScraper() if category == "grocery" else MockFastFoodScraper()
+    results = annotate_offers(scraper.search(query))
+    for result in results:
+        result["tier"] = TIER_MOCK
+    return results
+
+def search_all_stores(query: str, **kwargs) -> Dict[str, Any]:
+    """
+    Fans the query out to every store and collects the results by category.
+    Stores that failed or ran out of time are listed under "errors" and the
+    response is flagged "partial" instead of waiting on them.
+    """
+    results: Dict[str, Any] = {
+        "grocery": [],
+        "fastfood": [],
+        "partial": False,
+        "errors": {},
+        "timings": {},
+        "tiers": {},
+        "fallback": [],  # categories filled with mock data because no store returned anything
+    }
+
+    for outcome in iter_store_results(query, **kwargs):
+        results[outcome["category"]].extend(outcome["results"])
+        results["timings"][outcome["store"]] = outcome["elapsed"]
+        results["tiers"][outcome["store"]] = outcome["tier"]
+        if outcome["error"]:
+            results["errors"][outcome["store"]] = outcome["error"]
+            results["partial"] = True
+
+    # Fallback if empty
+    for category in ["grocery", "fastfood"]:
+        if not results[category]:
+            results[category] = fallback_results(category, query)
+            results["fallback"].append(category)
+            results["tiers"][MOCK_STORE] = TIER_MOCK
+
+    return results
@@ -0,0 +1,98 @@
+from typing import Dict, Any, Iterator, List, Optional
+import json
+import logging
+import time
+
+import crud
+from database import SessionLocal
+from enrichment import iter_nutrition
+from search_service import iter_store_results, fallback_results, MOCK_STORE
+from scrapers.http_fetch import TIER_MOCK
+
+def iter_search_events(query: str, deadline_s: Optional[float] = None) -> Iterator[Dict[str, Any]]:
+    """
+    Incremental version of /api/search. Yields, in order:
+
+      {"event": "store", ...}      once per store, as soon as its results are in
+                                   (mock fallback data arrives as store "mock", tier "mock")
+      {"event": "nutrition", ...}  one patch per distinct name as lookups finish;
+                                   `refs` point at items from earlier store events
+      {"event": "summary", ...}    per-store timings, tiers, errors and totals
+
+    Every item carries a `ref` that is unique within the stream.
+    """
+    start = time.monotonic()
+    items: List[Dict[str, Any]] = []
+    offers: List[Dict[str, Any]] = []
+    seen_categories = set()
+    summary: Dict[str, Any] = {"timings": {}, "tiers": {}, "errors": {}, "partial": False, "fallback": []}
+
+    def tag(results):
+        for item in results:
+            item["ref"] = len(items)
+            items.append(item)
+        return results
+
+    for outcome in iter_store_results(query, deadline_s=deadline_s):
+        summary["timings"][outcome["store"]] = outcome["elapsed"]
+        summary["tiers"][outcome["store"]] = outcome["tier"]
+        if outcome["error"]:
+            summary["errors"][outcome["store"]] = outcome["error"]
+            summary["partial"] = True
+        if outcome["results"]:
+            seen_categories.add(outcome["category"])
+            offers.extend(outcome["results"])
+        yield {
+            "event": "store",
+            "store": outcome["store"],
+            "category": outcome["category"],
+            "results": tag(outcome["results"]),
+            "error": outcome["error"],
+            "elapsed": outcome["elapsed"],
+            "tier": outcome["tier"],
+        }
+
+    for category in ["grocery", "fastfood"]:
+        if category not in seen_categories:
+            summary["fallback"].append(category)
+            summary["tiers"][MOCK_STORE] = TIER_MOCK
+            yield {
+                "event": "store",
+                "store": MOCK_STORE,
+                "category": category,
+                "results": tag(fallback_results(category, query)),
+                "error": None,
+                "elapsed": 0.0,
+                "tier": TIER_MOCK,
+            }
+
+    enrich_start = time.monotonic()
+    resolved = 0
+    for _, group, nutrition in iter_nutrition(items):
+        resolved += 1
+        yield {"event": "nutrition", "refs": [item["ref"] for item in group], "nutrition": nutrition}
+    summary["enrichment"] = {
+        "resolved": resolved,
+        "pending_refs": [item["ref"] for item in items if item.get("nutrition_pending")],
+        "elapsed": round(time.monotonic() - enrich_start, 3),
+    }
+
+    db = SessionLocal()
+    try:
+        crud.upsert_items(db, offers)
+    except Exception as e:
+        logging.error(f"Failed to persist offers for '{query}': {e}")
+        db.rollback()
+    finally:
+        db.close()
+
+    summary["elapsed"] = round(time.monotonic() - start, 3)
+    yield {"event": "summary", **summary}
+
+def to_ndjson(events: Iterator[Dict[str, Any]]) -> Iterator[str]:
+    for event in events:
+        yield json.dumps(event) + "\n"
+
+def to_sse(events: Iterator[Dict[str, Any]]) -> Iterator[str]:
+    for event in events:
+        yield f"event: {event['event']}\ndata: {json.dumps(event)}\n\n"
@@ -0,0 +1,77 @@
+from typing import Any, Callable, Dict, Hashable, List, Tuple
+import copy
+import threading
+
+class _Call:
+    def __init__(self):
+        self.done = threading.Event()
+        self.result: Any = None
+        self.error: BaseException = None
+        self.waiters = 0
+
+class SingleFlight:
+    """
+    Coalesces concurrent calls that share a key: the first caller runs the
+    function, and everyone arriving with the same key while it runs waits for
+    that run and gets its result (or its exception) instead of starting another.
+    Nothing is remembered once the run finishes; that is what the caches are for.
+
+    The leader snapshots the result before waking anyone, and every caller
+    (the leader too) gets its own deep copy of that snapshot, so callers that
+    annotate what they got back can't see, or race with, each other's changes.
+    """
+    def __init__(self, name: str):
+        self.name = name
+        self._calls: Dict[Hashable, _Call] = {}
+        self._lock = threading.Lock()
+        self._stats = {"calls": 0, "executions": 0, "shared": 0}
+        with _registry_lock:
+            _registry.append(self)
+
+    def do(self, key: Hashable, fn: Callable[[], Any]) -> Tuple[Any, bool]:
+        """Returns (result, shared); `shared` is True if another caller's run produced it."""
+        with self._lock:
+            self._stats["calls"] += 1
+            call = self._calls.get(key)
+            if call is not None:
+                call.waiters += 1
+                self._stats["shared"] += 1
+                leader = False
+            else:
+                call = self._calls[key] = _Call()
+                self._stats["executions"] += 1
+                leader = True
+
+        if not leader:
+            call.done.wait()
+            if call.error is not None:
+                raise call.error
+            return copy.deepcopy(call.result), True
+
+        try:
+            call.result = copy.deepcopy(fn())
+        except BaseException as e:
+            call.error = e
+            raise
+        finally:
+            with self._lock:
+                del self._calls[key]
+            call.done.set()
+        return copy.deepcopy(call.result), False
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            stats = dict(self._stats)
+            stats["in_flight"] = len(self._calls)
+            stats["waiting"] = sum(call.waiters for call in self._calls.values())
+        stats["name"] = self.name
+        return stats
+
+_registry: List[SingleFlight] = []
+_registry_lock = threading.Lock()
+
+def singleflight_stats() -> List[Dict[str, Any]]:
+    """Calls, actual executions and coalesced callers for every SingleFlight in the process."""
+    with _registry_lock:
+        flights = list(_registry)
+    return [flight.stats() for flight in flights]
@@ -1,12 +1,18 @@
-from typing import List, Dict
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timezone
+from typing import List, Dict, Any, Optional, Tuple, Callable
 import logging
+import time
 from sqlalchemy.orm import Session
 from models import BenchmarkItem
-from scrapers.walmart import WalmartScraper
-from scrapers.safeway import SafewayScraper
-from scrapers.trader_joes import TraderJoesScraper
-from nutrition_service import NutritionService
+from scrapers.interface import ScraperInterface
+from scrapers.result_cache import CachedScraper, LiveScraper
+from nutrition_service import NutritionService, get_nutrition_service
 from analysis_engine import AnalysisEngine
+from quantity_parser import annotate_offer
+from search_service import get_store_scrapers, iter_store_results
+from metrics import Counter, Histogram
+import config
 
 # List of high-efficiency staple items to track for benchmarking
 STAPLE_ITEMS: List[Dict[str, str]] = [
@@ -27,94 +33,181 @@ STAPLE_ITEMS: List[Dict[str, str]] = [
     {"name": "Whole Wheat Bread", "category": "bakery"}
 ]
 
+# Grocery stores whose prices compete for each staple's best deal
+BENCHMARK_STORES: List[str] = ["Walmart", "Safeway", "Trader Joe's", "Target"]
+
 def get_staple_queries() -> List[str]:
     """Returns a list of search queries for the staple items."""
     return [item["name"] for item in STAPLE_ITEMS]
 
-def update_benchmarks(db: Session):
+def stale_staples(db: Session, max_age_s: float) -> List[Dict[str, str]]:
+    """Staples with no BenchmarkItem yet, or one last updated more than `max_age_s` ago."""
+    now = datetime.now(timezone.utc)
+    last_updated = {name: updated for name, updated in db.query(BenchmarkItem.name, BenchmarkItem.last_updated)}
+    stale = []
+    for item in STAPLE_ITEMS:
+        updated = last_updated.get(item["name"])
+        if updated is not None and updated.tzinfo is None:  # SQLite hands back naive UTC
+            updated = updated.replace(tzinfo=timezone.utc)
+        if updated is None or (now - updated).total_seconds() > max_age_s:
+            stale.append(item)
+    return stale
+
+# Assumed package weight when the title doesn't state one
+DEFAULT_WEIGHT_G = 454.0 # 1lb
+
+def offer_weight_g(offer: Dict[str, Any]) -> float:
+    """Net weight annotated on the offer at ingest (liquids by volume), else DEFAULT_WEIGHT_G."""
+    if "net_grams" not in offer:  # didn't come through search_service
+        offer = annotate_offer(dict(offer))
+    return offer.get("net_grams") or offer.get("net_ml") or DEFAULT_WEIGHT_G
+
+_stage_seconds = Histogram(
+    "cheapnut_benchmark_refresh_stage_seconds",
+    "Benchmark refresh time per stage: scrape and nutrition (per staple), save and total (per refresh).",
+    ["stage"],
+)
+_staples_total = Counter(
+    "cheapnut_benchmark_staples_total",
+    "Staples refreshed by outcome: updated, skipped (no usable offer or nutrition), failed.",
+    ["outcome"],
+)
+
+def _benchmark_scrapers() -> List[Tuple[str, str, ScraperInterface]]:
+    """The benchmark stores' shared scrapers, reading past the result cache so a refresh gets live prices."""
+    return [
+        (store, category, LiveScraper(scraper) if isinstance(scraper, CachedScraper) else scraper)
+        for store, category, scraper in get_store_scrapers()
+        if store in BENCHMARK_STORES
+    ]
+
+def staple_workers(max_workers: Optional[int], stores: int, items: int) -> int:
     """
-    Iterates through staple items, scrapes current prices,
-    gets nutrition info, and updates BenchmarkItems in DB.
+    Staples refreshed at once. Each fans out to every store, so this is capped
+    to keep the refresh's scrapes within the browser pool's sessions; more would
+    just fail their leases.
     """
-    logging.info("Starting Benchmark Update Routine...")
-    
-    # Initialize Scrapers
-    # We use Walmart as primary for low prices, potentially others later
-    walmart = WalmartScraper(headless=True)
-    nutrition_service = NutritionService()
-    
-    for item in STAPLE_ITEMS:
-        query = item["name"]
-        logging.info(f"Updating benchmark for: {query}")
-        
-        # 1. Scrape Price
-        # Try Walmart first
-        results = walmart.search(query)
-        
-        if not results:
-            logging.warning(f"No results found for {query}")
-            continue
-            
-        # Find cheapest valid result
-        # Simple heuristic: cheapest non-zero price
-        valid_results = [r for r in results if r['price'] > 0]
-        if not valid_results:
-            continue
-            
-        best_deal = min(valid_results, key=lambda x: x['price'])
-        
-        # 2. Get Nutrition
-        # We search OpenFoodFacts for generic nutrition of this item name
-        # We use the generic 'query' name to avoid specific brand noise if possible,
-        # OR we use the scraped name. Let's use the scraped name for accuracy, 
-        # but sometimes 'Great Value Frozen Green Beans' is better than just 'Green Beans'
+    requested = max_workers or config.BENCHMARK_MAX_WORKERS
+    by_pool = config.BROWSER_POOL_SIZE // max(1, stores)
+    return max(1, min(requested, by_pool, items))
+
+def refresh_staple(
+    item: Dict[str, str],
+    scrapers: List[Tuple[str, str, ScraperInterface]],
+    nutrition_service: NutritionService,
+) -> Optional[Dict[str, Any]]:
+    """
+    Scrapes one staple at every benchmark store at once, picks the cheapest offer
+    per gram across all of them and computes its value metrics.
+    Returns None if no store had a usable offer.
+    """
+    query = item["name"]
+    logging.info(f"Updating benchmark for: {query}")
+
+    # 1. Scrape Price at all stores concurrently
+    results = []
+    with _stage_seconds.time("scrape"):
+        for outcome in iter_store_results(
+            query,
+            scrapers=scrapers,
+            max_workers=len(scrapers),
+            deadline_s=config.BENCHMARK_STAPLE_DEADLINE_S,
+            store_timeout_s=config.BENCHMARK_STORE_TIMEOUT_S,
+        ):
+            results.extend(outcome["results"])
+
+    # Best deal: cheapest per gram among non-zero prices
+    valid_results = [r for r in results if r['price'] > 0]
+    if not valid_results:
+        logging.warning(f"No results found for {query}")
+        return None
+    best_deal = min(valid_results, key=lambda r: r['price'] / offer_weight_g(r))
+
+    # 2. Get Nutrition
+    # The scraped title is cleaned of brand/size noise and the OpenFoodFacts
+    # candidates are ranked against it, so one lookup is enough.
+    with _stage_seconds.time("nutrition"):
         nutrition = nutrition_service.get_nutrition(best_deal['name'])
-        
-        if not nutrition:
-            # Fallback to query name
-             nutrition = nutrition_service.get_nutrition(query)
-             
-        if not nutrition:
-            logging.warning(f"No nutrition data for {query}")
-            continue
-
-        # 3. Calculate Metrics
-        # Need to estimate weight. 
-        # If 'unit' is 'item', we need to parse weight from title (e.g. "12 oz").
-        # This is tricky. For now, let's assume standard package sizes or try to parse.
-        # Quick hack: default to 454g (1lb) if unknown, or 100g if it looks small.
-        # Ideally our scraper returns 'unit_string' like '16 oz'.
-        # Walmart scraper returns 'unit': 'item'.
-        # We will assume 1lb (454g) for most bulk items for MVP, or parse from title.
-        
-        estimated_weight_g = 454.0 # Default 1lb
-        name_lower = best_deal['name'].lower()
-        if '12 oz' in name_lower: estimated_weight_g = 340.0
-        if '16 oz' in name_lower or '1 lb' in name_lower: estimated_weight_g = 454.0
-        if '32 oz' in name_lower or '2 lb' in name_lower: estimated_weight_g = 907.0
-        if '5 lb' in name_lower: estimated_weight_g = 2268.0
-        
-        metrics = AnalysisEngine.calculate_metrics(best_deal['price'], nutrition, estimated_weight_g)
-        
-        if not metrics:
-            continue
-            
-        # 4. Save to DB
-        # Check if exists
-        db_item = db.query(BenchmarkItem).filter(BenchmarkItem.name == query).first()
+    if not nutrition:
+        logging.warning(f"No nutrition data for {query}")
+        return None
+
+    # 3. Calculate Metrics
+    metrics = AnalysisEngine.calculate_metrics(best_deal['price'], nutrition, offer_weight_g(best_deal))
+    if not metrics:
+        return None
+
+    return {"name": query, "category": item.get("category"), "deal": best_deal, "metrics": metrics}
+
+def update_benchmarks(
+    db: Session,
+    max_workers: int = None,
+    items: List[Dict[str, str]] = None,
+    progress: Callable[[str, str, Optional[float]], None] = None,
+) -> Dict[str, Any]:
+    """
+    Refreshes staples (all of STAPLE_ITEMS unless `items` is given) in parallel
+    across the benchmark stores, at most staple_workers() at a time, then writes
+    all BenchmarkItems in a single transaction. Returns a short summary.
+
+    `progress(name, status, elapsed)` is called as each staple starts ("running")
+    and finishes ("updated", "skipped" or "failed").
+    """
+    logging.info("Starting Benchmark Update Routine...")
+    start = time.monotonic()
+    items = STAPLE_ITEMS if items is None else items
+    progress = progress or (lambda name, status, elapsed: None)
+
+    scrapers = _benchmark_scrapers()
+    nutrition_service = get_nutrition_service()
+
+    def safe_refresh(item):
+        item_start = time.monotonic()
+        progress(item["name"], "running", None)
+        try:
+            row = refresh_staple(item, scrapers, nutrition_service)
+            _staples_total.inc("updated" if row else "skipped")
+            progress(item["name"], "updated" if row else "skipped", time.monotonic() - item_start)
+            return row
+        except Exception as e:
+            logging.error(f"Benchmark refresh failed for {item['name']}: {e}")
+            _staples_total.inc("failed")
+            progress(item["name"], "failed", time.monotonic() - item_start)
+            return None
+
+    refreshed = []
+    if items:
+        workers = staple_workers(max_workers, len(scrapers), len(items))
+        with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="benchmark") as executor:
+            refreshed = [row for row in executor.map(safe_refresh, items) if row]
+
+    # 4. Save to DB, all rows in one transaction
+    save_start = time.monotonic()
+    names = [row["name"] for row in refreshed]
+    existing = {b.name: b for b in db.query(BenchmarkItem).filter(BenchmarkItem.name.in_(names))}
+    for row in refreshed:
+        db_item = existing.get(row["name"])
         if not db_item:
-            db_item = BenchmarkItem(name=query)
+            db_item = BenchmarkItem(name=row["name"])
             db.add(db_item)
-            
+
+        best_deal, metrics = row["deal"], row["metrics"]
+        db_item.category = row["category"]
         db_item.lowest_price = best_deal['price']
         db_item.store = best_deal['store']
         db_item.unit = best_deal['unit']
         db_item.price_per_100g = metrics.get('price_per_100g', 0)
         db_item.calories_per_dollar = metrics.get('calories_per_dollar', 0)
         db_item.protein_per_dollar = metrics.get('protein_per_dollar', 0)
-        
-        db.commit()
-        logging.info(f"Updated {query}: ${best_deal['price']} - {metrics.get('protein_per_dollar'):.1f}g prot/$")
+        logging.info(f"Updated {row['name']}: ${best_deal['price']} at {best_deal['store']} - {metrics.get('protein_per_dollar'):.1f}g prot/$")
+    db.commit()
+    _stage_seconds.observe(time.monotonic() - save_start, "save")
 
-    walmart.driver.quit()
-    logging.info("Benchmark Update Complete.")
+    elapsed = time.monotonic() - start
+    _stage_seconds.observe(elapsed, "total")
+    logging.info(f"Benchmark Update Complete: {len(refreshed)}/{len(items)} staples in {elapsed:.1f}s.")
+    return {
+        "updated": names,
+        "skipped": [item["name"] for item in items if item["name"] not in names],
+        "elapsed": round(elapsed, 3),
+    }
@@ -0,0 +1,34 @@
+import os
+import sys
+import tempfile
+
+# App modules read config at import time: point them at throwaway paths before any is imported
+_WORKDIR = tempfile.mkdtemp(prefix="cheapnut-tests-")
+os.environ.update({
+    "CHEAPNUT_DATABASE_URL": f"sqlite:///{os.path.join(_WORKDIR, 'cheapnut.db')}",
+    "CHEAPNUT_OFF_INDEX_PATH": os.path.join(_WORKDIR, "no_off_index.db"),
+    "CHEAPNUT_RESULT_CACHE_DB_PATH": "",
+    "CHEAPNUT_BROWSER_POOL_PREWARM": "0",
+    "CHEAPNUT_MENU_SCHEDULER": "0",
+    "CHEAPNUT_PROFILE_DIR": os.path.join(_WORKDIR, "profiles"),
+})
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import pytest
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+@pytest.fixture
+def db(tmp_path):
+    """Session on a fresh SQLite file with the ORM tables (no migrations, so no FTS index)."""
+    from database import Base
+    import models  # noqa: F401  registers the tables
+
+    engine = create_engine(f"sqlite:///{tmp_path / 'test.db'}")
+    Base.metadata.create_all(engine)
+    session = sessionmaker(bind=engine)()
+    try:
+        yield session
+    finally:
+        session.close()
+        engine.dispose()
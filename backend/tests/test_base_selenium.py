@@ -0,0 +1,82 @@
+import pytest
+from selenium.common.exceptions import TimeoutException
+
+import config
+from scrapers import base_selenium, health
+from scrapers.base_selenium import SeleniumScraper
+from scrapers.browser_pool import BrowserPoolExhausted
+from scrapers.extraction import ExtractionSpec
+from scrapers.health import CLOSED, get_store_health
+
+class FakeDriver:
+    def __init__(self, ready_state="complete"):
+        self.ready_state = ready_state
+        self.title = "Search results"
+        self.visited = []
+
+    def get(self, url):
+        self.visited.append(url)
+
+    def execute_script(self, script):
+        return self.ready_state
+
+class FakeScraper(SeleniumScraper):
+    """Browser-only scraper whose 'lease' hands out `driver`, or raises `lease_error`."""
+    spec = ExtractionSpec(container="div.product", name=".title", price=".price")
+
+    def __init__(self, store, driver=None, lease_error=None):
+        super().__init__()
+        self.store = store
+        self.fake_driver = driver
+        self.lease_error = lease_error
+
+    def search_url(self, query):
+        return f"https://{self.store}.example/search?q={query}"
+
+    def _try_http(self, url):
+        return None
+
+    def _setup_driver(self):
+        if self.lease_error:
+            raise self.lease_error
+        self.driver = self.fake_driver
+
+    def _teardown_driver(self):
+        self.driver = None
+
+@pytest.fixture
+def breaker(monkeypatch):
+    monkeypatch.setattr(config, "BREAKER_FAILURES", 3)
+    monkeypatch.setattr(health, "_health", {})
+
+@pytest.fixture
+def never_ready(monkeypatch):
+    def wait(driver, selector=None, timeout=None):
+        raise TimeoutException(f"{selector} not found in {timeout}s")
+    monkeypatch.setattr(base_selenium, "wait_until_ready", wait)
+
+def test_loaded_page_without_products_is_an_empty_result(breaker, never_ready):
+    scraper = FakeScraper("nothing-found", driver=FakeDriver("complete"))
+    for query in ("durian", "jackfruit", "rambutan", "mangosteen"):
+        assert scraper.search(query) == []
+
+    store = get_store_health("nothing-found")
+    assert store.state == CLOSED
+    assert store.counts["failures"] == 0
+    assert store.load_times  # timed-out waits still count toward the adaptive timeout
+
+def test_page_still_loading_at_the_timeout_is_a_failure(breaker, never_ready):
+    scraper = FakeScraper("slow-store", driver=FakeDriver("loading"))
+    with pytest.raises(TimeoutException):
+        scraper.search("rice")
+    assert get_store_health("slow-store").counts["failures"] == 1
+
+def test_pool_exhaustion_leaves_the_breaker_alone(breaker):
+    scraper = FakeScraper("busy-store", lease_error=BrowserPoolExhausted("no session in 15s"))
+    for query in ("rice", "beans", "oats", "eggs"):
+        with pytest.raises(BrowserPoolExhausted):
+            scraper.search(query)
+
+    store = get_store_health("busy-store")
+    assert store.state == CLOSED
+    assert store.counts["failures"] == 0
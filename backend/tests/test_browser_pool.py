@@ -0,0 +1,126 @@
+import threading
+import time
+
+import pytest
+
+from scrapers.browser_pool import BrowserPool, BrowserPoolExhausted, PooledBrowser
+
+class FakeDriver:
+    def __init__(self, n):
+        self.n = n
+        self.healthy = True
+        self.heap_bytes = 0
+        self.quit_called = False
+
+    def execute_script(self, script):
+        if not self.healthy:
+            raise RuntimeError("session deleted")
+        if "usedJSHeapSize" in script:
+            return self.heap_bytes
+        return 1
+
+    def quit(self):
+        self.quit_called = True
+
+class FakePool(BrowserPool):
+    """BrowserPool whose sessions are FakeDrivers instead of Chrome."""
+    def __init__(self, fail_creates=0, **kwargs):
+        kwargs.setdefault("size", 2)
+        kwargs.setdefault("lease_timeout_s", 0.2)
+        kwargs.setdefault("max_pages", 100)
+        kwargs.setdefault("max_memory_mb", 0)
+        super().__init__(headless=True, lean=True, **kwargs)
+        self.drivers = []
+        self.fail_creates = fail_creates
+
+    def _create(self):
+        if self.fail_creates:
+            self.fail_creates -= 1
+            raise RuntimeError("chrome failed to start")
+        driver = FakeDriver(len(self.drivers))
+        self.drivers.append(driver)
+        with self._cond:
+            self._stats["created"] += 1
+        return PooledBrowser(driver, self.lean)
+
+def test_released_sessions_are_reused():
+    pool = FakePool()
+    with pool.lease() as first:
+        pass
+    with pool.lease() as second:
+        pass
+    assert first is second
+    stats = pool.stats()
+    assert (stats["created"], stats["leases"], stats["live"], stats["idle"]) == (1, 2, 1, 1)
+
+def test_exhausted_pool_raises_after_the_lease_timeout():
+    pool = FakePool(size=1, lease_timeout_s=0.05)
+    held = pool.acquire()
+    start = time.monotonic()
+    with pytest.raises(BrowserPoolExhausted):
+        pool.acquire()
+    assert time.monotonic() - start >= 0.05
+    assert pool.stats()["lease_timeouts"] == 1
+    pool.release(held)
+
+def test_waiter_gets_the_session_released_to_it():
+    pool = FakePool(size=1, lease_timeout_s=2)
+    held = pool.acquire()
+    leased = []
+    waiter = threading.Thread(target=lambda: leased.append(pool.acquire()))
+    waiter.start()
+    for _ in range(200):
+        if pool.stats()["waiting"]:
+            break
+        time.sleep(0.005)
+    pool.release(held)
+    waiter.join()
+    assert leased == [held]
+    assert pool.stats()["created"] == 1
+
+def test_sessions_are_recycled_after_max_pages():
+    pool = FakePool(max_pages=2)
+    browser = pool.acquire()
+    pool.release(browser)
+    assert pool.acquire() is browser
+    pool.release(browser)
+    assert browser.driver.quit_called
+    assert pool.stats()["recycled_pages"] == 1
+    assert pool.acquire() is not browser
+
+def test_sessions_are_recycled_past_the_memory_limit():
+    pool = FakePool(max_memory_mb=100)
+    browser = pool.acquire()
+    browser.driver.heap_bytes = 200 * 1024 * 1024
+    pool.release(browser)
+    assert browser.driver.quit_called
+    assert pool.stats()["recycled_memory"] == 1
+    assert pool.stats()["live"] == 0
+
+def test_unhealthy_idle_sessions_are_replaced_on_lease():
+    pool = FakePool()
+    browser = pool.acquire()
+    pool.release(browser)
+    browser.driver.healthy = False
+
+    replacement = pool.acquire()
+    assert replacement is not browser
+    assert pool.stats()["recycled_unhealthy"] == 1
+    assert pool.stats()["live"] == 1
+
+def test_failed_create_frees_its_slot():
+    pool = FakePool(size=1, fail_creates=1)
+    with pytest.raises(RuntimeError):
+        pool.acquire()
+    assert pool.stats()["live"] == 0
+    assert pool.acquire().driver.n == 0
+
+def test_close_quits_idle_sessions_and_discards_leased_ones_on_release():
+    pool = FakePool()
+    idle, leased = pool.acquire(), pool.acquire()
+    pool.release(idle)
+    pool.close()
+    assert idle.driver.quit_called
+    pool.release(leased)
+    assert leased.driver.quit_called
+    assert pool.stats()["live"] == 0
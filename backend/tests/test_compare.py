@@ -0,0 +1,85 @@
+import numpy as np
+import pytest
+from fastapi.testclient import TestClient
+
+import compare
+import main
+from analysis_engine import AnalysisEngine
+from compare import compare_batch
+from database import get_db
+from models import BenchmarkItem
+
+LENTILS = dict(name="Lentils", store="Walmart", lowest_price=1.5,
+               calories_per_dollar=1500.0, protein_per_dollar=90.0, price_per_100g=0.25)
+EGGS = dict(name="Eggs", store="Safeway", lowest_price=3.0,
+            calories_per_dollar=600.0, protein_per_dollar=50.0, price_per_100g=0.6)
+
+def _add_benchmarks(db):
+    for fields in (LENTILS, EGGS):
+        db.add(BenchmarkItem(**fields))
+    db.commit()
+
+def test_opportunity_cost_matrix_matches_scalar():
+    staples = [BenchmarkItem(**LENTILS), BenchmarkItem(**EGGS)]
+    offers = [
+        {"price": 5.99, "nutrition": {"calories": 550, "protein": "25g"}},
+        {"price": 2.0, "nutrition": {"calories": 300, "protein": "12g"}},
+    ]
+    matrix = AnalysisEngine.opportunity_cost_matrix(
+        [o["price"] for o in offers], [550.0, 300.0], [25.0, 12.0],
+        [s.calories_per_dollar for s in staples],
+        [s.protein_per_dollar for s in staples],
+        [s.price_per_100g for s in staples],
+    )
+    for i, offer in enumerate(offers):
+        for j, staple in enumerate(staples):
+            scalar = AnalysisEngine.calculate_opportunity_cost(offer, staple)
+            for key, column in (("protein", "alt_protein"), ("calories", "alt_calories"), ("quantity_lbs", "quantity_lbs")):
+                assert matrix[column][i, j] == pytest.approx(scalar["benchmark_potential"][key])
+            assert matrix["protein_multiplier"][i, j] == pytest.approx(scalar["multipliers"]["protein"])
+
+def test_opportunity_cost_matrix_marks_unpriced_items_invalid():
+    matrix = AnalysisEngine.opportunity_cost_matrix([0.0, 3.0], [500.0, 0.0], [20.0, 0.0], [1000.0], [50.0], [0.3])
+    assert matrix["valid"].tolist() == [[False], [True]]
+    assert np.isnan(matrix["alt_protein"][0, 0])
+    # No nutrition on the fast food side gives a 0 multiplier, like the scalar version
+    assert matrix["protein_multiplier"][1, 0] == 0.0
+
+def test_compare_batch_ranks_alternatives_by_metric(db):
+    _add_benchmarks(db)
+    offer = {"name": "Burrito", "price": 10.0, "store": "Chipotle", "nutrition": {"calories": 1000, "protein": "40g"}}
+    comparison = compare_batch(db, [offer, {"name": "Water", "price": 0}], metric="protein", top_k=2)
+
+    assert comparison["benchmarks"] == 2
+    burrito, water = comparison["results"]
+    assert burrito["source"] == "request"
+    assert [alt["comparison_item"] for alt in burrito["alternatives"]] == ["Lentils", "Eggs"]
+    assert burrito["alternatives"][0]["store"] == "Walmart"
+    assert burrito["alternatives"][0]["benchmark_potential"]["protein"] == pytest.approx(900.0)
+    assert water["alternatives"] == []
+
+@pytest.fixture
+def client(db):
+    main.app.dependency_overrides[get_db] = lambda: db
+    try:
+        yield TestClient(main.app)
+    finally:
+        main.app.dependency_overrides.clear()
+
+def test_get_compare_keeps_the_opportunity_cost_contract(client, db, monkeypatch):
+    _add_benchmarks(db)
+    offers = {
+        "burrito": {"name": "Burrito", "price": 10.0, "store": "Chipotle", "nutrition": {"protein": "40g"}},
+        "water": {"name": "Water", "price": 0.0, "store": "Chipotle", "nutrition": {}},
+    }
+    monkeypatch.setattr(compare, "resolve_offer", lambda db, entry: (offers[entry], "cache") if entry in offers else (None, "missing"))
+
+    body = client.get("/api/compare/opportunity-cost", params={"query": "burrito"}).json()
+    expected = AnalysisEngine.calculate_opportunity_cost(offers["burrito"], BenchmarkItem(**LENTILS))
+    assert set(expected) <= set(body)
+    assert body["comparison_item"] == "Lentils"
+    assert body["benchmark_potential"]["protein"] == pytest.approx(expected["benchmark_potential"]["protein"])
+
+    # Like calculate_opportunity_cost, an unpriced item has no comparison
+    assert client.get("/api/compare/opportunity-cost", params={"query": "water"}).json() == {}
+    assert client.get("/api/compare/opportunity-cost", params={"query": "sushi"}).json() == {"error": "Item not found"}
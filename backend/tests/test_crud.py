@@ -0,0 +1,26 @@
+import pytest
+
+import crud
+import models
+
+def _offer(name, price, nutrition=None, store="Walmart"):
+    return {"name": name, "price": price, "store": store, "type": "grocery", "unit": "item", "nutrition": nutrition}
+
+def _merge(db, offers):
+    return crud._merge_items(db, [crud._offer_row(offer) for offer in offers])
+
+@pytest.mark.parametrize("upsert", [crud.upsert_items, _merge], ids=["on_conflict", "merge"])
+def test_upsert_inserts_then_updates_keeping_nutrition(db, upsert):
+    assert upsert(db, [_offer("Oats", 3.0, {"calories": 380}), _offer("Rice", 2.0)]) == 2
+    assert upsert(db, [_offer("Oats", 2.5), _offer("Eggs", 4.0, store="Target")]) == 2
+
+    items = {(i.store_name, i.name): i for i in db.query(models.Item)}
+    assert len(items) == 3
+    oats = items[("Walmart", "Oats")]
+    assert oats.price == 2.5
+    assert oats.nutrition_data == {"calories": 380}
+
+def test_upsert_falls_back_to_merge_on_other_dialects(db, monkeypatch):
+    monkeypatch.setattr(db.bind.dialect, "name", "mssql")
+    assert crud.upsert_items(db, [_offer("Oats", 3.0), _offer("Oats", 2.0)]) == 1
+    assert [(i.name, i.price) for i in db.query(models.Item)] == [("Oats", 2.0)]
@@ -0,0 +1,66 @@
+import asyncio
+
+import pytest
+from fastapi.testclient import TestClient
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+
+import database
+import main
+from database import async_database_url, dispose_async_engine, get_async_session_factory
+from models import Item
+
+@pytest.mark.parametrize("url, expected", [
+    ("sqlite:///./cheapnut.db", "sqlite+aiosqlite:///./cheapnut.db"),
+    ("postgresql://user:pw@localhost:5432/cheapnut", "postgresql+asyncpg://user:pw@localhost:5432/cheapnut"),
+    ("postgresql+psycopg2://user:pw@db/cheapnut", "postgresql+asyncpg://user:pw@db/cheapnut"),
+])
+def test_async_database_url_swaps_the_driver(url, expected):
+    assert async_database_url(url) == expected
+
+def test_async_database_url_rejects_unknown_backends():
+    with pytest.raises(ValueError):
+        async_database_url("mysql://localhost/cheapnut")
+
+def test_async_session_factory_uses_the_configured_database():
+    async def query():
+        try:
+            async with get_async_session_factory()() as db:
+                assert db.bind.dialect.driver == "aiosqlite"
+                return (await db.execute(text("PRAGMA journal_mode"))).scalar()
+        finally:
+            await dispose_async_engine()
+
+    assert asyncio.run(query()) == "wal"
+    assert database._async_engine is None
+
+@pytest.fixture
+def client(db):
+    engine = create_async_engine(async_database_url(str(db.bind.url)))
+    sessions = async_sessionmaker(engine, expire_on_commit=False)
+
+    async def override():
+        async with sessions() as session:
+            yield session
+
+    main.app.dependency_overrides[database.get_async_db] = override
+    try:
+        yield TestClient(main.app)
+    finally:
+        main.app.dependency_overrides.clear()
+
+def test_best_value_endpoint_reads_through_the_async_session(client, db):
+    db.add_all([
+        Item(name="Rice 5 lb", item_type="grocery", store_name="Walmart", price=4.0, price_per_100g=0.18),
+        Item(name="Oats 42 oz", item_type="grocery", store_name="Target", price=5.0, price_per_100g=0.42),
+        Item(name="Milk 1 gal", item_type="grocery", store_name="Safeway", price=4.0, price_per_100ml=0.11),
+        Item(name="Big Mac", item_type="restaurant", store_name="McDonald's", price=5.99),
+    ])
+    db.commit()
+
+    response = client.get("/api/items/best-value", params={"limit": 5})
+    assert response.status_code == 200
+    assert [item["name"] for item in response.json()] == ["Rice 5 lb", "Oats 42 oz"]
+
+    response = client.get("/api/items/best-value", params={"per": "ml"})
+    assert [item["name"] for item in response.json()] == ["Milk 1 gal"]
@@ -0,0 +1,80 @@
+import threading
+import time
+
+import pytest
+
+import config
+import enrichment
+from enrichment import enrich_nutrition, iter_nutrition
+
+class SlowService:
+    """get_nutrition sleeps `delay` and records how many lookups ran at once."""
+    def __init__(self, delay):
+        self.delay = delay
+        self.lock = threading.Lock()
+        self.running = 0
+        self.peak = 0
+        self.started = []
+
+    def get_nutrition(self, name):
+        with self.lock:
+            self.running += 1
+            self.peak = max(self.peak, self.running)
+            self.started.append(name)
+        try:
+            time.sleep(self.delay)
+            return {"calories": 100}
+        finally:
+            with self.lock:
+                self.running -= 1
+
+def _items(prefix, count):
+    return [{"name": f"{prefix} item {i}, 12 oz"} for i in range(count)]
+
+@pytest.fixture(autouse=True)
+def shared_pool(monkeypatch):
+    monkeypatch.setattr(config, "ENRICH_MAX_IN_FLIGHT", 2)
+    monkeypatch.setattr(enrichment, "_executor", None)
+    yield
+    enrichment.get_enrich_executor().shutdown(wait=True)
+
+def test_enriches_every_distinct_name_once():
+    service = SlowService(0)
+    items = _items("oats", 3) + [{"name": "oats item 0, 24 oz"}]
+    summary = enrich_nutrition(items, service=service, budget_s=5)
+
+    assert summary["names"] == 3 and summary["resolved"] == 3
+    assert len(service.started) == 3
+    assert all(item["nutrition"] == {"calories": 100} for item in items)
+    assert not any(item.get("nutrition_pending") for item in items)
+
+def test_lookups_are_bounded_across_concurrent_requests():
+    service = SlowService(0.02)
+    requests = [threading.Thread(target=enrich_nutrition, args=(_items(name, 5),), kwargs={"service": service, "budget_s": 5})
+                for name in ("rice", "beans", "eggs")]
+    for thread in requests:
+        thread.start()
+    for thread in requests:
+        thread.join()
+
+    assert len(service.started) == 15
+    assert service.peak <= 2
+
+def test_queued_lookups_are_cancelled_when_the_budget_runs_out():
+    service = SlowService(0.2)
+    items = _items("milk", 10)
+    summary = enrich_nutrition(items, service=service, budget_s=0.05)
+    assert summary["resolved"] == 0
+    assert all(item["nutrition_pending"] for item in items)
+
+    enrichment.get_enrich_executor().shutdown(wait=True)
+    # Only the lookups already running when the request gave up went ahead
+    assert len(service.started) == 2
+
+def test_stops_yielding_when_the_consumer_stops():
+    service = SlowService(0.01)
+    lookups = iter_nutrition(_items("tuna", 6), service=service, max_in_flight=1, budget_s=5)
+    next(lookups)
+    lookups.close()
+    enrichment.get_enrich_executor().shutdown(wait=True)
+    assert len(service.started) <= 2
@@ -0,0 +1,24 @@
+from scrapers.costco import CostcoScraper
+from scrapers.extraction import extract_html, extract_products
+
+def _tile(name, price):
+    return f'<div class="product-tile"><div class="description"><a>{name}</a></div><div class="price">{price}</div></div>'
+
+def test_costco_list_products_win_over_the_tiles_inside_them():
+    html = (
+        '<div class="product-list">'
+        f'<div class="product">{_tile("Kirkland Dry Lentils, 16 oz", "$16.65")}</div>'
+        f'<div class="product">{_tile("Kirkland Jasmine Rice, 5 lb", "$42.66")}</div>'
+        '</div>'
+    )
+    spec = CostcoScraper.spec
+    names = [name for name, _, _ in extract_products(extract_html(html, spec), spec)]
+    assert names == ["Kirkland Dry Lentils, 16 oz", "Kirkland Jasmine Rice, 5 lb"]
+
+def test_costco_falls_back_to_tiles():
+    html = _tile("Kirkland Bananas, each", "Sign in to see price") + _tile("Kirkland Whole Milk", "$7.20")
+    spec = CostcoScraper.spec
+    assert extract_products(extract_html(html, spec), spec) == [
+        ("Kirkland Bananas, each", 0.0, ""),
+        ("Kirkland Whole Milk", 7.2, ""),
+    ]
@@ -0,0 +1,123 @@
+import pytest
+
+import config
+from scrapers import health
+from scrapers.health import CLOSED, HALF_OPEN, OPEN, StoreHealth
+
+class FakeTime:
+    def __init__(self):
+        self.now = 1_000_000.0
+
+    def time(self):
+        return self.now
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = FakeTime()
+    monkeypatch.setattr(health, "time", clock)
+    monkeypatch.setattr(config, "BREAKER_FAILURES", 3)
+    monkeypatch.setattr(config, "BREAKER_CAPTCHAS", 1)
+    monkeypatch.setattr(config, "BREAKER_COOLDOWN_S", 60.0)
+    monkeypatch.setattr(config, "BREAKER_CAPTCHA_COOLDOWN_S", 900.0)
+    monkeypatch.setattr(config, "BREAKER_MAX_COOLDOWN_S", 200.0)
+    monkeypatch.setattr(config, "STORE_TIMEOUT_S", 30.0)
+    return clock
+
+def _trip(store, failures=3):
+    for _ in range(failures):
+        store.record_failure("timeout")
+
+def test_opens_after_consecutive_failures(clock):
+    store = StoreHealth("Walmart")
+    _trip(store, 2)
+    assert store.state == CLOSED and store.allow()
+
+    store.record_failure("timeout")
+    assert store.state == OPEN
+    assert store.allow() is False
+    assert store.counts["skipped"] == 1
+
+def test_success_resets_the_failure_streak(clock):
+    store = StoreHealth("Walmart")
+    _trip(store, 2)
+    store.record_success()
+    _trip(store, 2)
+    assert store.state == CLOSED
+
+def test_a_single_captcha_opens_with_the_captcha_cooldown(clock):
+    store = StoreHealth("Target")
+    store.record_failure("captcha", blocked=True)
+    assert store.state == OPEN
+    assert store.cooldown_s == 200.0  # 900s captcha cooldown, capped by BREAKER_MAX_COOLDOWN_S
+
+def test_half_open_lets_exactly_one_probe_through(clock):
+    store = StoreHealth("Safeway")
+    _trip(store)
+    clock.now += 60
+    assert store.allow() is True
+    assert store.state == HALF_OPEN
+    assert store.allow() is False
+
+    store.record_success()
+    assert store.state == CLOSED
+    assert store.allow()
+
+def test_failed_probe_reopens_with_double_cooldown(clock):
+    store = StoreHealth("Costco")
+    _trip(store)
+    assert store.cooldown_s == 60.0
+    clock.now += 60
+    assert store.allow()
+
+    store.record_failure("timeout")
+    assert store.state == OPEN
+    assert store.cooldown_s == 120.0
+    clock.now += 119
+    assert store.allow() is False
+
+def test_abandoned_probe_frees_the_slot_after_the_store_timeout(clock):
+    store = StoreHealth("Starbucks")
+    _trip(store)
+    clock.now += 60
+    assert store.allow()
+    clock.now += 31
+    assert store.allow()
+    assert store.counts["probes"] == 2
+
+@pytest.fixture
+def timeouts(monkeypatch):
+    monkeypatch.setattr(config, "BROWSER_READY_TIMEOUT_S", 10.0)
+    monkeypatch.setattr(config, "ADAPTIVE_TIMEOUT_MIN_SAMPLES", 5)
+    monkeypatch.setattr(config, "ADAPTIVE_TIMEOUT_FACTOR", 1.5)
+    monkeypatch.setattr(config, "ADAPTIVE_TIMEOUT_FLOOR_S", 2.0)
+
+def test_ready_timeout_adapts_to_recorded_loads(clock, timeouts):
+    store = StoreHealth("Walmart")
+    assert store.ready_timeout() == 10.0
+    for _ in range(20):
+        store.observe_load(2.0)
+    assert store.ready_timeout() == 3.0
+
+    # Timed-out loads are observed at the timeout, so it grows back
+    for _ in range(3):
+        store.observe_load(store.ready_timeout())
+    assert store.ready_timeout() == 4.5
+
+def test_half_open_probe_waits_the_full_ceiling(clock, timeouts):
+    store = StoreHealth("Walmart")
+    for _ in range(20):
+        store.observe_load(1.0)
+    assert store.ready_timeout() == 2.0
+    _trip(store)
+    clock.now += 60
+    assert store.allow()
+    assert store.ready_timeout() == 10.0
+
+def test_aborted_probe_frees_the_slot(clock):
+    store = StoreHealth("Walmart")
+    _trip(store)
+    clock.now += 60
+    assert store.allow()
+    store.record_aborted()
+    assert store.state == HALF_OPEN
+    assert store.allow()
@@ -0,0 +1,106 @@
+from datetime import datetime, timedelta, timezone
+import threading
+import time
+
+import pytest
+from sqlalchemy.orm import sessionmaker
+
+import config
+import jobs
+from jobs import JobManager, staple_set_key
+from models import RefreshJobRecord
+from smart_pantry import STAPLE_ITEMS
+
+@pytest.fixture
+def sessions(db):
+    return sessionmaker(bind=db.bind)
+
+@pytest.fixture
+def refresh(monkeypatch):
+    """update_benchmarks that blocks until `release` is set, so a job can be caught running."""
+    release = threading.Event()
+    finished = threading.Event()
+
+    def update(db, items=None, progress=None):
+        for item in items:
+            progress(item["name"], "running", None)
+        release.wait(5)
+        for item in items:
+            progress(item["name"], "skipped", 0.0)
+        return {"updated": [], "skipped": [item["name"] for item in items], "elapsed": 0.0}
+
+    monkeypatch.setattr(jobs, "update_benchmarks", update)
+    monkeypatch.setattr(jobs.leaderboard_cache, "rebuild", lambda db: finished.set())
+    return release, finished
+
+def _wait_for(manager, job_id, status):
+    for _ in range(500):
+        job = manager.get(job_id)
+        if job is not None and job.status == status:
+            return job
+        time.sleep(0.01)
+    raise AssertionError(f"job {job_id} never reached {status}")
+
+def test_workers_share_the_running_lock_and_job_history(sessions, refresh):
+    release, finished = refresh
+    worker_a, worker_b = JobManager(sessions), JobManager(sessions)
+
+    job, started = worker_a.submit_refresh()
+    assert started
+    running = _wait_for(worker_b, job.id, "running")
+    assert running.to_dict()["progress"]["total"] == len(STAPLE_ITEMS)
+
+    # Another worker process sees the same refresh instead of starting its own
+    same, started = worker_b.submit_refresh()
+    assert not started and same.id == job.id
+
+    release.set()
+    assert finished.wait(5)
+    done = _wait_for(worker_b, job.id, "succeeded")
+    assert done.to_dict()["progress"] == {"done": len(STAPLE_ITEMS), "total": len(STAPLE_ITEMS)}
+
+    db = sessions()
+    assert db.get(RefreshJobRecord, job.id).running_key is None
+    db.close()
+    again, started = worker_b.submit_refresh()
+    assert started
+    _wait_for(worker_a, again.id, "succeeded")
+
+def test_unknown_job_is_none(sessions):
+    assert JobManager(sessions).get("nope") is None
+
+def test_stale_running_job_is_taken_over(sessions, refresh, monkeypatch):
+    release, _ = refresh
+    release.set()
+    monkeypatch.setattr(config, "REFRESH_JOB_STALE_S", 60.0)
+    long_ago = datetime.now(timezone.utc) - timedelta(hours=1)
+    db = sessions()
+    key = staple_set_key(STAPLE_ITEMS)
+    db.add(RefreshJobRecord(id="dead", staple_key=key, running_key=key, status="running",
+                            created_at=long_ago, heartbeat_at=long_ago, items={}))
+    db.commit()
+    db.close()
+
+    manager = JobManager(sessions)
+    job, started = manager.submit_refresh()
+    assert started and job.id != "dead"
+    dead = manager.get("dead")
+    assert dead.status == "failed" and "abandoned" in dead.error
+    _wait_for(manager, job.id, "succeeded")
+
+def test_history_is_pruned(sessions, refresh, monkeypatch):
+    release, _ = refresh
+    release.set()
+    monkeypatch.setattr(jobs, "MAX_JOB_HISTORY", 2)
+    db = sessions()
+    for i in range(4):
+        db.add(RefreshJobRecord(id=f"old{i}", staple_key="k", status="succeeded",
+                                created_at=datetime(2026, 1, 1 + i, tzinfo=timezone.utc), items={}))
+    db.commit()
+    db.close()
+
+    manager = JobManager(sessions)
+    job, _ = manager.submit_refresh()
+    _wait_for(manager, job.id, "succeeded")
+    assert manager.get("old3") is not None
+    assert manager.get("old0") is None
@@ -0,0 +1,63 @@
+from datetime import datetime, timezone
+
+import pytest
+
+from leaderboard import LeaderboardCache, InvalidCursor, decode_cursor, encode_cursor
+from models import BenchmarkItem
+
+LAST_WEEK = datetime(2026, 10, 11, tzinfo=timezone.utc)
+
+def _add(db, name, protein, category="grains", price=1.0):
+    db.add(BenchmarkItem(
+        name=name, category=category, lowest_price=price, protein_per_dollar=protein,
+        calories_per_dollar=protein * 10, last_updated=LAST_WEEK,
+    ))
+    db.commit()
+
+def test_cursor_round_trip():
+    assert decode_cursor(encode_cursor((-12.5, 7))) == (-12.5, 7)
+    assert "=" not in encode_cursor((-12.5, 7))
+
+@pytest.mark.parametrize("cursor", ["not-base64!", encode_cursor((1.0, 2))[:-3], "WzEsMiwzXQ"])
+def test_malformed_cursor_is_rejected(cursor):
+    with pytest.raises(InvalidCursor):
+        decode_cursor(cursor)
+
+def test_pages_follow_keyset_cursor(db):
+    for i, protein in enumerate([30, 10, 20, 20, 5]):
+        _add(db, f"Staple {i}", protein)
+    cache = LeaderboardCache()
+
+    names, cursor = [], None
+    while True:
+        rows, cursor = cache.page(db, metric="protein", cursor=cursor, limit=2)
+        names += [row["name"] for row in rows]
+        if cursor is None:
+            break
+    # Ties on the metric are broken by id
+    assert names == ["Staple 0", "Staple 2", "Staple 3", "Staple 1", "Staple 4"]
+
+    rows, _ = cache.page(db, metric="price", limit=10)
+    assert len(rows) == 5
+
+def test_rankings_pick_up_writes_from_another_process(db):
+    _add(db, "Lentils", 20)
+    cache = LeaderboardCache()
+    assert [r["name"] for r in cache.page(db)[0]] == ["Lentils"]
+
+    # Another worker's refresh: a new row, then an update to an existing one
+    _add(db, "Eggs", 30)
+    assert [r["name"] for r in cache.page(db)[0]] == ["Eggs", "Lentils"]
+
+    lentils = db.query(BenchmarkItem).filter_by(name="Lentils").one()
+    lentils.protein_per_dollar = 40
+    db.commit()
+    assert [r["name"] for r in cache.page(db)[0]] == ["Lentils", "Eggs"]
+    assert {r["name"] for r in cache.benchmarks(db)} == {"Lentils", "Eggs"}
+
+def test_unchanged_table_is_not_rebuilt(db, monkeypatch):
+    _add(db, "Lentils", 20)
+    cache = LeaderboardCache()
+    cache.page(db)
+    monkeypatch.setattr(cache, "rebuild", lambda *args: pytest.fail("rebuilt without a change"))
+    cache.page(db, category="grains")
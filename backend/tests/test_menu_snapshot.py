@@ -0,0 +1,112 @@
+import threading
+import time
+
+import pytest
+
+import config
+from scrapers import menu_snapshot
+from scrapers.health import CircuitOpen
+from scrapers.menu_snapshot import MenuScraper, MenuSnapshot
+
+class Clock:
+    def __init__(self):
+        self.now = 1_000_000.0
+
+    def time(self):
+        return self.now
+
+class FakeMenu(MenuScraper):
+    """Each menu scrape returns the next entry of `menus` (a list of items, or an exception)."""
+    store = "Fake Burger"
+
+    def __init__(self, menus, gate=None):
+        super().__init__()
+        self.menus = list(menus)
+        self.scrapes = 0
+        self.gate = gate
+
+    def _fetch_tiered(self, url, browser_fetch):
+        self.scrapes += 1
+        if self.gate:
+            self.gate.wait(2)
+        menu = self.menus.pop(0) if len(self.menus) > 1 else self.menus[0]
+        if isinstance(menu, Exception):
+            raise menu
+        return [dict(item) for item in menu], "http"
+
+def _menu(*names, price=4.99):
+    return [{"name": name, "price": price, "store": "Fake Burger"} for name in names]
+
+def _eventually(check, timeout=2.0):
+    deadline = time.monotonic() + timeout
+    while not check():
+        assert time.monotonic() < deadline, "condition never became true"
+        time.sleep(0.005)
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = Clock()
+    monkeypatch.setattr(menu_snapshot, "time", clock)
+    monkeypatch.setattr(config, "MENU_REFRESH_S", 3600.0)
+    monkeypatch.setattr(config, "MENU_RETRY_S", 300.0)
+    return clock
+
+def test_snapshot_search_matches_substrings_in_menu_order():
+    snapshot = MenuSnapshot("Fake Burger", _menu("Chicken Sandwich", "Spicy Chicken Sandwich", "Fries", "Fries"))
+    assert len(snapshot.items) == 3
+    assert [r["name"] for r in snapshot.search("chicken sand")] == ["Chicken Sandwich", "Spicy Chicken Sandwich"]
+    assert [r["name"] for r in snapshot.search("icken")] == ["Chicken Sandwich", "Spicy Chicken Sandwich"]
+    assert snapshot.search("sandwich chicken") == []
+    assert snapshot.search("fries")[0]["menu_version"] == snapshot.version
+
+def test_version_only_changes_with_the_menu():
+    a = MenuSnapshot("Fake Burger", _menu("Fries", "Shake"), fetched_at=1)
+    b = MenuSnapshot("Fake Burger", _menu("Shake", "Fries"), fetched_at=2)
+    c = MenuSnapshot("Fake Burger", _menu("Shake", "Fries", price=5.49))
+    assert a.version == b.version != c.version
+
+def test_concurrent_first_searches_share_one_scrape(clock):
+    gate = threading.Event()
+    scraper = FakeMenu([_menu("Fries")], gate=gate)
+    results = []
+    threads = [threading.Thread(target=lambda: results.append(scraper.search("fries"))) for _ in range(5)]
+    for thread in threads:
+        thread.start()
+    gate.set()
+    for thread in threads:
+        thread.join()
+
+    assert scraper.scrapes == 1
+    assert all(r[0]["name"] == "Fries" for r in results)
+
+def test_old_snapshot_keeps_serving_while_it_refreshes(clock):
+    scraper = FakeMenu([_menu("Fries"), _menu("Fries", "Onion Rings")])
+    first = scraper.snapshot or scraper.refresh_menu()
+    clock.now += 3601
+
+    assert [r["name"] for r in scraper.search("rings")] == []  # old menu answers right away
+    _eventually(lambda: scraper.snapshot is not first)
+    assert [r["name"] for r in scraper.search("rings")] == ["Onion Rings"]
+    assert scraper.scrapes == 2
+
+def test_failed_scrape_keeps_the_snapshot_and_waits_to_retry(clock):
+    scraper = FakeMenu([_menu("Fries"), RuntimeError("menu page changed"), _menu("Fries", "Shake")])
+    good = scraper.refresh_menu()
+    clock.now += 3601
+
+    assert scraper.refresh_menu() is good
+    assert not scraper.refresh_due()
+    clock.now += 301
+    assert scraper.refresh_due()
+    assert scraper.refresh_menu().search("shake")
+
+def test_open_circuit_keeps_the_snapshot(clock):
+    scraper = FakeMenu([_menu("Fries"), CircuitOpen("open")])
+    good = scraper.refresh_menu()
+    assert scraper.refresh_menu() is good
+
+def test_no_menu_and_a_recent_failure_returns_nothing(clock):
+    scraper = FakeMenu([RuntimeError("down")])
+    assert scraper.search("fries") == []
+    assert scraper.search("fries") == []
+    assert scraper.scrapes == 1
@@ -0,0 +1,35 @@
+import pytest
+
+from product_matcher import CandidateIndex, best_candidate, clean_title
+
+@pytest.mark.parametrize("title, expected", [
+    ("Great Value Frozen Cut Green Beans, 12 oz", "frozen cut green beans"),
+    ("Kirkland Signature Large Eggs, 24 ct", "large eggs"),
+    ("365 by Whole Foods Market Organic Brown Rice 2 lb Bag", "organic brown rice"),
+    ("Trader Joe’s Peanut Butter Jar", "peanut butter"),
+    ("Good & Gather Black Beans 4 x 15.5 oz Cans", "black beans"),
+])
+def test_clean_title_strips_brands_sizes_and_packaging(title, expected):
+    assert clean_title(title) == expected
+
+NAMES = ["Green beans", "Black beans", "Brown rice", "Large eggs", "Whole milk"]
+
+def test_best_candidate_tolerates_brands_and_plurals():
+    assert NAMES[best_candidate("Great Value Cut Green Bean, 14.5 oz", NAMES)] == "Green beans"
+    assert NAMES[best_candidate("Marketside Large Egg 12 ct", NAMES)] == "Large eggs"
+
+def test_unrelated_titles_do_not_match():
+    assert best_candidate("Paper Towels", NAMES) is None
+    assert best_candidate("Great Value 16 oz", NAMES) is None
+    assert best_candidate("Green beans", []) is None
+
+def test_match_ranks_and_batches():
+    index = CandidateIndex(NAMES)
+    ranked = index.match("black beans", top_k=2)
+    assert [NAMES[i] for i, _ in ranked] == ["Black beans", "Green beans"]
+    assert ranked[0][1] > ranked[1][1]
+    assert ranked[0][1] == pytest.approx(1.0)
+
+    matches = index.match_batch(["Brown Rice 5 lb", "dish soap"])
+    assert NAMES[matches[0][0]] == "Brown rice"
+    assert matches[1] is None
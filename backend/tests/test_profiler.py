@@ -0,0 +1,93 @@
+from concurrent.futures import ThreadPoolExecutor
+import threading
+import time
+
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+import config
+import profiler
+from profiler import HEADER, ProfilingMiddleware, list_profiles, profiled
+
+_barrier = threading.Barrier(2, timeout=5)
+
+def _busy(seconds: float):
+    end = time.perf_counter() + seconds
+    while time.perf_counter() < end:
+        pass
+
+def _make_app() -> FastAPI:
+    app = FastAPI()
+    app.add_middleware(ProfilingMiddleware)
+
+    @app.get("/together")
+    @profiled
+    def together():
+        _barrier.wait()
+        _busy(0.05)
+        return {"ok": True}
+
+    @app.get("/fan-out")
+    @profiled
+    def fan_out():
+        with ThreadPoolExecutor(max_workers=1, thread_name_prefix="search") as pool:
+            pool.submit(_busy, 0.1).result()
+        return {"ok": True}
+
+    @app.get("/fast")
+    @profiled
+    def fast():
+        return {"ok": True}
+
+    return app
+
+@pytest.fixture
+def client(tmp_path, monkeypatch):
+    monkeypatch.setattr(config, "PROFILING", True)
+    monkeypatch.setattr(config, "PROFILE_DIR", str(tmp_path))
+    monkeypatch.setattr(config, "PROFILE_INTERVAL_S", 0.002)
+    _barrier.reset()
+    return TestClient(_make_app())
+
+def test_flag_is_ignored_when_profiling_is_off(client, monkeypatch):
+    monkeypatch.setattr(config, "PROFILING", False)
+    response = client.get("/fan-out", headers={"X-Profile": "1"})
+    assert response.status_code == 200
+    assert HEADER not in response.headers
+    assert list_profiles() == []
+
+def test_concurrent_cprofile_requests_both_succeed(client):
+    responses = []
+
+    def call():
+        responses.append(client.get("/together", headers={"X-Profile": "cprofile"}))
+
+    threads = [threading.Thread(target=call) for _ in range(2)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert [r.status_code for r in responses] == [200, 200]
+    # One request holds cProfile; the other falls back to sampling
+    assert sorted(meta["mode"] for meta in list_profiles()) == ["cprofile", "sample"]
+    assert {meta["requested_mode"] for meta in list_profiles()} == {"cprofile"}
+    assert not profiler._cprofile_lock.locked()
+
+def test_samples_cover_worker_threads(client):
+    response = client.get("/fan-out", params={"profile": "1"})
+    report_id = response.headers[HEADER]
+    (meta,) = list_profiles()
+    assert meta["id"] == report_id and meta["samples"] > 0
+
+    with open(profiler.profile_path(report_id), encoding="utf-8") as f:
+        roots = {line.split(";", 1)[0] for line in f}
+    assert {"request", "search"} <= roots
+
+def test_request_without_samples_saves_nothing(client, monkeypatch):
+    monkeypatch.setattr(config, "PROFILE_INTERVAL_S", 10.0)
+    response = client.get("/fast", headers={"X-Profile": "1"})
+    assert response.status_code == 200
+    assert HEADER not in response.headers
+    assert list_profiles() == []
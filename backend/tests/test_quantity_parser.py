@@ -0,0 +1,40 @@
+import pytest
+
+from quantity_parser import PackageSize, annotate_offer, parse_quantity
+
+@pytest.mark.parametrize("title, expected", [
+    ("Old Fashioned Oats 42 oz", PackageSize(grams=1190.68)),
+    ("Chicken Breast 1.5 lbs", PackageSize(grams=680.39)),
+    ("Whole Milk 1 gal", PackageSize(ml=3785.41)),
+    ("Sparkling Water 12 pk 12 fl oz", PackageSize(ml=4258.58)),
+    ("Soup 6 x 12 oz", PackageSize(grams=2041.16)),
+    ("Olive Oil 1/2 gal", PackageSize(ml=1892.7)),
+    ("Yogurt 5.3 oz, pack of 4", PackageSize(grams=601.01)),
+    ("Large Eggs 12 ct", PackageSize(count=12)),
+    ("Bananas", None),
+    ("", None),
+])
+def test_parse_quantity(title, expected):
+    assert parse_quantity(title) == expected
+
+def test_piece_count_multiplies_the_per_piece_weight():
+    assert parse_quantity("Fruit Snacks 1.5 oz, 10 ct") == PackageSize(grams=425.24, count=10)
+
+@pytest.mark.parametrize("title, expected", [
+    ("Protein Bar 20g protein 4 ct", PackageSize(count=4)),
+    ("Protein Bar 20g Protein, 4 ct, 1.76 oz", PackageSize(grams=199.58, count=4)),
+    ("Granola 10g of fiber 12 oz", PackageSize(grams=340.19)),
+    ("Cereal 5g sugar, 2g fat 18 oz", PackageSize(grams=510.29)),
+])
+def test_nutrient_claims_are_not_the_package_size(title, expected):
+    assert parse_quantity(title) == expected
+
+def test_annotate_offer_unit_prices():
+    offer = annotate_offer({"name": "Brown Rice 2 lb", "price": 3.0})
+    assert offer["net_grams"] == 907.18
+    assert offer["price_per_100g"] == pytest.approx(0.3307, abs=1e-4)
+    assert offer["price_per_100ml"] is None
+
+def test_annotate_offer_falls_back_to_priced_unit():
+    offer = annotate_offer({"name": "Bananas", "price": 0.6, "unit": "lb"})
+    assert offer["net_grams"] == 453.59
@@ -0,0 +1,67 @@
+import threading
+
+import pytest
+
+import rate_limit
+from rate_limit import TokenBucket
+
+class FakeClock:
+    """Stands in for time.monotonic/time.sleep so waits are instant and exact."""
+    def __init__(self):
+        self.now = 1000.0
+        self.sleeps = []
+
+    def monotonic(self):
+        return self.now
+
+    def sleep(self, seconds):
+        self.sleeps.append(seconds)
+        self.now += seconds
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = FakeClock()
+    monkeypatch.setattr(rate_limit, "time", clock)
+    return clock
+
+def test_bursts_up_to_capacity_then_waits_for_refill(clock):
+    bucket = TokenBucket(rate=2.0, capacity=3)
+    for _ in range(3):
+        assert bucket.acquire()
+    assert clock.sleeps == []
+
+    assert bucket.acquire()
+    assert clock.sleeps == [pytest.approx(0.5)]
+
+def test_capacity_defaults_to_rate_with_a_floor_of_one(clock):
+    assert TokenBucket(rate=5).capacity == 5.0
+    assert TokenBucket(rate=0.2).capacity == 1.0
+
+def test_refill_never_exceeds_capacity(clock):
+    bucket = TokenBucket(rate=10.0, capacity=2)
+    clock.now += 60
+    assert bucket.acquire() and bucket.acquire()
+    assert bucket.acquire(timeout=0) is False
+
+def test_acquire_times_out(clock):
+    bucket = TokenBucket(rate=1.0, capacity=1)
+    assert bucket.acquire()
+    assert bucket.acquire(timeout=0.25) is False
+    assert sum(clock.sleeps) == pytest.approx(0.25)
+
+def test_concurrent_callers_share_the_budget():
+    bucket = TokenBucket(rate=0.001, capacity=5)
+    granted = []
+    lock = threading.Lock()
+
+    def take():
+        ok = bucket.acquire(timeout=0.05)
+        with lock:
+            granted.append(ok)
+
+    threads = [threading.Thread(target=take) for _ in range(20)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert granted.count(True) == 5
@@ -0,0 +1,127 @@
+import threading
+import time
+
+import pytest
+
+from scrapers import result_cache
+from scrapers.interface import ScraperInterface
+from scrapers.result_cache import FRESH, STALE, CachedScraper, SearchResultCache
+
+class Clock:
+    def __init__(self):
+        self.now = 1_000_000.0
+
+    def time(self):
+        return self.now
+
+class FakeScraper(ScraperInterface):
+    def __init__(self, results=None):
+        self.calls = 0
+        self.results = results
+
+    def search(self, query):
+        self.calls += 1
+        results = self.results if self.results is not None else [{"name": f"{query} #{self.calls}", "price": 1.0}]
+        return [dict(r) for r in results]
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = Clock()
+    monkeypatch.setattr(result_cache, "time", clock)
+    return clock
+
+def _eventually(check, timeout=2.0):
+    deadline = time.monotonic() + timeout
+    while not check():
+        assert time.monotonic() < deadline, "condition never became true"
+        time.sleep(0.005)
+
+def _cache(**kwargs):
+    kwargs.setdefault("default_ttl_s", 60)
+    kwargs.setdefault("stale_ttl_s", 300)
+    kwargs.setdefault("store_ttls", {})
+    kwargs.setdefault("db_path", "")
+    return SearchResultCache(**kwargs)
+
+def test_entries_go_fresh_then_stale_then_missing(clock):
+    cache = _cache()
+    cache.set("Walmart", "Green  Beans ", [{"name": "beans"}])
+    assert cache.get("Walmart", "green beans") == ([{"name": "beans"}], FRESH)
+    clock.now += 61
+    assert cache.get("Walmart", "green beans")[1] == STALE
+    clock.now += 300
+    assert cache.get("Walmart", "green beans") == (None, None)
+    assert cache.stats()["stores"]["Walmart"]["misses"] == 1
+
+def test_store_ttls_override_the_default(clock):
+    cache = _cache(store_ttls={"Costco": 3600})
+    cache.set("Costco", "rice", [{"name": "rice"}])
+    cache.set("Target", "rice", [{"name": "rice"}])
+    clock.now += 120
+    assert cache.get("Costco", "rice")[1] == FRESH
+    assert cache.get("Target", "rice")[1] == STALE
+
+def test_callers_get_copies(clock):
+    cache = _cache()
+    cache.set("Walmart", "rice", [{"name": "rice"}])
+    results, _ = cache.get("Walmart", "rice")
+    results[0]["tier"] = "cache"
+    assert cache.get("Walmart", "rice")[0] == [{"name": "rice"}]
+
+def test_memory_tier_is_an_lru(clock):
+    cache = _cache(max_entries=2)
+    cache.set("Walmart", "a", [{"name": "a"}])
+    cache.set("Walmart", "b", [{"name": "b"}])
+    cache.get("Walmart", "a")
+    cache.set("Walmart", "c", [{"name": "c"}])
+    assert cache.get("Walmart", "b") == (None, None)
+    assert cache.get("Walmart", "a")[1] == FRESH
+
+def test_sqlite_tier_survives_a_restart(clock, tmp_path):
+    path = str(tmp_path / "results.db")
+    _cache(db_path=path).set("Safeway", "eggs", [{"name": "eggs", "price": 3.5}])
+
+    restarted = _cache(db_path=path)
+    assert restarted.stats()["memory_entries"] == 0
+    assert restarted.get("Safeway", "EGGS") == ([{"name": "eggs", "price": 3.5}], FRESH)
+    assert restarted.stats()["memory_entries"] == 1
+
+    clock.now += 61
+    assert restarted.get("Safeway", "eggs")[1] == STALE
+
+def test_cached_scraper_serves_stale_and_refreshes_in_the_background(clock):
+    scraper = FakeScraper()
+    cached = CachedScraper("Walmart", scraper, cache=_cache())
+
+    first = cached.search("oats")
+    assert scraper.calls == 1 and first[0]["name"] == "oats #1"
+    assert cached.search("oats")[0]["tier"] == "cache"
+    assert scraper.calls == 1
+
+    clock.now += 61
+    stale = cached.search("oats")
+    assert stale[0]["name"] == "oats #1"  # answered from the stale entry right away
+    _eventually(lambda: cached.cache.get("Walmart", "oats") == ([{"name": "oats #2", "price": 1.0}], FRESH))
+
+def test_only_one_background_refresh_per_entry(clock):
+    scraper = FakeScraper()
+    gate = threading.Event()
+    original = scraper.search
+    scraper.search = lambda query: (gate.wait(2), original(query))[1]
+    cached = CachedScraper("Walmart", scraper, cache=_cache())
+    cached.cache.set("Walmart", "milk", [{"name": "old milk"}])
+    clock.now += 61
+
+    for _ in range(5):
+        assert cached.search("milk")[0]["name"] == "old milk"
+    gate.set()
+    _eventually(lambda: cached.cache.get("Walmart", "milk")[1] == FRESH)
+    _eventually(lambda: ("Walmart", "milk") not in CachedScraper._refreshing)
+    assert scraper.calls == 1
+
+def test_empty_results_are_not_cached(clock):
+    scraper = FakeScraper(results=[])
+    cached = CachedScraper("Walmart", scraper, cache=_cache())
+    assert cached.search("durian") == []
+    assert cached.search("durian") == []
+    assert scraper.calls == 2
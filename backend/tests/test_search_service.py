@@ -0,0 +1,84 @@
+import threading
+import time
+
+import pytest
+
+import search_service
+from scrapers.health import CircuitOpen
+from scrapers.interface import ScraperInterface
+from search_service import iter_store_results, search_all_stores
+
+class FakeScraper(ScraperInterface):
+    """Returns one offer after `delay` seconds, or raises `error`."""
+    def __init__(self, store, delay=0.0, error=None):
+        self.store = store
+        self.delay = delay
+        self.error = error
+        self.release = threading.Event()
+
+    def search(self, query):
+        self.release.wait(self.delay)
+        if self.error:
+            raise self.error
+        return [{"name": f"{self.store} {query}", "price": 1.0, "store": self.store, "tier": "http"}]
+
+def _entries(*scrapers):
+    return [(scraper.store, "grocery", scraper) for scraper in scrapers]
+
+def _by_store(outcomes):
+    return {outcome["store"]: outcome for outcome in outcomes}
+
+def test_results_arrive_as_each_store_finishes():
+    fast, slow = FakeScraper("Fast"), FakeScraper("Slow", delay=0.2)
+    order = [o["store"] for o in iter_store_results("rice", _entries(slow, fast), max_workers=2, deadline_s=5, store_timeout_s=5)]
+    assert order == ["Fast", "Slow"]
+
+def test_store_timeout_gives_up_on_one_store_only():
+    fast, hung = FakeScraper("Fast"), FakeScraper("Hung", delay=10)
+    start = time.monotonic()
+    outcomes = _by_store(iter_store_results("rice", _entries(fast, hung), max_workers=2, deadline_s=5, store_timeout_s=0.2))
+    hung.release.set()
+
+    assert time.monotonic() - start < 2
+    assert outcomes["Fast"]["error"] is None and outcomes["Fast"]["tier"] == "http"
+    assert outcomes["Hung"]["error"] == "timeout" and outcomes["Hung"]["results"] == []
+
+def test_store_timeout_counts_from_when_the_scrape_starts():
+    # One worker: the second store queues behind the first but still gets its own budget
+    first, second = FakeScraper("First", delay=0.15), FakeScraper("Second", delay=0.15)
+    outcomes = _by_store(iter_store_results("rice", _entries(first, second), max_workers=1, deadline_s=5, store_timeout_s=0.25))
+    assert outcomes["First"]["error"] is None
+    assert outcomes["Second"]["error"] is None
+
+def test_request_deadline_abandons_every_unfinished_store():
+    scrapers = [FakeScraper(f"Slow {i}", delay=10) for i in range(3)]
+    start = time.monotonic()
+    outcomes = list(iter_store_results("rice", _entries(*scrapers), max_workers=1, deadline_s=0.2, store_timeout_s=5))
+    for scraper in scrapers:
+        scraper.release.set()
+
+    assert time.monotonic() - start < 2
+    assert len(outcomes) == 3
+    assert {o["error"] for o in outcomes} == {"timeout"}
+
+def test_errors_and_open_circuits_are_reported_per_store():
+    outcomes = _by_store(iter_store_results(
+        "rice",
+        _entries(FakeScraper("Ok"), FakeScraper("Broken", error=ValueError("bad page")), FakeScraper("Open", error=CircuitOpen("open"))),
+        max_workers=3, deadline_s=5, store_timeout_s=5,
+    ))
+    assert outcomes["Ok"]["error"] is None
+    assert outcomes["Broken"]["error"] == "error: bad page"
+    assert outcomes["Open"]["error"] == "circuit_open"
+
+def test_search_all_stores_flags_partial_results():
+    fast, hung = FakeScraper("Fast"), FakeScraper("Hung", delay=10)
+    results = search_all_stores("chicken sandwich", scrapers=_entries(fast, hung), max_workers=2, deadline_s=5, store_timeout_s=0.2)
+    hung.release.set()
+
+    assert results["partial"] is True
+    assert results["errors"] == {"Hung": "timeout"}
+    assert [r["store"] for r in results["grocery"]] == ["Fast"]
+    # No fast food store answered, so that category is mock data
+    assert results["fallback"] == ["fastfood"]
+    assert results["tiers"][search_service.MOCK_STORE] == "mock"
@@ -0,0 +1,28 @@
+import search_service
+import search_stream
+
+def _outcomes(query, deadline_s=None):
+    yield {
+        "store": "Walmart", "category": "grocery", "error": None, "elapsed": 0.1, "tier": "http",
+        "results": [{"name": "Chicken Thighs", "price": 5.0, "store": "Walmart", "type": "grocery", "tier": "http"}],
+    }
+
+def test_mock_fallback_events_carry_a_tier(monkeypatch):
+    monkeypatch.setattr(search_stream, "iter_store_results", _outcomes)
+    monkeypatch.setattr(search_stream, "iter_nutrition", lambda items: iter(()))
+    monkeypatch.setattr(search_stream.crud, "upsert_items", lambda db, offers: len(offers))
+
+    events = list(search_stream.iter_search_events("chicken sandwich"))
+    stores = [e for e in events if e["event"] == "store"]
+    summary = events[-1]
+
+    assert [(e["store"], e["tier"]) for e in stores] == [("Walmart", "http"), ("mock", "mock")]
+    assert stores[1]["results"] and all(item["tier"] == "mock" for item in stores[1]["results"])
+    assert summary["fallback"] == ["fastfood"]
+    assert summary["tiers"] == {"Walmart": "http", "mock": "mock"}
+
+def test_search_all_stores_reports_the_mock_tier(monkeypatch):
+    monkeypatch.setattr(search_service, "iter_store_results", lambda query, **kwargs: _outcomes(query))
+    results = search_service.search_all_stores("chicken sandwich")
+    assert results["tiers"] == {"Walmart": "http", "mock": "mock"}
+    assert results["fastfood"] and all(item["tier"] == "mock" for item in results["fastfood"])
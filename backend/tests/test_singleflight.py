@@ -0,0 +1,120 @@
+import threading
+import time
+
+import pytest
+
+from singleflight import SingleFlight
+
+def _run_concurrently(flight, key, fn, callers):
+    """Starts `callers` threads on flight.do(key, fn); returns their (result, shared) or exceptions."""
+    outcomes = []
+    lock = threading.Lock()
+
+    def call():
+        try:
+            outcome = flight.do(key, fn)
+        except Exception as e:
+            outcome = e
+        with lock:
+            outcomes.append(outcome)
+
+    threads = [threading.Thread(target=call) for _ in range(callers)]
+    for thread in threads:
+        thread.start()
+    return threads, outcomes
+
+def _wait_for_waiters(flight, count):
+    for _ in range(500):
+        if flight.stats()["waiting"] == count:
+            return
+        time.sleep(0.01)
+    raise AssertionError(f"expected {count} waiters, stats: {flight.stats()}")
+
+def test_concurrent_calls_share_one_execution():
+    flight = SingleFlight("test-share")
+    release = threading.Event()
+    runs = []
+
+    def fetch():
+        runs.append(1)
+        release.wait(5)
+        return {"offers": ["a"]}
+
+    threads, outcomes = _run_concurrently(flight, "chicken", fetch, callers=4)
+    _wait_for_waiters(flight, 3)
+    release.set()
+    for thread in threads:
+        thread.join()
+
+    assert len(runs) == 1
+    assert sorted(shared for _, shared in outcomes) == [False, True, True, True]
+    results = [result for result, _ in outcomes]
+    assert all(result == {"offers": ["a"]} for result in results)
+    # Waiters get their own copy
+    assert len({id(result) for result in results}) == 4
+
+    stats = flight.stats()
+    assert (stats["calls"], stats["executions"], stats["shared"], stats["in_flight"]) == (4, 1, 3, 0)
+
+def test_waiters_get_the_leaders_exception():
+    flight = SingleFlight("test-error")
+    release = threading.Event()
+
+    def fail():
+        release.wait(5)
+        raise RuntimeError("upstream down")
+
+    threads, outcomes = _run_concurrently(flight, "eggs", fail, callers=3)
+    _wait_for_waiters(flight, 2)
+    release.set()
+    for thread in threads:
+        thread.join()
+
+    assert len(outcomes) == 3
+    assert all(isinstance(outcome, RuntimeError) for outcome in outcomes)
+
+def test_nothing_is_remembered_after_a_run():
+    flight = SingleFlight("test-sequential")
+    values = iter([1, 2])
+    assert flight.do("k", lambda: next(values)) == (1, False)
+    assert flight.do("k", lambda: next(values)) == (2, False)
+    with pytest.raises(ValueError):
+        flight.do("k", lambda: int("x"))
+    assert flight.stats()["in_flight"] == 0
+
+def test_callers_mutating_their_result_do_not_race():
+    flight = SingleFlight("test-mutate")
+    release = threading.Event()
+    source = [{"name": f"offer {i}"} for i in range(200)]
+
+    def fetch():
+        release.wait(5)
+        return source
+
+    def annotate(result):
+        for offer in result:
+            for n in range(20):
+                offer[f"extra_{n}"] = n
+        return result
+
+    outcomes = []
+    lock = threading.Lock()
+
+    def call():
+        result, _ = flight.do("k", fetch)
+        with lock:
+            outcomes.append(annotate(result))
+
+    threads = [threading.Thread(target=call) for _ in range(8)]
+    for thread in threads:
+        thread.start()
+    _wait_for_waiters(flight, 7)
+    release.set()
+    for thread in threads:
+        thread.join()
+
+    assert len(outcomes) == 8
+    assert len({id(result) for result in outcomes}) == 8
+    # The function's own return value is never handed out
+    assert all(result is not source for result in outcomes)
+    assert source[0] == {"name": "offer 0"}
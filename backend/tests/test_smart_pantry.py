@@ -0,0 +1,88 @@
+import threading
+import time
+
+import pytest
+
+import config
+import smart_pantry
+from scrapers.interface import ScraperInterface
+from scrapers.result_cache import CachedScraper, FRESH
+
+class CountingScraper(ScraperInterface):
+    """Records the peak number of searches running at once across every instance."""
+    lock = threading.Lock()
+    running = 0
+    peak = 0
+
+    def __init__(self, store):
+        self.store = store
+        self.calls = []
+
+    def search(self, query):
+        cls = CountingScraper
+        with cls.lock:
+            cls.running += 1
+            cls.peak = max(cls.peak, cls.running)
+        try:
+            time.sleep(0.02)
+            self.calls.append(query)
+            return [{"name": f"{query} 1 lb", "price": 2.0, "store": self.store, "unit": "lb", "type": "grocery"}]
+        finally:
+            with cls.lock:
+                cls.running -= 1
+
+class FakeCache:
+    def __init__(self):
+        self.stored = {}
+
+    def get(self, store, query):
+        return [{"name": "cached", "price": 9.0}], FRESH
+
+    def set(self, store, query, results):
+        self.stored[(store, query)] = results
+
+    def record(self, store, event):
+        pass
+
+@pytest.fixture
+def stores(monkeypatch):
+    CountingScraper.running = CountingScraper.peak = 0
+    scrapers = [(store, "grocery", CountingScraper(store)) for store in smart_pantry.BENCHMARK_STORES]
+    monkeypatch.setattr(smart_pantry, "get_store_scrapers", lambda: scrapers)
+    monkeypatch.setattr(smart_pantry, "get_nutrition_service", lambda: None)
+    # No nutrition: every staple is scraped, then skipped before anything is saved
+    monkeypatch.setattr(smart_pantry, "refresh_staple", _scrape_only)
+    return scrapers
+
+def _scrape_only(item, scrapers, nutrition_service):
+    for outcome in smart_pantry.iter_store_results(item["name"], scrapers=scrapers, max_workers=len(scrapers)):
+        pass
+    return None
+
+@pytest.mark.parametrize("pool_size, max_workers, expected", [(4, 15, 1), (8, 15, 2), (40, 3, 3), (2, 15, 1)])
+def test_staple_workers_fit_the_browser_pool(monkeypatch, pool_size, max_workers, expected):
+    monkeypatch.setattr(config, "BROWSER_POOL_SIZE", pool_size)
+    assert smart_pantry.staple_workers(max_workers, stores=4, items=15) == expected
+
+def test_refresh_never_runs_more_scrapes_than_the_pool(monkeypatch, db, stores):
+    monkeypatch.setattr(config, "BROWSER_POOL_SIZE", 8)
+    summary = smart_pantry.update_benchmarks(db, max_workers=15)
+
+    assert len(summary["skipped"]) == len(smart_pantry.STAPLE_ITEMS)
+    assert CountingScraper.peak <= 8
+    assert all(len(scraper.calls) == len(smart_pantry.STAPLE_ITEMS) for _, _, scraper in stores)
+
+def test_benchmark_scrapes_skip_the_result_cache(monkeypatch):
+    cache = FakeCache()
+    live = CountingScraper("Walmart")
+    monkeypatch.setattr(smart_pantry, "get_store_scrapers", lambda: [
+        ("Walmart", "grocery", CachedScraper("Walmart", live, cache=cache)),
+        ("McDonald's", "fastfood", CountingScraper("McDonald's")),
+    ])
+
+    ((store, _, scraper),) = smart_pantry._benchmark_scrapers()
+    results = scraper.search("Eggs")
+    assert store == "Walmart"
+    assert results[0]["name"] == "Eggs 1 lb"
+    # The live result still refreshes the cache for user searches
+    assert cache.stored[("Walmart", "Eggs")] == results
@@ -1,4 +1,5 @@
 #!/bin/bash
 cd backend
 source venv/bin/activate
+alembic upgrade head
 uvicorn main:app --reload --host 0.0.0.0 --port 8000